@@ -19,7 +19,7 @@ from src.api.routes import dataset_router, health_router
 from src.core.config import Settings, get_settings
 from src.core.logging import configure_logging, get_logger
 from src.services.cache import cache
-from src.services.recommender import load_meals
+from src.services.recommender import close_sharded_scorer, load_meals, result_cache
 
 logger = get_logger(__name__)
 
@@ -62,6 +62,8 @@ async def lifespan(_app: FastAPI) -> AsyncGenerator[None, None]:
     # Shutdown
     logger.info("Arret API, cleanup...")
     cache.clear()
+    result_cache.clear()
+    close_sharded_scorer()
     logger.info("Cleanup termine")
 
 
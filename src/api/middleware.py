@@ -6,6 +6,7 @@ Configure:
 - CORS
 - Logging des requêtes
 """
+
 import time
 from collections.abc import Awaitable, Callable
 
@@ -44,6 +45,8 @@ def setup_middlewares(app: FastAPI) -> None:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # Headers de pagination lisibles par les clients navigateur
+        expose_headers=["X-Next-Cursor", "X-Total-Count"],
     )
     logger.info("CORS middleware configuré", origins=settings.cors_origins)
 
@@ -139,6 +142,8 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
                 content={
                     "error": "Erreur interne du serveur",
                     "error_code": "INTERNAL_ERROR",
-                    "message": str(e) if get_settings().is_development else "Contactez l'administrateur",
+                    "message": str(e)
+                    if get_settings().is_development
+                    else "Contactez l'administrateur",
                 },
             )
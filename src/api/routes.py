@@ -2,21 +2,42 @@
 
 Définit tous les endpoints REST de l'application.
 Organisation claire avec tags pour la documentation Swagger.
+
+Les routes qui chargent ou scorent le dataset (calcul bloquant) sont
+synchrones: FastAPI les exécute dans son pool de threads, sans bloquer
+la boucle d'événements.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 
+from src.api.streaming import NDJSON_RESPONSES, ndjson_response, wants_ndjson
 from src.core.config import Settings, get_settings
 from src.core.exceptions import AppError
 from src.core.logging import get_logger
-from src.models.schemas import HealthCheck, Meal
+from src.models.schemas import (
+    BatchRecommendationRequest,
+    BatchRecommendationResponse,
+    HealthCheck,
+    Meal,
+    PantryTextRequest,
+    RecommendationResult,
+    RecommendedMeal,
+    SimilarMeal,
+)
 from src.services.cache import cache
+from src.services.filters import MealFilters
+from src.services.ingredient_index import RankingMode
+from src.services.nutrition_index import NutrientName, SortOrder
 from src.services.recommender import (
-    get_meals_by_cuisine,
+    filter_meals,
     get_sample_meals,
+    get_similar_meals,
     load_meals,
-    recommend_meals,
+    rank_meals,
+    rank_meals_batch,
+    recommend_from_text,
+    result_cache,
 )
 
 logger = get_logger(__name__)
@@ -26,21 +47,106 @@ dataset_router = APIRouter(prefix="/meals", tags=["Repas"])
 health_router = APIRouter(tags=["Santé"])
 
 
+def nutrition_ranges(
+    calories_min: float | None = Query(None, ge=0, description="Calories min (kcal)"),
+    calories_max: float | None = Query(None, ge=0, description="Calories max (kcal)"),
+    protein_min: float | None = Query(None, ge=0, description="Protéines min (g)"),
+    protein_max: float | None = Query(None, ge=0, description="Protéines max (g)"),
+    fat_min: float | None = Query(None, ge=0, description="Lipides min (g)"),
+    fat_max: float | None = Query(None, ge=0, description="Lipides max (g)"),
+    carbohydrates_min: float | None = Query(None, ge=0, description="Glucides min (g)"),
+    carbohydrates_max: float | None = Query(None, ge=0, description="Glucides max (g)"),
+    sugars_min: float | None = Query(None, ge=0, description="Sucres min (g)"),
+    sugars_max: float | None = Query(None, ge=0, description="Sucres max (g)"),
+    fiber_min: float | None = Query(None, ge=0, description="Fibres min (g)"),
+    fiber_max: float | None = Query(None, ge=0, description="Fibres max (g)"),
+) -> dict[NutrientName, tuple[float | None, float | None]]:
+    """Dépendance: plages nutritionnelles (bornes incluses)."""
+    return {
+        "calories": (calories_min, calories_max),
+        "protein": (protein_min, protein_max),
+        "fat": (fat_min, fat_max),
+        "carbohydrates": (carbohydrates_min, carbohydrates_max),
+        "sugars": (sugars_min, sugars_max),
+        "fiber": (fiber_min, fiber_max),
+    }
+
+
+def attribute_filters(
+    cuisine: list[str] | None = Query(
+        None,
+        description="Filtrer par type de cuisine (ex: italian, indian), une valeur suffit",
+    ),
+    dish_type: list[str] | None = Query(
+        None,
+        description="Filtrer par catégorie / type de plat (ex: dessert), une valeur suffit",
+    ),
+    diet_type: list[str] | None = Query(
+        None,
+        description="Filtrer par régime (ex: vegetarian), une valeur suffit",
+    ),
+    seasonal: list[str] | None = Query(
+        None,
+        description="Filtrer par saison (ex: summer), une valeur suffit",
+    ),
+    tags: list[str] | None = Query(
+        None,
+        description="Tags requis (ex: pasta), tous doivent être présents",
+    ),
+    nutrition: dict[NutrientName, tuple[float | None, float | None]] = Depends(nutrition_ranges),
+) -> MealFilters:
+    """Dépendance: filtres d'attributs et nutritionnels communs aux endpoints de listing.
+
+    Raises:
+        HTTPException: Plage nutritionnelle incohérente (min > max)
+    """
+    try:
+        return MealFilters.create(
+            cuisine=cuisine,
+            dish_type=dish_type,
+            diet_type=diet_type,
+            seasonal=seasonal,
+            tags=tags,
+            nutrition=nutrition,
+        )
+    except AppError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message) from e
+
+
 @dataset_router.get(
     "/by-ingredients",
-    response_model=list[Meal],
+    response_model=list[RecommendedMeal],
     summary="Recommander repas par ingrédients",
     description="""
     Recommande des recettes basées sur les ingrédients disponibles.
 
     Algorithme:
     - Match partiel des ingrédients (ex: "chicken" match "chicken breast")
-    - Score par nombre d'ingrédients correspondants
-    - Tri par pertinence décroissante
+    - Correction des fautes de frappe (ex: "chiken", "tomatoe"), désactivable
+    - Exclusion d'ingrédients (allergies) et mode "tous les ingrédients requis"
+    - Repas presque faisables: au plus `max_missing` ingrédients manquants
+      (listés dans `missing_ingredients` de chaque repas)
+    - Filtres d'attributs combinables (cuisine, type de plat, régime, saison, tags)
+    - Filtres nutritionnels par plage (ex: `calories_max=500&protein_min=30`)
+    - Tri optionnel par nutriment (`sort_by=protein&sort_order=desc`)
+    - Score par nombre d'ingrédients correspondants (`ranking=count`)
+      ou pondéré par rareté et longueur de recette (`ranking=bm25`)
+    - Sélection top-k par pertinence décroissante (égalité: id du repas)
+
+    Pagination:
+    - Le header `X-Next-Cursor` contient le curseur de la page suivante
+    - Le header `X-Total-Count` contient le nombre total de repas matchés
+    - Les pages suivantes réutilisent le classement en cache
+
+    Streaming: avec `Accept: application/x-ndjson`, un repas JSON par ligne
+    est envoyé au fil de la sérialisation.
     """,
     response_description="Liste des repas triés par pertinence",
+    responses=NDJSON_RESPONSES,
 )
-async def get_meals_by_ingredients(
+def get_meals_by_ingredients(
+    request: Request,
+    response: Response,
     available_ingredients: list[str] = Query(
         ...,
         description="Liste d'ingrédients (ex: chicken,rice,tomato)",
@@ -53,15 +159,57 @@ async def get_meals_by_ingredients(
         le=500,
         description="Nombre max de résultats",
     ),
-) -> list[Meal]:
+    cursor: str | None = Query(
+        default=None,
+        description="Curseur de pagination (header X-Next-Cursor de la page précédente)",
+    ),
+    ranking: RankingMode = Query(
+        default="count",
+        description="Classement: count (nb d'ingrédients matchés) ou bm25 (pondéré par rareté)",
+    ),
+    fuzzy: bool = Query(
+        default=True,
+        description="Corrige les ingrédients mal orthographiés sans aucun match",
+    ),
+    exclude_ingredients: list[str] | None = Query(
+        default=None,
+        description="Ingrédients à exclure, ex: allergies (match partiel)",
+    ),
+    require_all: bool = Query(
+        default=False,
+        description="Ne garder que les repas contenant tous les ingrédients demandés",
+    ),
+    max_missing: int | None = Query(
+        default=None,
+        ge=0,
+        description="Nombre max d'ingrédients manquants par repas (0 = faisable tout de suite)",
+    ),
+    filters: MealFilters = Depends(attribute_filters),
+    sort_by: NutrientName | None = Query(
+        default=None,
+        description="Trier les repas matchés par nutriment au lieu de la pertinence",
+    ),
+    sort_order: SortOrder = Query(default="asc", description="Ordre du tri par nutriment"),
+) -> list[RecommendedMeal] | StreamingResponse:
     """Endpoint principal pour les recommandations.
 
     Args:
+        request: Requête HTTP (header Accept)
+        response: Réponse HTTP (headers de pagination)
         available_ingredients: Liste d'ingrédients (depuis query params)
-        limit: Limite de résultats
+        limit: Limite de résultats (taille de page)
+        cursor: Curseur opaque de la page suivante
+        ranking: Mode de classement
+        fuzzy: Correction orthographique
+        exclude_ingredients: Ingrédients interdits
+        require_all: Exige tous les ingrédients demandés
+        max_missing: Nombre max d'ingrédients manquants par repas
+        filters: Filtres d'attributs (cuisine, type de plat, tags...) et nutritionnels
+        sort_by: Nutriment de tri (None = pertinence)
+        sort_order: Ordre du tri par nutriment
 
     Returns:
-        Liste de repas
+        Liste de repas (ou flux NDJSON)
 
     Raises:
         HTTPException: Si aucun ingrédient fourni
@@ -85,19 +233,33 @@ async def get_meals_by_ingredients(
         # Utilise les ingrédients nettoyés
         available_ingredients = cleaned_ingredients
 
-        # Recommandations
-        meals = recommend_meals(available_ingredients)
-
-        # Limite les résultats
-        limited_meals = meals[:limit] if limit else meals
+        # Recommandations (la limite est appliquée pendant la sélection)
+        ranked = rank_meals(
+            available_ingredients,
+            k=limit,
+            cursor=cursor,
+            ranking=ranking,
+            fuzzy=fuzzy,
+            filters=filters.with_ingredients(exclude_ingredients, require_all, max_missing),
+            sort_by=sort_by,
+            sort_order=sort_order,
+        )
 
         logger.info(
             "Recommandations générées",
-            count=len(limited_meals),
-            total_available=len(meals),
+            count=len(ranked.meals),
+            total_available=ranked.total,
         )
 
-        return limited_meals
+        headers = {"X-Total-Count": str(ranked.total)}
+        if ranked.next_cursor:
+            headers["X-Next-Cursor"] = ranked.next_cursor
+
+        if wants_ndjson(request):
+            return ndjson_response(ranked.iter_recommended(), headers)
+
+        response.headers.update(headers)
+        return ranked.recommended()
 
     except HTTPException:
         # Laisse passer les HTTPException (gérées par FastAPI)
@@ -110,24 +272,132 @@ async def get_meals_by_ingredients(
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+@dataset_router.post(
+    "/recommend/batch",
+    response_model=BatchRecommendationResponse,
+    summary="Recommander repas pour un lot de garde-mangers",
+    description="""
+    Recommande des recettes pour plusieurs listes d'ingrédients en un appel.
+
+    Même classement que `/meals/by-ingredients` pour chaque requête, mais
+    tout le lot est scoré en un seul passage vectorisé (produit matrice
+    creuse x matrice requêtes): un appel remplace des centaines de GET.
+    """,
+    response_description="Repas triés par pertinence, une entrée par requête",
+)
+def recommend_batch(payload: BatchRecommendationRequest) -> BatchRecommendationResponse:
+    """Recommandations pour un lot de requêtes.
+
+    Args:
+        payload: Requêtes, limite par requête et mode de classement
+
+    Returns:
+        Résultats dans l'ordre des requêtes
+
+    Raises:
+        HTTPException: En cas d'erreur de scoring
+    """
+    logger.info("Requête recommandations en lot", queries=len(payload.queries))
+
+    try:
+        ranked = rank_meals_batch(
+            payload.queries,
+            k=payload.limit,
+            ranking=payload.ranking,
+            fuzzy=payload.fuzzy,
+        )
+        return BatchRecommendationResponse(
+            results=[
+                RecommendationResult(
+                    ingredients=query, total=result.total, meals=result.recommended()
+                )
+                for query, result in zip(payload.queries, ranked, strict=True)
+            ]
+        )
+    except AppError as e:
+        logger.error("Erreur métier", error=e.message)
+        raise HTTPException(status_code=e.status_code, detail=e.message) from e
+    except Exception as e:
+        logger.exception("Erreur inattendue")
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@dataset_router.post(
+    "/by-text",
+    response_model=RecommendationResult,
+    summary="Recommander repas depuis un texte libre",
+    description="""
+    Recommande des recettes à partir d'un garde-manger décrit en texte libre
+    (ex: "I have 2 chicken thighs, some rice and old tomatoes").
+
+    Les ingrédients connus sont extraits en un seul passage sur le texte
+    (automate d'Aho-Corasick du vocabulaire), mots entiers uniquement,
+    pluriels simples tolérés. La réponse indique les ingrédients reconnus.
+    """,
+    response_description="Ingrédients reconnus et repas triés par pertinence",
+)
+def recommend_by_text(payload: PantryTextRequest) -> RecommendationResult:
+    """Recommandations depuis un texte libre.
+
+    Args:
+        payload: Texte, limite et mode de classement
+
+    Returns:
+        Ingrédients extraits, nombre total de matchs et repas
+
+    Raises:
+        HTTPException: En cas d'erreur de scoring
+    """
+    logger.info("Requête recommandations texte libre", length=len(payload.text))
+
+    try:
+        ingredients, ranked = recommend_from_text(
+            payload.text,
+            k=payload.limit,
+            ranking=payload.ranking,
+        )
+        return RecommendationResult(
+            ingredients=ingredients,
+            total=ranked.total,
+            meals=ranked.recommended(),
+        )
+    except AppError as e:
+        logger.error("Erreur métier", error=e.message)
+        raise HTTPException(status_code=e.status_code, detail=e.message) from e
+    except Exception as e:
+        logger.exception("Erreur inattendue")
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
 @dataset_router.get(
     "/all",
     response_model=list[Meal],
     summary="Lister tous les repas",
-    description="Retourne tous les repas, avec option de filtrage par cuisine.",
+    description="""
+    Retourne tous les repas, filtrables par cuisine, type de plat, régime,
+    saison, tags et plages nutritionnelles (combinables), triables par
+    nutriment. Les filtres sont évalués sur des index construits au
+    chargement (bitsets, colonnes NumPy triées), sans rescan des repas.
+
+    Streaming: avec `Accept: application/x-ndjson`, un repas JSON par ligne
+    est envoyé au fil de la sérialisation (recommandé sur tout le dataset).
+    """,
+    responses=NDJSON_RESPONSES,
 )
-async def get_all_meals(
-    cuisine: str | None = Query(
-        None,
-        description="Filtrer par type de cuisine (ex: italian, indian)",
-    ),
-) -> list[Meal]:
-    """Liste tous les repas, filtrable par cuisine."""
-    logger.info("Requête liste repas", cuisine=cuisine)
+def get_all_meals(
+    request: Request,
+    filters: MealFilters = Depends(attribute_filters),
+    sort_by: NutrientName | None = Query(default=None, description="Trier par nutriment"),
+    sort_order: SortOrder = Query(default="asc", description="Ordre du tri par nutriment"),
+) -> list[Meal] | StreamingResponse:
+    """Liste tous les repas, filtrable par attributs et nutrition, triable par nutriment."""
+    logger.info("Requête liste repas", filters=filters.key(), sort_by=sort_by)
 
     try:
-        meals = get_meals_by_cuisine(cuisine)
-        return meals
+        meals = filter_meals(filters, sort_by=sort_by, sort_order=sort_order)
+        if wants_ndjson(request):
+            return ndjson_response(meals, {"X-Total-Count": str(len(meals))})
+        return list(meals)
     except Exception as e:
         logger.exception("Erreur liste repas")
         raise HTTPException(status_code=500, detail=str(e)) from e
@@ -139,12 +409,42 @@ async def get_all_meals(
     summary="Exemple de repas",
     description="Retourne un échantillon de repas pour démo/debug.",
 )
-async def get_sample(count: int = Query(default=5, ge=1, le=20)) -> list[Meal]:
+def get_sample(count: int = Query(default=5, ge=1, le=20)) -> list[Meal]:
     """Retourne un échantillon de repas."""
     logger.info("Requête échantillon", count=count)
     return get_sample_meals(count)
 
 
+@dataset_router.get(
+    "/{meal_id}/similar",
+    response_model=list[SimilarMeal],
+    summary="Repas similaires",
+    description="""
+    Retourne les recettes dont les ingrédients recouvrent le plus ceux
+    d'un repas (similarité de Jaccard).
+
+    Les candidats sont trouvés par MinHash + LSH (calculés au chargement),
+    sans comparer le repas à tout le dataset.
+    """,
+    response_description="Repas triés par similarité décroissante",
+)
+def get_similar(
+    meal_id: int = Path(..., ge=0, description="Id du repas de référence"),
+    limit: int = Query(default=10, ge=1, le=50, description="Nombre max de résultats"),
+) -> list[SimilarMeal]:
+    """Repas similaires à un repas donné."""
+    logger.info("Requête repas similaires", meal_id=meal_id, limit=limit)
+
+    try:
+        return get_similar_meals(meal_id, k=limit)
+    except AppError as e:
+        logger.error("Erreur métier", error=e.message)
+        raise HTTPException(status_code=e.status_code, detail=e.message) from e
+    except Exception as e:
+        logger.exception("Erreur inattendue")
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
 @health_router.get(
     "/health",
     response_model=HealthCheck,
@@ -160,8 +460,8 @@ async def health_check(settings: Settings = Depends(get_settings)) -> HealthChec
     - Configuration chargée
     """
     try:
-        # Test cache
-        cache_stats = cache.get_stats()
+        # Test cache (données + résultats de requêtes)
+        cache_stats = {**cache.get_stats(), "results": result_cache.get_stats()}
 
         return HealthCheck(
             status="healthy",
@@ -180,7 +480,7 @@ async def health_check(settings: Settings = Depends(get_settings)) -> HealthChec
 
 
 @health_router.get("/ready", summary="Readiness probe")
-async def readiness_probe() -> JSONResponse:
+def readiness_probe() -> JSONResponse:
     """Readiness probe pour Kubernetes.
 
     Vérifie que l'app est prête à recevoir du trafic.
@@ -0,0 +1,64 @@
+"""Réponses NDJSON en streaming.
+
+Quand le client envoie `Accept: application/x-ndjson`, les repas sont
+sérialisés un par un (un objet JSON par ligne) au fil de l'envoi, au lieu
+de valider et sérialiser toute la liste avant le premier octet: le temps
+jusqu'au premier octet et la mémoire restent constants quand le nombre
+de résultats augmente.
+"""
+
+from collections.abc import Iterable, Iterator, Mapping
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from src.models.schemas import Meal
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Lignes regroupées par écriture (évite un appel d'envoi par repas)
+NDJSON_CHUNK_SIZE = 64
+
+# Documentation OpenAPI du mode streaming
+NDJSON_RESPONSES: dict[int | str, dict[str, object]] = {
+    200: {
+        "content": {NDJSON_MEDIA_TYPE: {"schema": {"type": "string"}}},
+        "description": "Un repas JSON par ligne si `Accept: application/x-ndjson`",
+    }
+}
+
+
+def wants_ndjson(request: Request) -> bool:
+    """Vrai si le client demande explicitement du NDJSON."""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _ndjson_lines(meals: Iterable[Meal]) -> Iterator[bytes]:
+    """Sérialise les repas au fil de l'eau, par paquets de lignes."""
+    chunk: list[str] = []
+    for meal in meals:
+        chunk.append(meal.model_dump_json())
+        if len(chunk) >= NDJSON_CHUNK_SIZE:
+            yield ("\n".join(chunk) + "\n").encode()
+            chunk = []
+    if chunk:
+        yield ("\n".join(chunk) + "\n").encode()
+
+
+def ndjson_response(
+    meals: Iterable[Meal],
+    headers: Mapping[str, str] | None = None,
+) -> StreamingResponse:
+    """Réponse streaming NDJSON (un repas JSON par ligne).
+
+    Args:
+        meals: Repas à envoyer (itérés pendant l'envoi)
+        headers: Headers additionnels (ex: pagination)
+
+    Returns:
+        Réponse FastAPI en streaming
+    """
+    return StreamingResponse(
+        _ndjson_lines(meals),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers=dict(headers or {}),
+    )
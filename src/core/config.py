@@ -3,6 +3,7 @@
 Ce module utilise Pydantic Settings pour gérer toute la configuration
 via des variables d'environnement ou un fichier .env
 """
+
 from functools import lru_cache
 from pathlib import Path
 from typing import Literal
@@ -50,12 +51,22 @@ class Settings(BaseSettings):
     # 📊 Données
     data_dir: Path = Path(__file__).parent.parent.parent / "data"
     data_source: Literal["mealdb", "csv"] = "mealdb"
-    csv_url: str = (
-        "https://huggingface.co/spaces/BucKz96/csv_app/resolve/main/recipes_clean.csv"
-    )
+    csv_url: str = "https://huggingface.co/spaces/BucKz96/csv_app/resolve/main/recipes_clean.csv"
     mealdb_api_base: str = "https://www.themealdb.com/api/json/v1/1"
     mealdb_letters: str = "abcdefghijklmnopqrstuvwxyz"
+    mealdb_workers: int = 8  # Requêtes TheMealDB simultanées (1 = séquentiel)
     cache_ttl_seconds: int = 3600  # 1 heure
+    dataset_snapshot: bool = True  # Snapshot binaire pré-parsé à côté du CSV
+    csv_chunk_rows: int = 10_000  # Lignes du CSV lues et converties par paquet
+
+    # 🔎 Recommandation
+    # sparse = NumPy vectorisé, maxscore = top-k avec terminaison anticipée
+    recommender_backend: Literal["index", "sparse", "maxscore"] = "index"
+    result_cache_size: int = 512  # Requêtes mémorisées (LRU), 0 = désactivé
+    result_cache_bytes: int = 64 * 1024 * 1024  # Taille max des scores mémorisés (octets)
+    recommender_workers: int = 0  # > 1 = scoring réparti sur N processus (gros datasets)
+    similar_num_perm: int = 128  # Taille des signatures MinHash
+    similar_bands: int = 32  # Bandes LSH (plus = meilleur rappel, plus de candidats)
 
     # 📝 Logging
     log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = "INFO"
@@ -78,6 +89,11 @@ class Settings(BaseSettings):
             return self.data_dir / "recipes_mealdb.csv"
         return self.data_dir / "recipes_clean.csv"
 
+    @property
+    def snapshot_path(self) -> Path:
+        """Chemin du snapshot binaire des repas (à côté du CSV source)."""
+        return self.csv_path.with_suffix(".snapshot.bin")
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -12,7 +12,7 @@ Pourquoi Pydantic v2 ?
 - Support Python 3.8+
 """
 
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
@@ -22,6 +22,7 @@ class NutritionInfo(BaseModel):
 
     Toutes les valeurs sont en grammes ou kcal par portion.
     """
+
     model_config = ConfigDict(extra="ignore")
 
     calories: float = Field(default=0.0, ge=0, description="Calories en kcal")
@@ -40,10 +41,12 @@ class Meal(BaseModel):
     - Validation des données CSV
     - Affichage dans Streamlit
     """
+
     model_config = ConfigDict(
         extra="ignore",  # Ignore champs inconnus (compatibilité)
         json_schema_extra={
             "example": {
+                "id": 42,
                 "name": "Chicken Curry",
                 "ingredients": ["chicken", "curry powder", "rice", "coconut milk"],
                 "cuisine": "indian",
@@ -52,6 +55,7 @@ class Meal(BaseModel):
                 "diet_type": "high-protein",
                 "dish_type": "main-dish",
                 "seasonal": None,
+                "tags": ["indian", "curry", "spicy"],
                 "nutritions": {
                     "calories": 450.0,
                     "protein": 35.0,
@@ -64,44 +68,29 @@ class Meal(BaseModel):
         },
     )
 
+    # Identifiant (position dans le dataset chargé)
+    id: int | None = Field(None, ge=0, description="Identifiant du repas dans le dataset")
+
     # Champs obligatoires
     name: str = Field(..., min_length=1, description="Nom de la recette")
     ingredients: list[str] = Field(
-        ...,
-        min_length=1,
-        description="Liste des ingrédients nécessaires"
+        ..., min_length=1, description="Liste des ingrédients nécessaires"
     )
 
     # Champs optionnels
-    cuisine: str | None = Field(
-        None,
-        description="Type de cuisine (ex: italian, indian)"
-    )
-    image: str | None = Field(
-        None,
-        description="URL de l'image du plat"
-    )
-    prep_time: str | None = Field(
-        None,
-        description="Temps de préparation (format texte)"
-    )
-    diet_type: str | None = Field(
-        None,
-        description="Régime alimentaire (ex: vegetarian, low-carb)"
-    )
-    dish_type: str | None = Field(
-        None,
-        description="Type de plat (ex: main-dish, dessert)"
-    )
-    seasonal: str | None = Field(
-        None,
-        description="Saisonnalité (ex: summer, winter)"
+    cuisine: str | None = Field(None, description="Type de cuisine (ex: italian, indian)")
+    image: str | None = Field(None, description="URL de l'image du plat")
+    prep_time: str | None = Field(None, description="Temps de préparation (format texte)")
+    diet_type: str | None = Field(None, description="Régime alimentaire (ex: vegetarian, low-carb)")
+    dish_type: str | None = Field(None, description="Type de plat (ex: main-dish, dessert)")
+    seasonal: str | None = Field(None, description="Saisonnalité (ex: summer, winter)")
+    tags: list[str] = Field(
+        default_factory=list, description="Tous les tags de la recette (ex: italian, pasta, quick)"
     )
 
     # Nutrition (dictionnaire ou objet NutritionInfo)
     nutritions: NutritionInfo = Field(
-        default_factory=NutritionInfo,
-        description="Valeurs nutritionnelles"
+        default_factory=NutritionInfo, description="Valeurs nutritionnelles"
     )
 
     @field_validator("ingredients", mode="before")
@@ -138,11 +127,32 @@ class Meal(BaseModel):
         return NutritionInfo()
 
 
+class SimilarMeal(Meal):
+    """Repas similaire, avec sa similarité au repas de référence."""
+
+    similarity: float = Field(
+        ...,
+        ge=0,
+        le=1,
+        description="Similarité de Jaccard des ingrédients (0-1)",
+    )
+
+
+class RecommendedMeal(Meal):
+    """Repas recommandé, avec les ingrédients que l'utilisateur n'a pas."""
+
+    missing_ingredients: list[str] = Field(
+        default_factory=list,
+        description="Ingrédients du repas non couverts par la requête",
+    )
+
+
 class MealRecommendationRequest(BaseModel):
     """Requête pour obtenir des recommandations.
 
     Utilisé par POST /recommendations ou validation GET params.
     """
+
     ingredients: list[str] = Field(
         ...,
         min_length=1,
@@ -166,15 +176,93 @@ class MealRecommendationRequest(BaseModel):
         return cleaned
 
 
+class BatchRecommendationRequest(BaseModel):
+    """Lot de requêtes de recommandation.
+
+    Utilisé par POST /meals/recommend/batch: un appel pour des centaines
+    de garde-mangers, scorés ensemble.
+    """
+
+    queries: list[list[str]] = Field(
+        ...,
+        min_length=1,
+        max_length=500,
+        description="Ingrédients disponibles de chaque requête (1-500 requêtes)",
+        examples=[[["chicken", "rice"], ["tomato", "basil"]]],
+    )
+    limit: int | None = Field(
+        default=10,
+        ge=1,
+        le=500,
+        description="Nombre max de résultats par requête (1-500)",
+    )
+    ranking: Literal["count", "bm25"] = Field(
+        default="count",
+        description="Classement: count (nb d'ingrédients matchés) ou bm25",
+    )
+    fuzzy: bool = Field(
+        default=True,
+        description="Corrige les ingrédients mal orthographiés sans aucun match",
+    )
+
+    @field_validator("queries")
+    @classmethod
+    def validate_queries(cls, v: list[list[str]]) -> list[list[str]]:
+        """Nettoie chaque requête et vérifie qu'elle reste non-vide."""
+        cleaned = [[ing.strip() for ing in query if ing.strip()] for query in v]
+        if any(not query for query in cleaned):
+            raise ValueError("Chaque requête doit contenir au moins un ingrédient non-vide")
+        if any(len(query) > 50 for query in cleaned):
+            raise ValueError("50 ingrédients max par requête")
+        return cleaned
+
+
+class RecommendationResult(BaseModel):
+    """Résultat d'une recommandation (requête d'un lot, texte libre)."""
+
+    ingredients: list[str] = Field(..., description="Ingrédients de la requête")
+    total: int = Field(..., ge=0, description="Nombre total de repas matchés")
+    meals: list[RecommendedMeal] = Field(..., description="Repas triés par pertinence")
+
+
+class BatchRecommendationResponse(BaseModel):
+    """Réponse de POST /meals/recommend/batch (même ordre que les requêtes)."""
+
+    results: list[RecommendationResult]
+
+
+class PantryTextRequest(BaseModel):
+    """Garde-manger décrit en texte libre.
+
+    Utilisé par POST /meals/by-text (client mobile).
+    """
+
+    text: str = Field(
+        ...,
+        min_length=1,
+        max_length=2000,
+        description="Texte libre décrivant les ingrédients disponibles",
+        examples=["I have 2 chicken thighs, some rice and old tomatoes"],
+    )
+    limit: int | None = Field(
+        default=100,
+        ge=1,
+        le=500,
+        description="Nombre max de résultats (1-500)",
+    )
+    ranking: Literal["count", "bm25"] = Field(
+        default="count",
+        description="Classement: count (nb d'ingrédients matchés) ou bm25",
+    )
+
+
 class HealthCheck(BaseModel):
     """Réponse du health check.
 
     Utilisé par GET /health pour monitoring.
     """
+
     status: str = Field(..., description="État général: healthy/unhealthy")
     version: str = Field(..., description="Version de l'API")
     environment: str = Field(..., description="Environnement: dev/staging/prod")
-    cache_stats: dict[str, Any] | None = Field(
-        None,
-        description="Statistiques du cache"
-    )
+    cache_stats: dict[str, Any] | None = Field(None, description="Statistiques du cache")
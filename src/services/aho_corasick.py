@@ -0,0 +1,93 @@
+"""Automate d'Aho-Corasick (recherche multi-motifs en un passage).
+
+Construit une seule fois à partir d'un ensemble de motifs (ex: le
+vocabulaire des ingrédients), il trouve toutes leurs occurrences dans un
+texte en un seul parcours linéaire, quel que soit le nombre de motifs:
+pas de boucle `motif in texte` sur des milliers d'entrées.
+"""
+
+from collections import deque
+from collections.abc import Iterator, Sequence
+
+
+class AhoCorasick:
+    """Trie des motifs + liens d'échec (automate d'Aho-Corasick).
+
+    Attributes:
+        patterns: Motifs recherchés, l'id d'un motif = sa position
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        """Construit le trie puis les liens d'échec (parcours en largeur).
+
+        Args:
+            patterns: Motifs à rechercher (les chaînes vides sont ignorées)
+        """
+        self.patterns = patterns
+        # Noeud 0 = racine; transitions, lien d'échec et motif terminé par noeud
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._pattern: list[int] = [-1]
+        # Noeud terminal le plus proche en suivant les liens d'échec
+        self._output: list[int] = [0]
+
+        for pattern_id, pattern in enumerate(patterns):
+            if not pattern:
+                continue
+            node = 0
+            for char in pattern:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._pattern.append(-1)
+                    self._output.append(0)
+                node = next_node
+            self._pattern[node] = pattern_id
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                fail_node = self._fail[child]
+                self._output[child] = (
+                    fail_node if self._pattern[fail_node] >= 0 else self._output[fail_node]
+                )
+                queue.append(child)
+
+    def __len__(self) -> int:
+        """Nombre de noeuds de l'automate."""
+        return len(self._goto)
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, int, int]]:
+        """Toutes les occurrences des motifs dans un texte (chevauchements inclus).
+
+        Args:
+            text: Texte à analyser
+
+        Yields:
+            (début, fin, id du motif), `text[début:fin] == patterns[id]`
+
+        Exemple:
+            >>> list(AhoCorasick(["he", "she"]).iter_matches("ushe"))
+            [(1, 4, 1), (2, 4, 0)]
+        """
+        goto, fail, pattern, output = self._goto, self._fail, self._pattern, self._output
+        node = 0
+        for end, char in enumerate(text, start=1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            match = node if pattern[node] >= 0 else output[node]
+            while match:
+                pattern_id = pattern[match]
+                yield end - len(self.patterns[pattern_id]), end, pattern_id
+                match = output[match]
@@ -0,0 +1,120 @@
+"""Index secondaires des attributs de repas.
+
+Construits une seule fois par chargement du dataset: pour chaque attribut
+(cuisine, type de plat, régime, saison, tags) et chaque valeur, les ids
+triés des repas qui la portent. Un filtre sur plusieurs attributs se
+réduit à des unions / intersections de ces tableaux (NumPy), sans
+parcourir la liste des repas. La mémoire est proportionnelle au nombre
+d'occurrences (pas un bitset de la taille du dataset par valeur, tags
+libres compris).
+"""
+
+import functools
+from collections.abc import Mapping, Sequence
+from typing import Literal
+
+import numpy as np
+
+from src.models.schemas import Meal
+from src.services import bitset
+from src.services.sparse_matrix import IntArray
+
+AttributeName = Literal["cuisine", "dish_type", "diet_type", "seasonal", "tags"]
+ATTRIBUTES: tuple[AttributeName, ...] = ("cuisine", "dish_type", "diet_type", "seasonal", "tags")
+
+# Attributs multi-valués: toutes les valeurs demandées sont requises (ET).
+# Pour les autres, une valeur parmi celles demandées suffit (OU).
+MULTI_VALUED: frozenset[AttributeName] = frozenset({"tags"})
+
+
+def attribute_values(meal: Meal, attribute: AttributeName) -> list[str]:
+    """Valeurs normalisées (minuscules, trimées) d'un attribut d'un repas.
+
+    Exemple:
+        >>> attribute_values(Meal(name="x", ingredients=["egg"], tags=["Quick "]), "tags")
+        ['quick']
+    """
+    value = getattr(meal, attribute)
+    values = value if isinstance(value, list) else [value]
+    return [v.strip().lower() for v in values if v and v.strip()]
+
+
+class AttributeIndex:
+    """Index attribut -> valeur -> ids des repas.
+
+    Attributes:
+        size: Nombre de repas indexés
+        ids: Pour chaque attribut, ids triés des repas de chaque valeur
+    """
+
+    def __init__(
+        self,
+        meals: Sequence[Meal],
+        postings: Mapping[AttributeName, Mapping[str, Sequence[int] | IntArray]] | None = None,
+    ):
+        """Construit les index de tous les attributs en un passage.
+
+        Args:
+            meals: Repas à indexer (l'id d'un repas = sa position)
+            postings: Ids triés des repas de chaque valeur, déjà calculés
+                (snapshot du dataset): évite le parcours des repas
+        """
+        self.size = len(meals)
+        if postings is None:
+            collected: dict[AttributeName, dict[str, list[int]]] = {a: {} for a in ATTRIBUTES}
+            for meal_id, meal in enumerate(meals):
+                for attribute in ATTRIBUTES:
+                    for value in attribute_values(meal, attribute):
+                        collected[attribute].setdefault(value, []).append(meal_id)
+            postings = collected
+
+        # Tableaux du snapshot gardés tels quels (vues sur le fichier mappé)
+        self.ids: dict[AttributeName, dict[str, IntArray]] = {
+            attribute: {value: np.asarray(ids, dtype=np.int64) for value, ids in values.items()}
+            for attribute, values in postings.items()
+        }
+
+    def values(self, attribute: AttributeName) -> list[str]:
+        """Valeurs connues d'un attribut, triées."""
+        return sorted(self.ids[attribute])
+
+    def postings(self, attribute: AttributeName) -> dict[str, IntArray]:
+        """Ids triés des repas de chaque valeur d'un attribut."""
+        return dict(self.ids[attribute])
+
+    def filter_ids(self, filters: Mapping[AttributeName, frozenset[str]]) -> IntArray | None:
+        """Ids triés des repas satisfaisant tous les filtres d'attributs.
+
+        Args:
+            filters: Valeurs normalisées demandées par attribut
+
+        Returns:
+            Ids des repas autorisés, ou None si aucun filtre
+        """
+        empty = np.empty(0, dtype=np.int64)
+        allowed: IntArray | None = None
+        for attribute, wanted in filters.items():
+            if not wanted:
+                continue
+            by_value = self.ids[attribute]
+            postings = [by_value.get(value, empty) for value in sorted(wanted)]
+            if attribute in MULTI_VALUED:
+                matched = functools.reduce(np.intersect1d, postings)
+            else:
+                matched = np.unique(np.concatenate(postings))
+            allowed = matched if allowed is None else np.intersect1d(allowed, matched)
+        return allowed
+
+    def filter_bitset(self, filters: Mapping[AttributeName, frozenset[str]]) -> int | None:
+        """Bitset des repas satisfaisant tous les filtres d'attributs.
+
+        Seul le résultat du filtre est converti en bitset.
+
+        Args:
+            filters: Valeurs normalisées demandées par attribut
+
+        Returns:
+            Bitset des repas autorisés, ou None si aucun filtre
+        """
+        allowed = self.filter_ids(filters)
+        return None if allowed is None else bitset.from_ids(allowed, self.size)
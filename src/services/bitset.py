@@ -0,0 +1,50 @@
+"""Bitsets d'ids de repas.
+
+Un bitset est un entier Python dont le bit i vaut 1 si le repas d'id i
+appartient à l'ensemble. Les opérations ensemblistes sur tout le dataset
+deviennent des opérations bit à bit (`&`, `|`, `& ~`) exécutées en C.
+"""
+
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+
+def from_ids(ids: Sequence[int] | npt.NDArray[np.int64], size: int) -> int:
+    """Construit le bitset d'une liste d'ids.
+
+    Exemple:
+        >>> bin(from_ids([0, 2], size=4))
+        '0b101'
+    """
+    positions = np.asarray(ids, dtype=np.int64)
+    buffer = np.zeros((size + 7) // 8, dtype=np.uint8)
+    np.bitwise_or.at(buffer, positions >> 3, np.left_shift(1, positions & 7).astype(np.uint8))
+    return int.from_bytes(buffer.tobytes(), "little")
+
+
+def full(size: int) -> int:
+    """Bitset contenant tous les ids de 0 à size - 1."""
+    return (1 << size) - 1
+
+
+def union(bitsets: Iterable[int]) -> int:
+    """OU bit à bit d'une série de bitsets (0 si vide)."""
+    result = 0
+    for bits in bitsets:
+        result |= bits
+    return result
+
+
+def to_mask(bits: int, size: int) -> npt.NDArray[np.bool_]:
+    """Convertit un bitset en masque booléen NumPy de taille `size`.
+
+    Exemple:
+        >>> to_mask(0b101, size=4).tolist()
+        [True, False, True, False]
+    """
+    raw = bits.to_bytes((size + 7) // 8, "little")
+    unpacked = np.unpackbits(np.frombuffer(raw, dtype=np.uint8), bitorder="little")
+    mask: npt.NDArray[np.bool_] = unpacked[:size].astype(bool)
+    return mask
@@ -6,8 +6,11 @@ Pourquoi un cache manager ?
 - Cache avec TTL (Time To Live) pour données fraîches
 - Thread-safe pour production
 """
+
 import threading
 import time
+from collections import OrderedDict
+from collections.abc import Hashable
 from typing import Any, Generic, TypeVar
 
 from src.core.logging import get_logger
@@ -142,5 +145,87 @@ class CacheManager:
             }
 
 
+class LRUCache:
+    """Cache LRU borné en nombre d'entrées et en octets, thread-safe.
+
+    Contrairement à `CacheManager` (TTL, quelques grosses entrées), il sert
+    aux nombreux petits résultats de requêtes: au-delà de `max_entries`
+    entrées ou de `max_bytes` octets, l'entrée la moins récemment utilisée
+    est évincée. La taille d'une valeur est son attribut `nbytes`
+    (tableaux NumPy, scores de requête), 0 sinon.
+
+    Usage:
+        >>> results = LRUCache(max_entries=2)
+        >>> results.set(("rice",), [1, 2])
+        >>> results.get(("rice",))
+        [1, 2]
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int | None = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        """Récupère une valeur et la marque comme récemment utilisée.
+
+        Returns:
+            La valeur si présente, None sinon
+        """
+        with self._lock:
+            if key not in self._entries:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return self._entries[key][0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Stocke une valeur, en évinçant les plus anciennes si plein.
+
+        Une valeur plus grosse que `max_bytes` à elle seule n'est pas stockée.
+        """
+        size = int(getattr(value, "nbytes", 0))
+        if self.max_entries <= 0 or (self.max_bytes is not None and size > self.max_bytes):
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Vide le cache (ex: rechargement du dataset)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            logger.debug("Cache LRU vidé")
+
+    def get_stats(self) -> dict[str, int | None]:
+        """Retourne taille (entrées et octets), hits, misses et évictions."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
+
+
 # Instance globale pour import facile
 cache = CacheManager()
@@ -2,16 +2,29 @@
 
 Ce module gère:
 - Téléchargement automatique depuis HuggingFace
+- Récupération concurrente depuis TheMealDB (connexions partagées)
 - Parsing sécurisé (sans ast.literal_eval risqué)
+- Parsing vectorisé de la colonne nutritionnelle
+- Lecture du CSV par paquets de lignes (mémoire bornée)
 - Retry avec backoff exponentiel
 - Validation des données
 """
+
+import hashlib
+import io
+import json
 import re
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+import numpy.typing as npt
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from src.core.config import get_settings
@@ -20,6 +33,24 @@ from src.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Incrémenté à chaque changement du format du fichier d'empreintes TheMealDB
+HASHES_FORMAT = 1
+
+# Nutriments extraits des chaînes nutritionnelles
+NUTRITION_KEYS = ("calories", "protein", "fat", "carbohydrates", "sugars", "fiber")
+# Paire `"clé": {"amount": valeur` (quotes simples déjà remplacées)
+NUTRITION_PAIR = r'"(\w+)":\s*\{?\s*"amount":\s*([\d.]+)'
+# Séparateur des chaînes concaténées: aucune paire ne peut le traverser
+_ROW_SEPARATOR = '"\x01'
+# (nutriment, montant) d'une paire, ou (séparateur, ""): même préfixe `"`, scan rapide
+_NUTRIENT_PAIR_OR_SEPARATOR = re.compile(
+    r'"(\x01|' + "|".join(NUTRITION_KEYS) + r')(?:(?<=\x01)|":\s*\{?\s*"amount":\s*([\d.]+))'
+)
+# Colonne de chaque nutriment (-1: séparateur)
+_NUTRIENT_CODES = {"\x01": -1, **{key: code for code, key in enumerate(NUTRITION_KEYS)}}
+# Montant potentiellement refusé par float(): plusieurs points, ou aucun chiffre
+_SUSPECT_AMOUNT = re.compile(r"\.(?:\d*\.|(?<![\d.]\.)(?![\d.]))")
+
 
 def safe_parse_list(value: str | list[Any] | None) -> list[str]:
     """Parse une liste d'ingrédients de manière sécurisée.
@@ -81,8 +112,7 @@ def safe_parse_nutrition(value: str | dict[str, Any] | None) -> dict[str, float]
             # Remplace les quotes simples par doubles pour JSON-like
             cleaned_str = value.replace("'", '"')
             # Extrait les paires clé: valeur
-            pattern = r'"(\w+)":\s*\{?\s*"amount":\s*([\d.]+)'
-            matches = re.findall(pattern, cleaned_str)
+            matches = re.findall(NUTRITION_PAIR, cleaned_str)
             nutrition_dict = {k: float(v) for k, v in matches}
         except Exception:
             logger.warning(f"Impossible de parser nutrition: {value[:100]}...")
@@ -90,7 +120,7 @@ def safe_parse_nutrition(value: str | dict[str, Any] | None) -> dict[str, float]
 
     # Nettoie et extrait les valeurs importantes
     cleaned_nutrition: dict[str, float] = {}
-    for key in ["calories", "protein", "fat", "carbohydrates", "sugars", "fiber"]:
+    for key in NUTRITION_KEYS:
         try:
             val = nutrition_dict.get(key, 0)
             if isinstance(val, (int, float)):
@@ -105,6 +135,77 @@ def safe_parse_nutrition(value: str | dict[str, Any] | None) -> dict[str, float]
     return cleaned_nutrition
 
 
+def parse_nutrition_column(values: pd.Series) -> pd.DataFrame:
+    """Parse toute une colonne nutritionnelle en une fois.
+
+    Même résultat que `safe_parse_nutrition` appliqué à chaque valeur (une
+    valeur manquante donne des zéros), sans boucle Python par chaîne: les
+    chaînes sont concaténées et une seule passe de regex extrait les paires
+    (nutriment, montant) de toute la colonne. Conversion en flottants,
+    arrondi et dernière occurrence d'une clé (comme le dict de `findall`)
+    sont calculés en bloc avec NumPy.
+
+    Les lignes qu'une passe globale ne reproduirait pas exactement sont
+    parsées par `safe_parse_nutrition`: dicts, et chaînes contenant un
+    montant suspect ("1.2.3" fait échouer `float()`, donc toute la ligne).
+
+    Args:
+        values: Colonne `nutritions` (chaînes, dicts ou valeurs manquantes)
+
+    Returns:
+        Un nutriment par colonne (`NUTRITION_KEYS`), arrondi à 2 décimales,
+        même index que `values`
+    """
+    objects = values.to_numpy(dtype=object, na_value=None)
+    matrix = np.zeros((len(objects), len(NUTRITION_KEYS)), dtype=np.float64)
+    is_text = np.fromiter(
+        (isinstance(v, str) and "\x01" not in v for v in objects),
+        dtype=np.bool_,
+        count=len(objects),
+    )
+    rows = np.flatnonzero(is_text)
+    texts: list[str] = objects[rows].tolist()
+    joined = _ROW_SEPARATOR.join(texts).replace("'", '"')
+
+    # Lignes à parser une par une: dicts, chaînes avec un montant suspect
+    starts = np.cumsum([0, *(len(text) + len(_ROW_SEPARATOR) for text in texts)])
+    suspects = [match.start() for match in _SUSPECT_AMOUNT.finditer(joined)]
+    fallback = rows[np.searchsorted(starts, suspects, side="right") - 1]
+    fallback = np.union1d(fallback, np.flatnonzero(~is_text & (objects != None)))  # noqa: E711
+
+    matches = np.array(_NUTRIENT_PAIR_OR_SEPARATOR.findall(joined), dtype=object).reshape(-1, 2)
+    codes = np.fromiter(map(_NUTRIENT_CODES.__getitem__, matches[:, 0]), np.int64, len(matches))
+    separators = codes < 0
+    pair_rows = rows[np.cumsum(separators)[~separators]]
+    kept = ~np.isin(pair_rows, fallback)
+    cells = (pair_rows * len(NUTRITION_KEYS) + codes[~separators])[kept]
+    amounts = matches[~separators, 1][kept]
+
+    # Dernière occurrence de chaque (ligne, nutriment)
+    _, last = np.unique(cells[::-1], return_index=True)
+    last = len(cells) - 1 - last
+    matrix.reshape(-1)[cells[last]] = _round_amounts(amounts[last].astype(np.float64))
+
+    for position in fallback.tolist():
+        row = safe_parse_nutrition(objects[position])
+        matrix[position] = [row.get(key, 0.0) for key in NUTRITION_KEYS]
+    return pd.DataFrame(matrix, index=values.index, columns=list(NUTRITION_KEYS))
+
+
+def _round_amounts(values: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """Arrondit à 2 décimales, exactement comme `round(valeur, 2)`.
+
+    `np.round` (x * 100 arrondi) ne diffère de `round` qu'au voisinage d'une
+    demi-unité ou pour de très grandes valeurs: ces cas sont recalculés.
+    """
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for position in np.flatnonzero(near_half | (np.abs(values) >= 1e12)).tolist():
+        rounded[position] = round(float(values[position]), 2)
+    return rounded
+
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=1, min=4, max=10),
@@ -146,112 +247,345 @@ def download_csv(url: str, target_path: Path) -> None:
     wait=wait_exponential(multiplier=1, min=2, max=8),
     reraise=True,
 )
-def fetch_mealdb_by_letter(letter: str) -> list[dict[str, Any]]:
-    """Récupère les recettes TheMealDB pour une lettre donnée."""
+def fetch_mealdb_by_letter(
+    letter: str,
+    session: requests.Session | None = None,
+) -> list[dict[str, Any]]:
+    """Récupère les recettes TheMealDB pour une lettre donnée.
+
+    Args:
+        letter: Première lettre des recettes
+        session: Session HTTP partagée (pool de connexions keep-alive)
+
+    Returns:
+        Recettes brutes de l'API
+    """
     settings = get_settings()
     url = f"{settings.mealdb_api_base}/search.php?f={letter}"
-    response = requests.get(url, timeout=20)
+    response = (session or requests).get(url, timeout=20)
     response.raise_for_status()
     payload = response.json()
     return payload.get("meals") or []
 
 
-def build_mealdb_csv(target_path: Path) -> None:
-    """Construit un CSV local depuis TheMealDB (avec images)."""
-    settings = get_settings()
-    letters = settings.mealdb_letters
-    meals_by_id: dict[str, dict[str, Any]] = {}
+def _fetch_mealdb_letters(letters: str, workers: int) -> list[list[dict[str, Any]] | None]:
+    """Récupère les recettes de chaque lettre, `workers` requêtes à la fois.
+
+    Les requêtes (et leurs retries) tournent en parallèle dans un pool de
+    threads borné et partagent une même session HTTP, dont le pool de
+    connexions est dimensionné sur le nombre de workers.
+
+    Args:
+        letters: Lettres à récupérer
+        workers: Requêtes simultanées (1 = séquentiel)
+
+    Returns:
+        Recettes de chaque lettre, dans l'ordre des lettres (None = échec)
+    """
 
-    logger.info("Chargement des données TheMealDB...")
-    for letter in letters:
+    def fetch(letter: str) -> list[dict[str, Any]] | None:
         try:
-            meals = fetch_mealdb_by_letter(letter)
+            return fetch_mealdb_by_letter(letter, session)
         except Exception as e:
             logger.warning(f"Échec fetch TheMealDB pour '{letter}': {e}")
-            continue
-        for meal in meals:
+            return None
+
+    workers = max(1, min(workers, len(letters)))
+    with requests.Session() as session:
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(fetch, letters))
+
+
+@dataclass(frozen=True)
+class MealDBDelta:
+    """Changements d'une synchronisation TheMealDB.
+
+    Attributes:
+        added: idMeal des recettes nouvelles
+        updated: idMeal des recettes dont le contenu a changé
+        removed: idMeal des recettes disparues
+        positions: Pour chaque ligne du nouveau CSV, sa ligne dans l'ancien
+            CSV si la recette est inchangée (None = ligne re-convertie)
+        previous: Nombre de lignes de l'ancien CSV
+        fresh_rows: Lignes re-converties (ajoutées ou modifiées), dans
+            l'ordre du nouveau CSV
+    """
+
+    added: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    positions: list[int | None] = field(default_factory=list)
+    previous: int = 0
+    fresh_rows: list[dict[str, str]] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        """Vrai si le CSV a été réécrit (contenu ou ordre des recettes)."""
+        return self.positions != list(range(self.previous))
+
+
+def mealdb_hash(meal: dict[str, Any]) -> str:
+    """Empreinte du contenu brut d'une recette TheMealDB."""
+    payload = json.dumps(meal, sort_keys=True, ensure_ascii=False).encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _mealdb_row(meal: dict[str, Any]) -> dict[str, str] | None:
+    """Ligne CSV d'une recette TheMealDB (None si elle n'a aucun ingrédient)."""
+    ingredients: list[str] = []
+    for i in range(1, 21):
+        ing = meal.get(f"strIngredient{i}")
+        if ing and str(ing).strip():
+            ingredients.append(str(ing).strip().lower())
+    if not ingredients:
+        return None
+
+    area = str(meal.get("strArea") or "").strip().lower()
+    raw_tags = str(meal.get("strTags") or "").strip()
+    tags_list = []
+    if area:
+        tags_list.append(area)
+    if raw_tags:
+        tags_list.extend([t.strip().lower() for t in raw_tags.split(",") if t.strip()])
+    tags_value = ";".join(tags_list)
+
+    return {
+        "name": meal.get("strMeal") or "Unnamed Recipe",
+        "ingredients": ", ".join(ingredients),
+        "nutritions": "{}",
+        "tags": tags_value,
+        "image_url": meal.get("strMealThumb") or "",
+        "prep_time": "",
+        "diet_type": "",
+        "dish_type": meal.get("strCategory") or "",
+        "seasonal": "",
+        "category": meal.get("strCategory") or "",
+    }
+
+
+def _fetch_mealdb_catalogue() -> tuple[dict[str, dict[str, Any]], bool]:
+    """Récupère toutes les recettes TheMealDB, indexées par idMeal.
+
+    Returns:
+        (recettes dédupliquées dans l'ordre des lettres, False si au moins
+        une lettre a échoué)
+    """
+    settings = get_settings()
+    meals_by_id: dict[str, dict[str, Any]] = {}
+
+    logger.info("Chargement des données TheMealDB...", workers=settings.mealdb_workers)
+    results = _fetch_mealdb_letters(settings.mealdb_letters, settings.mealdb_workers)
+    for meals in results:
+        for meal in meals or []:
             meal_id = str(meal.get("idMeal", "")).strip()
             if meal_id:
                 meals_by_id[meal_id] = meal
+    return meals_by_id, all(meals is not None for meals in results)
+
 
-    rows: list[dict[str, Any]] = []
-    for meal in meals_by_id.values():
-        ingredients: list[str] = []
-        for i in range(1, 21):
-            ing = meal.get(f"strIngredient{i}")
-            if ing and str(ing).strip():
-                ingredients.append(str(ing).strip().lower())
-
-        area = str(meal.get("strArea") or "").strip().lower()
-        raw_tags = str(meal.get("strTags") or "").strip()
-        tags_list = []
-        if area:
-            tags_list.append(area)
-        if raw_tags:
-            tags_list.extend([t.strip().lower() for t in raw_tags.split(",") if t.strip()])
-        tags_value = ";".join(tags_list)
-
-        rows.append(
-            {
-                "name": meal.get("strMeal") or "Unnamed Recipe",
-                "ingredients": ", ".join(ingredients),
-                "nutritions": "{}",
-                "tags": tags_value,
-                "image_url": meal.get("strMealThumb") or "",
-                "prep_time": "",
-                "diet_type": "",
-                "dish_type": meal.get("strCategory") or "",
-                "seasonal": "",
-                "category": meal.get("strCategory") or "",
-            }
-        )
+def _write_mealdb_csv(
+    target_path: Path,
+    rows: list[dict[str, str]],
+    hashes: dict[str, str],
+) -> None:
+    """Écrit le CSV TheMealDB et le fichier d'empreintes de ses recettes.
 
+    Raises:
+        DataLoadError: Si aucune recette n'a été récupérée
+    """
     if not rows:
         raise DataLoadError(source="TheMealDB", reason="Aucune recette récupérée")
 
     df = pd.DataFrame(rows)
     target_path.parent.mkdir(parents=True, exist_ok=True)
     df.to_csv(target_path, index=False, encoding="utf-8")
+    # Empreintes dans l'ordre des lignes du CSV
+    mealdb_hashes_path(target_path).write_text(
+        json.dumps({"format": HASHES_FORMAT, "hashes": hashes}), encoding="utf-8"
+    )
     logger.info(f"Dataset TheMealDB généré: {len(df)} recettes")
 
 
-def load_recipes_df(force_refresh: bool = False) -> pd.DataFrame:
-    """Charge le DataFrame des recettes (avec cache fichier).
+def mealdb_hashes_path(csv_path: Path) -> Path:
+    """Fichier des empreintes par idMeal, à côté du CSV TheMealDB."""
+    return csv_path.with_suffix(".hashes.json")
+
+
+def _read_mealdb_hashes(csv_path: Path) -> dict[str, str]:
+    """Empreintes par idMeal du CSV actuel ({} si absentes ou illisibles)."""
+    try:
+        payload = json.loads(mealdb_hashes_path(csv_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(payload, dict) or payload.get("format") != HASHES_FORMAT:
+        return {}
+    return dict(payload.get("hashes") or {})
+
+
+def build_mealdb_csv(target_path: Path) -> None:
+    """Construit un CSV local depuis TheMealDB (avec images).
+
+    Les lettres sont récupérées en parallèle (`mealdb_workers`), puis
+    fusionnées dans l'ordre des lettres: le CSV produit est identique à
+    une récupération séquentielle. Une lettre en échec est ignorée. Les
+    recettes sans ingrédient (écartées au chargement) ne sont pas écrites:
+    une ligne du CSV = un repas.
+    """
+    meals_by_id, _ = _fetch_mealdb_catalogue()
+    rows: list[dict[str, str]] = []
+    hashes: dict[str, str] = {}
+    for meal_id, meal in meals_by_id.items():
+        row = _mealdb_row(meal)
+        if row is not None:
+            rows.append(row)
+            hashes[meal_id] = mealdb_hash(meal)
+    _write_mealdb_csv(target_path, rows, hashes)
+
+
+def sync_mealdb_csv(target_path: Path) -> MealDBDelta:
+    """Synchronise incrémentalement le CSV TheMealDB.
+
+    Chaque recette récupérée est comparée à l'empreinte enregistrée pour
+    son idMeal: seules les recettes nouvelles ou modifiées sont
+    re-converties, les lignes inchangées sont reprises telles quelles de
+    l'ancien CSV. Le CSV (et ses empreintes) n'est réécrit que s'il
+    change. Le résultat est identique à `build_mealdb_csv`.
+
+    Sans empreintes (premier lancement, ancien CSV), le CSV est reconstruit
+    entièrement. Si une lettre échoue, le CSV actuel est conservé: une
+    recette absente ne peut pas être distinguée d'une lettre manquante.
+
+    Args:
+        target_path: Chemin du CSV TheMealDB
+
+    Returns:
+        Delta appliqué (vide si rien n'a changé)
+
+    Raises:
+        DataLoadError: Si aucune recette n'a été récupérée
+    """
+    previous = _read_mealdb_hashes(target_path) if target_path.exists() else {}
+    old_rows: list[dict[str, str]] = []
+    if previous:
+        old_rows = pd.read_csv(
+            target_path, dtype=str, keep_default_na=False, encoding="utf-8"
+        ).to_dict("records")
+        if len(old_rows) != len(previous):
+            previous, old_rows = {}, []
+
+    meals_by_id, complete = _fetch_mealdb_catalogue()
+    if not complete and previous:
+        logger.warning("Synchronisation TheMealDB incomplète, CSV conservé")
+        return MealDBDelta(positions=list(range(len(previous))), previous=len(previous))
+
+    old_positions = {meal_id: position for position, meal_id in enumerate(previous)}
+    delta = MealDBDelta(previous=len(previous))
+    rows: list[dict[str, str]] = []
+    hashes: dict[str, str] = {}
+    for meal_id, meal in meals_by_id.items():
+        digest = mealdb_hash(meal)
+        position = old_positions.get(meal_id)
+        if position is not None and previous[meal_id] == digest:
+            rows.append(old_rows[position])
+            delta.positions.append(position)
+        else:
+            row = _mealdb_row(meal)
+            if row is None:
+                continue
+            (delta.added if position is None else delta.updated).append(meal_id)
+            rows.append(row)
+            delta.positions.append(None)
+            delta.fresh_rows.append(row)
+        hashes[meal_id] = digest
+    delta.removed.extend(meal_id for meal_id in previous if meal_id not in hashes)
+
+    if delta.changed or not rows:
+        _write_mealdb_csv(target_path, rows, hashes)
+    logger.info(
+        "Synchronisation TheMealDB",
+        added=len(delta.added),
+        updated=len(delta.updated),
+        removed=len(delta.removed),
+    )
+    return delta
+
+
+def ensure_recipes_csv(force_refresh: bool = False) -> Path:
+    """Garantit la présence du CSV local (construit ou téléchargé si absent).
 
     Args:
-        force_refresh: Force le re-téléchargement
+        force_refresh: Synchronise le CSV TheMealDB (incrémental) ou
+            re-télécharge le CSV distant
 
     Returns:
-        DataFrame pandas des recettes
+        Chemin du CSV local
 
     Raises:
-        DataLoadError: Si le chargement échoue
+        DataLoadError: Si la source est inaccessible
     """
     settings = get_settings()
     csv_path = settings.csv_path
 
-    # Source TheMealDB
+    # Source TheMealDB (rafraîchissement incrémental)
     if settings.data_source == "mealdb":
-        if force_refresh or not csv_path.exists():
+        if not csv_path.exists():
             build_mealdb_csv(csv_path)
+        elif force_refresh:
+            sync_mealdb_csv(csv_path)
     else:
         # Source CSV distante
         if force_refresh or not csv_path.exists():
             logger.info("Dataset non trouvé localement, téléchargement...")
             download_csv(settings.csv_url, csv_path)
 
+    return csv_path
+
+
+def recipes_frame(rows: list[dict[str, str]]) -> pd.DataFrame:
+    """DataFrame de lignes CSV, lu comme `read_recipe_chunks` (valeurs manquantes comprises).
+
+    Args:
+        rows: Lignes du CSV des recettes
+
+    Returns:
+        DataFrame des lignes
+    """
+    buffer = io.StringIO()
+    pd.DataFrame(rows).to_csv(buffer, index=False)
+    buffer.seek(0)
+    return pd.read_csv(buffer, dtype=str)
+
+
+def read_recipe_chunks(csv_path: Path, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Lit le CSV des recettes par paquets de lignes.
+
+    Seul le paquet courant est en mémoire. Toutes les colonnes sont lues en
+    chaînes (`dtype=str`): le type d'une colonne ne dépend pas des valeurs
+    du paquet, le résultat est le même quelle que soit la taille des paquets.
+
+    Args:
+        csv_path: Chemin du CSV local
+        chunk_rows: Nombre de lignes par paquet
+
+    Yields:
+        DataFrame de chaque paquet (index global des lignes)
+
+    Raises:
+        DataLoadError: Si le CSV est vide ou illisible
+    """
     try:
-        # Lecture avec gestion d'encodage
-        df = pd.read_csv(csv_path, encoding="utf-8")
-        logger.info(f"Dataset chargé: {len(df)} recettes")
-        return df
+        with pd.read_csv(csv_path, encoding="utf-8", dtype=str, chunksize=chunk_rows) as reader:
+            yield from reader
 
     except pd.errors.EmptyDataError as e:
         raise DataLoadError(
             source=str(csv_path),
             reason="Fichier CSV vide",
         ) from e
-    except Exception as e:
+    except (OSError, ValueError, pd.errors.ParserError) as e:
         raise DataLoadError(
             source=str(csv_path),
             reason=f"Erreur parsing CSV: {e}",
@@ -0,0 +1,148 @@
+"""Filtres combinables des recommandations.
+
+Les filtres sont évalués sur des bitsets construits depuis les posting
+lists de l'index (`IngredientIndex.terms_bitset`), puis appliqués aux
+repas candidats: aucun test Python n'est fait repas par repas.
+"""
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, replace
+
+from src.core.exceptions import ValidationError
+from src.services.attribute_index import ATTRIBUTES, AttributeName
+from src.services.nutrition_index import NUTRIENTS, NutrientName, NutritionRange
+
+
+def _normalize(values: Iterable[str] | None) -> frozenset[str]:
+    """Minuscules, trim, sans valeurs vides."""
+    return frozenset(v.strip().lower() for v in values or () if v and v.strip())
+
+
+def _nutrition_ranges(
+    ranges: Mapping[NutrientName, tuple[float | None, float | None]] | None,
+) -> tuple[NutritionRange, ...]:
+    """Plages nutritionnelles actives, dans l'ordre canonique des nutriments.
+
+    Raises:
+        ValidationError: Si une borne min dépasse la borne max
+    """
+    result: list[NutritionRange] = []
+    for name in NUTRIENTS:
+        minimum, maximum = (ranges or {}).get(name, (None, None))
+        if minimum is None and maximum is None:
+            continue
+        if minimum is not None and maximum is not None and minimum > maximum:
+            raise ValidationError(field=f"{name}_min", reason=f"supérieur à {name}_max")
+        result.append((name, minimum, maximum))
+    return tuple(result)
+
+
+def _check_max_missing(max_missing: int | None) -> None:
+    """Valide le nombre max d'ingrédients manquants.
+
+    Raises:
+        ValidationError: Si la valeur est négative
+    """
+    if max_missing is not None and max_missing < 0:
+        raise ValidationError(field="max_missing", reason="doit être positif ou nul")
+
+
+@dataclass(frozen=True)
+class MealFilters:
+    """Filtres appliqués aux repas candidats.
+
+    Attributes:
+        exclude_ingredients: Ingrédients interdits (allergies), match partiel
+        require_all: Le repas doit contenir tous les ingrédients demandés
+        cuisine, dish_type, diet_type, seasonal: Valeurs acceptées (une suffit)
+        tags: Tags requis (tous)
+        nutrition: Plages (nutriment, min, max) à respecter
+        max_missing: Nombre max d'ingrédients du repas non couverts par la
+            requête (None = pas de limite, 0 = repas faisables tout de suite)
+    """
+
+    exclude_ingredients: frozenset[str] = frozenset()
+    require_all: bool = False
+    cuisine: frozenset[str] = frozenset()
+    dish_type: frozenset[str] = frozenset()
+    diet_type: frozenset[str] = frozenset()
+    seasonal: frozenset[str] = frozenset()
+    tags: frozenset[str] = frozenset()
+    nutrition: tuple[NutritionRange, ...] = ()
+    max_missing: int | None = None
+
+    @classmethod
+    def create(
+        cls,
+        exclude_ingredients: Iterable[str] | None = None,
+        require_all: bool = False,
+        cuisine: Iterable[str] | None = None,
+        dish_type: Iterable[str] | None = None,
+        diet_type: Iterable[str] | None = None,
+        seasonal: Iterable[str] | None = None,
+        tags: Iterable[str] | None = None,
+        nutrition: Mapping[NutrientName, tuple[float | None, float | None]] | None = None,
+        max_missing: int | None = None,
+    ) -> "MealFilters":
+        """Construit des filtres à partir de valeurs brutes (query params).
+
+        Raises:
+            ValidationError: Plage nutritionnelle incohérente (min > max)
+                ou nombre d'ingrédients manquants négatif
+        """
+        _check_max_missing(max_missing)
+        return cls(
+            exclude_ingredients=_normalize(exclude_ingredients),
+            require_all=require_all,
+            cuisine=_normalize(cuisine),
+            dish_type=_normalize(dish_type),
+            diet_type=_normalize(diet_type),
+            seasonal=_normalize(seasonal),
+            tags=_normalize(tags),
+            nutrition=_nutrition_ranges(nutrition),
+            max_missing=max_missing,
+        )
+
+    def with_ingredients(
+        self,
+        exclude_ingredients: Iterable[str] | None = None,
+        require_all: bool = False,
+        max_missing: int | None = None,
+    ) -> "MealFilters":
+        """Copie des filtres avec les filtres d'ingrédients renseignés.
+
+        Raises:
+            ValidationError: Nombre d'ingrédients manquants négatif
+        """
+        _check_max_missing(max_missing)
+        return replace(
+            self,
+            exclude_ingredients=_normalize(exclude_ingredients),
+            require_all=require_all,
+            max_missing=max_missing,
+        )
+
+    def attributes(self) -> dict[AttributeName, frozenset[str]]:
+        """Filtres d'attributs actifs (cuisine, type de plat, tags...)."""
+        return {a: getattr(self, a) for a in ATTRIBUTES if getattr(self, a)}
+
+    @property
+    def is_empty(self) -> bool:
+        """Vrai si aucun filtre n'est actif."""
+        return (
+            not self.exclude_ingredients
+            and not self.require_all
+            and not self.attributes()
+            and not self.nutrition
+            and self.max_missing is None
+        )
+
+    def key(self) -> tuple[object, ...]:
+        """Forme canonique (triée) pour les clés de cache et de curseur."""
+        return (
+            tuple(sorted(self.exclude_ingredients)),
+            self.require_all,
+            *(tuple(sorted(getattr(self, a))) for a in ATTRIBUTES),
+            self.nutrition,
+            self.max_missing,
+        )
@@ -0,0 +1,527 @@
+"""Index inversé des ingrédients.
+
+Construit une seule fois par chargement du dataset, il remplace le scan
+complet repas x ingrédients x tokens de `recommend_meals`:
+- Vocabulaire des ingrédients distincts, compilé en ids entiers
+  (voir `src/services/vocabulary.py`)
+- Posting lists: ingrédient -> ids des repas qui le contiennent
+- Index de trigrammes sur le vocabulaire pour conserver le match partiel
+  ("chicken" match "chicken breast") sans parcourir tous les repas
+- Matrice d'incidence creuse (backend de scoring vectorisé)
+- Statistiques BM25 (IDF des ingrédients, longueur des recettes) et poids
+  BM25 précalculés pour chaque entrée des posting lists
+- Bornes supérieures des poids de chaque terme (top-k MaxScore)
+- Nombre d'ingrédients de chaque repas (ingrédients manquants d'une requête)
+- Index de trigrammes sur les mots du vocabulaire pour corriger les fautes
+  de frappe ("chiken" -> "chicken") sans distance d'édition exhaustive
+- Automate d'Aho-Corasick sur le vocabulaire pour extraire les ingrédients
+  d'un texte libre en un seul passage
+- Index secondaires des attributs (cuisine, type de plat, régime, saison,
+  tags), voir `src/services/attribute_index.py`
+- Colonnes nutritionnelles NumPy triées (filtres par plage, tri), voir
+  `src/services/nutrition_index.py`
+
+L'id d'un repas est sa position dans la liste fournie à l'index.
+"""
+
+import hashlib
+import itertools
+from collections import Counter
+from collections.abc import Collection, Iterable, Sequence
+from typing import Literal
+
+import numpy as np
+
+from src.core.logging import get_logger
+from src.models.schemas import Meal
+from src.services import bitset
+from src.services.aho_corasick import AhoCorasick
+from src.services.attribute_index import ATTRIBUTES, AttributeIndex
+from src.services.max_score import EPSILON, MaxScoreStats, max_score_top_k
+from src.services.meal_store import MealStore
+from src.services.nutrition_index import NutritionColumns
+from src.services.sparse_matrix import FloatArray, IncidenceMatrix
+from src.services.vocabulary import CompiledIngredients, compile_ingredients
+
+logger = get_logger(__name__)
+
+NGRAM_SIZE = 3
+
+# Modes de classement:
+# - count: nombre d'ingrédients matchés (historique)
+# - bm25: matchs pondérés par la rareté de l'ingrédient, normalisés par la
+#   longueur de la recette (les recettes longues et "salt" pèsent moins)
+RankingMode = Literal["count", "bm25"]
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Correction orthographique: similarité de Jaccard minimale entre les
+# trigrammes d'un mot saisi et ceux d'un mot du vocabulaire, et nombre max
+# de corrections retenues par mot
+FUZZY_THRESHOLD = 0.4
+FUZZY_MAX_CANDIDATES = 3
+
+# Terminaisons tolérées après un ingrédient du texte libre (pluriels)
+PLURAL_SUFFIXES = ("", "s", "es")
+
+
+def _ngrams(text: str, size: int = NGRAM_SIZE) -> set[str]:
+    """Découpe une chaîne en n-grammes de caractères.
+
+    Exemple:
+        >>> sorted(_ngrams("rice"))
+        ['ice', 'ric']
+    """
+    return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+
+def _padded_trigrams(word: str) -> set[str]:
+    """Trigrammes d'un mot encadré d'espaces (pèse le début et la fin du mot).
+
+    Exemple:
+        >>> sorted(_padded_trigrams("egg"))
+        ['  e', ' eg', 'egg', 'gg ']
+    """
+    return _ngrams(f"  {word} ")
+
+
+def _is_whole_word(text: str, start: int, end: int) -> bool:
+    """Vérifie qu'une occurrence n'est pas un morceau de mot ("rice" dans "price").
+
+    Un pluriel simple est toléré: "tomato" est reconnu dans "tomatoes".
+    """
+    if start > 0 and text[start - 1].isalnum():
+        return False
+    for suffix in PLURAL_SUFFIXES:
+        stop = end + len(suffix)
+        if text.startswith(suffix, end) and (stop == len(text) or not text[stop].isalnum()):
+            return True
+    return False
+
+
+class IngredientIndex:
+    """Index inversé ingrédient -> repas, avec recherche par sous-chaîne.
+
+    Attributes:
+        version: Empreinte du contenu indexé (clé des caches de résultats et
+            des curseurs de pagination, identique d'un worker à l'autre)
+        meals: Liste des repas indexés (l'id d'un repas = sa position)
+        compiled: Ingrédients de chaque repas en ids entiers
+        sizes: Nombre d'ingrédients de chaque repas (doublons inclus)
+        vocabulary: Ingrédients distincts, l'id d'un terme = sa position
+        postings: Pour chaque terme, ids triés des repas qui le contiennent
+        frequencies: Pour chaque terme, nombre d'occurrences dans chaque repas
+            (aligné sur `postings`)
+        matrix: Matrice d'incidence repas x termes (backend "sparse")
+        idf: IDF BM25 de chaque terme
+        bm25_data: Poids BM25 de chaque entrée, alignés sur les colonnes
+            de `matrix` (backend "sparse")
+        bm25_weights: Poids BM25 alignés sur `postings` (backend "index")
+        max_frequencies, max_bm25: Poids maximal de chaque terme, pour
+            chaque mode de classement (bornes MaxScore)
+        words: Mots distincts du vocabulaire (correction orthographique)
+        automaton: Automate d'Aho-Corasick du vocabulaire (texte libre)
+        attributes: Index des attributs (cuisine, type de plat, tags...)
+        nutrition: Colonnes nutritionnelles et leur ordre trié
+    """
+
+    def __init__(
+        self,
+        meals: Sequence[Meal],
+        compiled: CompiledIngredients | None = None,
+        attributes: AttributeIndex | None = None,
+        nutrition: NutritionColumns | None = None,
+    ):
+        """Construit l'index depuis les ingrédients compilés en ids.
+
+        Args:
+            meals: Repas à indexer (l'id d'un repas = sa position)
+            compiled: Ingrédients déjà compilés (compilés ici si None)
+            attributes: Index des attributs déjà construit (construit ici si None)
+            nutrition: Colonnes nutritionnelles déjà extraites (extraites ici si None)
+        """
+        self.meals = meals
+        self.compiled = compiled if compiled is not None else compile_ingredients(meals)
+        self.vocabulary: list[str] = self.compiled.vocabulary.terms
+        self.sizes = self.compiled.lengths
+        self._ngram_index: dict[str, set[int]] = {}
+        self.words: list[str] = []
+        self._word_ids: dict[str, int] = {}
+        self._word_grams: dict[str, list[int]] = {}
+        self._word_gram_sizes: list[int] = []
+
+        # Index de sous-chaînes et de correction: un passage sur le vocabulaire
+        for term_id, term in enumerate(self.vocabulary):
+            for gram in _ngrams(term):
+                self._ngram_index.setdefault(gram, set()).add(term_id)
+            for word in term.split():
+                self._add_word(word)
+
+        self.automaton = AhoCorasick(self.vocabulary)
+        self.attributes = attributes if attributes is not None else AttributeIndex(meals)
+        self.nutrition = nutrition if nutrition is not None else NutritionColumns(meals)
+
+        # Matrice et posting lists: calculées sur les ids entiers
+        self.matrix = IncidenceMatrix.from_ingredients(self.compiled)
+        bounds = self.matrix.col_indptr.tolist()
+        col_rows = self.matrix.col_rows.tolist()
+        col_counts = self.matrix.col_data.astype(np.int64).tolist()
+        self.postings: list[list[int]] = [
+            col_rows[start:end] for start, end in itertools.pairwise(bounds)
+        ]
+        self.frequencies: list[list[int]] = [
+            col_counts[start:end] for start, end in itertools.pairwise(bounds)
+        ]
+
+        self.idf, self.bm25_data = self._bm25_statistics()
+        bm25 = self.bm25_data.tolist()
+        self.bm25_weights: list[list[float]] = [
+            bm25[start:end] for start, end in itertools.pairwise(bounds)
+        ]
+        self.max_frequencies: list[float] = [max(f, default=0) for f in self.frequencies]
+        self.max_bm25: list[float] = [max(w, default=0.0) for w in self.bm25_weights]
+
+        fingerprint = hashlib.blake2b(digest_size=8)
+        # Noms lus en colonne sur un store columnaire (aucun Meal construit)
+        names = meals.column("name") if isinstance(meals, MealStore) else [m.name for m in meals]
+        fingerprint.update("\x1f".join(name or "" for name in names).encode())
+        fingerprint.update("\x1f".join(self.vocabulary).encode())
+        fingerprint.update(self.compiled.indptr.tobytes())
+        fingerprint.update(self.compiled.ids.tobytes())
+        for attribute in ATTRIBUTES:
+            for value, ids in sorted(self.attributes.ids[attribute].items()):
+                fingerprint.update(f"\x1f{attribute}={value}".encode())
+                fingerprint.update(ids.tobytes())
+        for column in self.nutrition.columns.values():
+            fingerprint.update(column.tobytes())
+        self.version = fingerprint.hexdigest()
+
+        logger.info(
+            "Index ingrédients construit",
+            meals=len(meals),
+            vocabulary=len(self.vocabulary),
+        )
+
+    def _add_word(self, word: str) -> None:
+        """Ajoute un mot à l'index de trigrammes de correction."""
+        if word in self._word_ids:
+            return
+        word_id = len(self.words)
+        self._word_ids[word] = word_id
+        self.words.append(word)
+        grams = _padded_trigrams(word)
+        self._word_gram_sizes.append(len(grams))
+        for gram in grams:
+            self._word_grams.setdefault(gram, []).append(word_id)
+
+    def _bm25_statistics(self) -> tuple[FloatArray, FloatArray]:
+        """Précalcule l'IDF des termes et le poids BM25 de chaque entrée.
+
+        Le poids d'un terme t dans un repas m vaut
+        `idf(t) * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(m) / avg_len))`,
+        où `len(m)` est le nombre d'ingrédients du repas. Une requête se
+        réduit alors à une somme de poids sur les posting lists.
+
+        Returns:
+            (IDF par terme, poids BM25 par entrée au format CSC)
+        """
+        matrix = self.matrix
+        n_meals, n_terms = matrix.shape
+        doc_freq = np.diff(matrix.col_indptr)
+        idf: FloatArray = np.log1p((n_meals - doc_freq + 0.5) / (doc_freq + 0.5))
+
+        lengths = self.compiled.lengths.astype(np.float64)
+        avg_length = float(lengths.mean()) if n_meals else 1.0
+        tf = matrix.col_data
+        norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * lengths[matrix.col_rows] / avg_length)
+        term_of_entry = np.repeat(np.arange(n_terms), doc_freq)
+        weights: FloatArray = idf[term_of_entry] * tf * (BM25_K1 + 1) / norm
+        return idf, weights
+
+    def expand(self, token: str) -> set[int]:
+        """Trouve les termes du vocabulaire contenant `token`.
+
+        Les tokens d'au moins 3 caractères passent par l'intersection des
+        trigrammes (puis vérification), les plus courts par un parcours du
+        vocabulaire (distinct, donc bien plus petit que le dataset).
+
+        Args:
+            token: Ingrédient utilisateur normalisé
+
+        Returns:
+            Ids des termes matchés
+        """
+        if len(token) < NGRAM_SIZE:
+            return {tid for tid, term in enumerate(self.vocabulary) if token in term}
+
+        candidates: set[int] | None = None
+        for gram in sorted(_ngrams(token), key=lambda g: len(self._ngram_index.get(g, ()))):
+            ids = self._ngram_index.get(gram)
+            if not ids:
+                return set()
+            candidates = set(ids) if candidates is None else candidates & ids
+            if not candidates:
+                return set()
+
+        return {tid for tid in candidates or () if token in self.vocabulary[tid]}
+
+    def closest_words(self, word: str) -> list[str]:
+        """Mots du vocabulaire les plus proches d'un mot mal orthographié.
+
+        Seuls les mots partageant au moins un trigramme sont visités (via
+        l'index), puis classés par similarité de Jaccard des trigrammes.
+
+        Args:
+            word: Mot saisi par l'utilisateur
+
+        Returns:
+            Jusqu'à FUZZY_MAX_CANDIDATES mots, du plus proche au moins proche
+        """
+        grams = _padded_trigrams(word)
+        shared: Counter[int] = Counter()
+        for gram in grams:
+            shared.update(self._word_grams.get(gram, ()))
+
+        similarities = []
+        for word_id, count in shared.items():
+            union = len(grams) + self._word_gram_sizes[word_id] - count
+            similarity = count / union
+            if similarity >= FUZZY_THRESHOLD:
+                similarities.append((-similarity, self.words[word_id]))
+
+        similarities.sort()
+        return [candidate for _, candidate in similarities[:FUZZY_MAX_CANDIDATES]]
+
+    def correct(self, token: str) -> list[str]:
+        """Propose des corrections d'un token, mot par mot.
+
+        Les mots déjà présents dans le vocabulaire sont conservés, les autres
+        remplacés par leurs plus proches voisins.
+
+        Exemple:
+            "parmesean cheese" -> ["parmesan cheese"]
+
+        Returns:
+            Tokens corrigés (vide si un mot n'a aucun voisin)
+        """
+        options = []
+        for word in token.split():
+            candidates = [word] if word in self._word_ids else self.closest_words(word)
+            if not candidates:
+                return []
+            options.append(candidates)
+
+        combos = itertools.islice(itertools.product(*options), FUZZY_MAX_CANDIDATES**2)
+        return [" ".join(combo) for combo in combos]
+
+    def match_terms(self, tokens: Iterable[str], fuzzy: bool = False) -> set[int]:
+        """Union des termes matchés par au moins un token utilisateur.
+
+        Args:
+            tokens: Ingrédients utilisateur normalisés
+            fuzzy: Corrige les tokens sans aucun match (fautes de frappe)
+
+        Returns:
+            Ids des termes matchés
+        """
+        matched: set[int] = set()
+        for token in tokens:
+            expanded = self.expand(token)
+            if not expanded and fuzzy:
+                for corrected in self.correct(token):
+                    expanded |= self.expand(corrected)
+                if expanded:
+                    logger.debug("Correction orthographique", token=token)
+            matched |= expanded
+        return matched
+
+    def extract(self, text: str) -> list[str]:
+        """Extrait les ingrédients connus d'un texte libre.
+
+        Un seul passage de l'automate sur le texte, quelle que soit la
+        taille du vocabulaire. Seuls les mots entiers sont retenus et, en
+        cas de chevauchement, l'occurrence la plus à gauche puis la plus
+        longue ("chicken thigh" plutôt que "chicken").
+
+        Args:
+            text: Texte libre (ex: "2 chicken thighs, some rice")
+
+        Returns:
+            Termes du vocabulaire trouvés, dans l'ordre du texte, sans doublon
+
+        Exemple:
+            >>> index.extract("I have 2 chicken thighs and old tomatoes")
+            ['chicken thigh', 'tomato']
+        """
+        text = text.lower()
+        matches = sorted(
+            (start, -end, term_id)
+            for start, end, term_id in self.automaton.iter_matches(text)
+            if _is_whole_word(text, start, end)
+        )
+
+        found: dict[str, None] = {}
+        position = 0
+        for start, neg_end, term_id in matches:
+            if start < position:
+                continue
+            found.setdefault(self.vocabulary[term_id])
+            position = -neg_end
+        return list(found)
+
+    def terms_bitset(self, terms: Iterable[int]) -> int:
+        """Bitset des repas contenant au moins un des termes.
+
+        Construit à la demande depuis les colonnes de `matrix`: seuls les
+        termes de la requête sont convertis, aucun bitset n'est gardé par
+        terme du vocabulaire (mémoire O(vocabulaire x repas) sinon).
+        """
+        indptr, rows = self.matrix.col_indptr, self.matrix.col_rows
+        ids = [rows[indptr[term_id] : indptr[term_id + 1]] for term_id in terms]
+        return bitset.from_ids(np.concatenate(ids) if ids else [], len(self.meals))
+
+    def filter_bitset(
+        self,
+        tokens: Iterable[str],
+        exclude: Iterable[str] = (),
+        require_all: bool = False,
+        fuzzy: bool = False,
+    ) -> int | None:
+        """Bitset des repas autorisés par les filtres d'inclusion/exclusion.
+
+        - `require_all`: pour chaque token, OU des bitsets de ses termes,
+          puis ET entre tokens (le repas contient tous les ingrédients)
+        - `exclude`: ET NON du OU des bitsets des termes exclus (allergies)
+
+        Args:
+            tokens: Ingrédients utilisateur normalisés
+            exclude: Ingrédients à exclure, normalisés (match partiel)
+            require_all: Exige que chaque token soit présent dans le repas
+            fuzzy: Corrige les tokens sans aucun match (fautes de frappe)
+
+        Returns:
+            Bitset des repas autorisés, None si aucun filtre
+        """
+        exclude = list(exclude)
+        if not require_all and not exclude:
+            return None
+
+        allowed = bitset.full(len(self.meals))
+        if require_all:
+            for token in tokens:
+                allowed &= self.terms_bitset(self.match_terms([token], fuzzy))
+        if exclude:
+            allowed &= ~self.terms_bitset(self.match_terms(exclude, fuzzy))
+        return allowed
+
+    def top_k(
+        self,
+        tokens: Iterable[str],
+        k: int,
+        ranking: RankingMode = "count",
+        fuzzy: bool = False,
+        allowed: int | None = None,
+    ) -> tuple[list[int], MaxScoreStats]:
+        """Top-k des repas avec terminaison anticipée (MaxScore).
+
+        Même classement que `score` suivi d'un tri complet (score
+        décroissant, puis id), sans scorer les repas qui ne peuvent plus
+        entrer dans le top-k.
+
+        Args:
+            tokens: Ingrédients utilisateur normalisés
+            k: Nombre de repas à retourner
+            ranking: "count" (nombre d'ingrédients matchés) ou "bm25"
+            fuzzy: Corrige les tokens sans aucun match (fautes de frappe)
+            allowed: Bitset des repas autorisés par les filtres (None = tous)
+
+        Returns:
+            (ids classés, statistiques: repas matchés et complètement scorés)
+        """
+        terms = list(self.match_terms(tokens, fuzzy))
+        matched = self.terms_bitset(terms)
+        if allowed is not None:
+            matched &= allowed
+
+        # Comptes entiers: sommes exactes, pas de marge d'arrondi
+        weights: Sequence[Sequence[float]] = self.frequencies
+        bounds, margin = self.max_frequencies, 0.0
+        if ranking == "bm25":
+            weights, bounds, margin = self.bm25_weights, self.max_bm25, EPSILON
+        mask = None if allowed is None else bitset.to_mask(allowed, len(self.meals))
+        ranked, evaluated = max_score_top_k(self.postings, weights, bounds, terms, k, mask, margin)
+        return ranked, MaxScoreStats(matched=matched.bit_count(), evaluated=evaluated)
+
+    def score(
+        self,
+        tokens: Iterable[str],
+        ranking: RankingMode = "count",
+        fuzzy: bool = False,
+    ) -> dict[int, float]:
+        """Score chaque repas candidat en sommant ses posting lists.
+
+        Un ingrédient du repas compte dès qu'un token utilisateur y est
+        contenu (même sémantique que le scan historique).
+
+        Args:
+            tokens: Ingrédients utilisateur normalisés
+            ranking: "count" (nombre d'ingrédients matchés) ou "bm25"
+            fuzzy: Corrige les tokens sans aucun match (fautes de frappe)
+
+        Returns:
+            Dict id repas -> score (> 0 uniquement)
+        """
+        weights = self.bm25_weights if ranking == "bm25" else self.frequencies
+        scores: dict[int, float] = {}
+        for term_id in self.match_terms(tokens, fuzzy):
+            for meal_id, weight in zip(self.postings[term_id], weights[term_id], strict=True):
+                scores[meal_id] = scores.get(meal_id, 0) + weight
+        return scores
+
+    def score_matches(
+        self,
+        tokens: Iterable[str],
+        ranking: RankingMode = "count",
+        fuzzy: bool = False,
+    ) -> tuple[dict[int, float], dict[int, int]]:
+        """Comme `score`, avec le nombre d'ingrédients matchés de chaque repas.
+
+        Scores et comptes sont accumulés dans le même passage sur les
+        posting lists: le nombre d'ingrédients manquants d'un repas vaut
+        `sizes[meal_id] - matches[meal_id]`.
+
+        Args:
+            tokens: Ingrédients utilisateur normalisés
+            ranking: "count" (nombre d'ingrédients matchés) ou "bm25"
+            fuzzy: Corrige les tokens sans aucun match (fautes de frappe)
+
+        Returns:
+            (id repas -> score, id repas -> ingrédients matchés, doublons inclus)
+        """
+        weights = self.bm25_weights if ranking == "bm25" else self.frequencies
+        scores: dict[int, float] = {}
+        matches: dict[int, int] = {}
+        for term_id in self.match_terms(tokens, fuzzy):
+            for meal_id, weight, count in zip(
+                self.postings[term_id], weights[term_id], self.frequencies[term_id], strict=True
+            ):
+                scores[meal_id] = scores.get(meal_id, 0) + weight
+                matches[meal_id] = matches.get(meal_id, 0) + count
+        return scores, matches
+
+    def missing_ingredients(self, meal_id: int, terms: Collection[int]) -> list[str]:
+        """Ingrédients d'un repas non couverts par les termes d'une requête.
+
+        Args:
+            meal_id: Id du repas
+            terms: Termes matchés par la requête (voir `match_terms`)
+
+        Returns:
+            Ingrédients manquants, dans l'ordre de la recette
+        """
+        term_ids = self.compiled.ingredient_ids(meal_id).tolist()
+        return [
+            ingredient
+            for ingredient, term_id in zip(self.meals[meal_id].ingredients, term_ids, strict=True)
+            if term_id not in terms
+        ]
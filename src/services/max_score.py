@@ -0,0 +1,153 @@
+"""Sélection top-k avec terminaison anticipée (MaxScore).
+
+Chaque terme du vocabulaire a une borne supérieure: le plus grand poids
+de sa posting list. Les termes de la requête sont triés par borne
+croissante; tant que la somme des bornes des plus petits termes ne dépasse
+pas le seuil du top-k courant (k-ième meilleur score), un repas présent
+uniquement dans ces listes "non essentielles" ne peut plus entrer dans le
+top-k: seules les listes essentielles sont parcourues. Un candidat est
+abandonné dès que son score partiel plus les bornes restantes ne peut plus
+dépasser le seuil.
+
+Le classement est exactement celui du scoring exhaustif (score décroissant
+puis id croissant): les candidats sont visités par id croissant, et les
+scores retenus sont sommés dans le même ordre de termes.
+"""
+
+import heapq
+from bisect import bisect_left
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+# Marge d'élagage: un candidat dont la borne est à moins de EPSILON du
+# seuil est évalué complètement (arrondis flottants des sommes BM25).
+# Inutile pour des poids entiers (sommes exactes).
+EPSILON = 1e-9
+
+
+@dataclass(frozen=True)
+class MaxScoreStats:
+    """Statistiques d'une sélection MaxScore.
+
+    Attributes:
+        matched: Repas matchés par au moins un terme (et autorisés)
+        evaluated: Repas complètement scorés
+    """
+
+    matched: int
+    evaluated: int
+
+    @property
+    def pruned(self) -> int:
+        """Repas écartés sans score complet."""
+        return self.matched - self.evaluated
+
+
+def max_score_top_k(
+    postings: Sequence[Sequence[int]],
+    weights: Sequence[Sequence[float]],
+    upper_bounds: Sequence[float],
+    terms: Sequence[int],
+    k: int,
+    allowed: npt.NDArray[np.bool_] | None = None,
+    margin: float = EPSILON,
+) -> tuple[list[int], int]:
+    """Top-k des repas par somme des poids, avec élagage MaxScore.
+
+    Args:
+        postings: Posting list (ids croissants) de chaque terme
+        weights: Poids alignés sur `postings`
+        upper_bounds: Poids maximal de chaque terme
+        terms: Termes de la requête (ordre de sommation des scores)
+        k: Nombre de repas à retourner
+        allowed: Masque des repas autorisés (None = tous)
+        margin: Marge d'élagage (0 si les poids sont entiers)
+
+    Returns:
+        (ids classés par score décroissant puis id, nombre de repas
+        complètement scorés)
+    """
+    if k <= 0 or not terms:
+        return [], 0
+
+    # Ordre de sommation (identique au scoring exhaustif) vs ordre des bornes
+    position = {term: i for i, term in enumerate(terms)}
+    by_bound = sorted(terms, key=lambda t: upper_bounds[t])
+    prefix = [0.0]
+    for term in by_bound:
+        prefix.append(prefix[-1] + upper_bounds[term])
+
+    cursors = dict.fromkeys(terms, 0)
+    heap: list[tuple[float, int]] = []  # (score, -id): la racine est le plus faible
+    threshold = -1.0
+    essential_from = 0  # by_bound[:essential_from] = termes non essentiels
+    evaluated = 0
+
+    while True:
+        # Prochain candidat: plus petit id courant des listes essentielles
+        candidate = -1
+        for term in by_bound[essential_from:]:
+            cursor = cursors[term]
+            if cursor < len(postings[term]):
+                meal_id = postings[term][cursor]
+                if candidate < 0 or meal_id < candidate:
+                    candidate = meal_id
+        if candidate < 0:
+            break
+
+        contributions: list[float | None] = [None] * len(terms)
+        partial = 0.0
+        for term in by_bound[essential_from:]:
+            cursor = cursors[term]
+            if cursor < len(postings[term]) and postings[term][cursor] == candidate:
+                weight = weights[term][cursor]
+                contributions[position[term]] = weight
+                partial += weight
+                cursors[term] = cursor + 1
+
+        if allowed is not None and not allowed[candidate]:
+            continue
+
+        # Listes non essentielles, de la plus forte borne à la plus faible
+        full = len(heap) >= k
+        pruned = False
+        for rank in range(essential_from - 1, -1, -1):
+            if full and partial + prefix[rank + 1] + margin <= threshold:
+                pruned = True
+                break
+            term = by_bound[rank]
+            plist = postings[term]
+            cursor = bisect_left(plist, candidate, cursors[term])
+            cursors[term] = cursor
+            if cursor < len(plist) and plist[cursor] == candidate:
+                weight = weights[term][cursor]
+                contributions[position[term]] = weight
+                partial += weight
+        if pruned or (full and partial + margin <= threshold):
+            continue
+
+        evaluated += 1
+        score = 0.0
+        for contribution in contributions:
+            if contribution is not None:
+                score += contribution
+        if not full:
+            heapq.heappush(heap, (score, -candidate))
+        elif score > threshold:
+            # À score égal, le candidat (id plus grand) perd face au top-k
+            heapq.heapreplace(heap, (score, -candidate))
+        else:
+            continue
+
+        if len(heap) >= k:
+            threshold = heap[0][0]
+            while (
+                essential_from < len(by_bound) and prefix[essential_from + 1] + margin <= threshold
+            ):
+                essential_from += 1
+
+    ranked = sorted(heap, key=lambda entry: (-entry[0], -entry[1]))
+    return [-neg_id for _, neg_id in ranked], evaluated
@@ -0,0 +1,301 @@
+"""Store columnaire des repas, en lecture seule.
+
+Au lieu d'une liste d'objets `Meal` par worker uvicorn, les repas sont
+gardés en colonnes: chaînes concaténées en arènes UTF-8 + offsets (noms,
+URLs, temps de préparation...), ingrédients en ids compilés (CSR), tags en
+arène + CSR, nutrition en matrice float64. Les tableaux sont des vues sur
+le snapshot du dataset mappé en mémoire (`src.services.snapshot`): tous
+les workers partagent les mêmes pages du cache disque.
+
+Un `Meal` n'est construit qu'à l'accès (`store[meal_id]`), au moment de
+répondre: le store se comporte comme une `Sequence[Meal]` immuable.
+
+`MealStoreBuilder` construit le store par paquets de repas (lecture du CSV
+par paquets de lignes): chaque paquet est encodé en colonnes dès son
+ajout, la liste complète des `Meal` n'existe jamais en mémoire.
+"""
+
+import itertools
+from collections.abc import Iterator, Mapping, Sequence
+from typing import Any, overload
+
+import numpy as np
+import numpy.typing as npt
+
+from src.models.schemas import Meal, NutritionInfo
+from src.services.attribute_index import ATTRIBUTES, AttributeName, attribute_values
+from src.services.nutrition_index import NUTRIENTS
+from src.services.sparse_matrix import FloatArray, IntArray
+from src.services.vocabulary import CompiledIngredients, IngredientVocabulary, TermIdArray
+
+# Champs texte optionnels de `Meal` (None conservé via un masque)
+TEXT_FIELDS = ("name", "cuisine", "image", "prep_time", "diet_type", "dish_type", "seasonal")
+
+
+class StringArena:
+    """Chaînes concaténées dans un buffer UTF-8, avec leurs offsets en octets.
+
+    Attributes:
+        data: Octets UTF-8 de toutes les chaînes
+        offsets: La chaîne i est `data[offsets[i]:offsets[i + 1]]`
+    """
+
+    def __init__(self, data: npt.NDArray[np.uint8], offsets: IntArray):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def pack(cls, values: Sequence[str]) -> "StringArena":
+        """Concatène des chaînes en une arène."""
+        encoded = [value.encode() for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets)
+
+    @classmethod
+    def concat(cls, arenas: Sequence["StringArena"]) -> "StringArena":
+        """Concatène des arènes, dans l'ordre (offsets décalés)."""
+        shifts = np.cumsum([0, *(arena.offsets[-1] for arena in arenas)], dtype=np.int64)
+        offsets = [np.zeros(1, dtype=np.int64)]
+        offsets += [arena.offsets[1:] + shift for arena, shift in zip(arenas, shifts, strict=False)]
+        data = [np.empty(0, dtype=np.uint8), *(arena.data for arena in arenas)]
+        return cls(np.concatenate(data), np.concatenate(offsets))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def get(self, position: int) -> str:
+        """Décode une seule chaîne."""
+        start, end = int(self.offsets[position]), int(self.offsets[position + 1])
+        return self.data[start:end].tobytes().decode()
+
+    def slice(self, start: int, stop: int) -> list[str]:
+        """Décode les chaînes [start, stop)."""
+        offsets = self.offsets[start : stop + 1].tolist()
+        raw = self.data[offsets[0] : offsets[-1]].tobytes() if offsets else b""
+        base = offsets[0] if offsets else 0
+        return [raw[a - base : b - base].decode() for a, b in itertools.pairwise(offsets)]
+
+    def tolist(self) -> list[str]:
+        """Décode toutes les chaînes (une seule copie du buffer)."""
+        return self.slice(0, len(self))
+
+
+class MealStore(Sequence[Meal]):
+    """Repas en colonnes, construits à la demande.
+
+    Attributes:
+        compiled: Ingrédients compilés en ids (vocabulaire en mémoire)
+        nutrition: Valeurs nutritionnelles, une ligne par repas (ordre `NUTRIENTS`)
+        texts: Arène de chaque champ texte de `TEXT_FIELDS`
+        nulls: Masque des valeurs None de chaque champ texte
+        tags: Arène de tous les tags, concaténés
+        tags_indptr: Les tags du repas i sont `tags[tags_indptr[i]:tags_indptr[i + 1]]`
+    """
+
+    def __init__(
+        self,
+        compiled: CompiledIngredients,
+        nutrition: FloatArray,
+        texts: Mapping[str, StringArena],
+        nulls: Mapping[str, npt.NDArray[np.bool_]],
+        tags: StringArena,
+        tags_indptr: IntArray,
+    ):
+        self.compiled = compiled
+        self.nutrition = nutrition
+        self.texts = dict(texts)
+        self.nulls = dict(nulls)
+        self.tags = tags
+        self.tags_indptr = tags_indptr
+
+    def __len__(self) -> int:
+        return self.compiled.n_meals
+
+    @overload
+    def __getitem__(self, position: int) -> Meal: ...
+
+    @overload
+    def __getitem__(self, position: slice) -> list[Meal]: ...
+
+    def __getitem__(self, position: int | slice) -> Meal | list[Meal]:
+        if isinstance(position, slice):
+            return [self._meal(meal_id) for meal_id in range(*position.indices(len(self)))]
+        meal_id = position + len(self) if position < 0 else position
+        if not 0 <= meal_id < len(self):
+            raise IndexError(position)
+        return self._meal(meal_id)
+
+    def __iter__(self) -> Iterator[Meal]:
+        for meal_id in range(len(self)):
+            yield self._meal(meal_id)
+
+    def column(self, field: str) -> list[str | None]:
+        """Valeurs d'un champ texte pour tous les repas, sans construire de `Meal`."""
+        nulls = self.nulls[field].tolist()
+        values = self.texts[field].tolist()
+        return [None if null else value for value, null in zip(values, nulls, strict=True)]
+
+    def _text(self, field: str, meal_id: int) -> str | None:
+        if self.nulls[field][meal_id]:
+            return None
+        return self.texts[field].get(meal_id)
+
+    def _meal(self, meal_id: int) -> Meal:
+        """Construit un repas depuis les colonnes (valeurs déjà validées)."""
+        start, end = self.tags_indptr[meal_id : meal_id + 2].tolist()
+        nutritions = dict(zip(NUTRIENTS, self.nutrition[meal_id].tolist(), strict=True))
+        texts: dict[str, Any] = {field: self._text(field, meal_id) for field in TEXT_FIELDS}
+        return Meal.model_construct(
+            id=meal_id,
+            ingredients=self.compiled.ingredients(meal_id),
+            tags=self.tags.slice(start, end),
+            nutritions=NutritionInfo.model_construct(**nutritions),
+            **texts,
+        )
+
+
+class MealSelection(Sequence[Meal]):
+    """Vue en lecture seule sur une sélection ordonnée de repas.
+
+    Les repas ne sont lus qu'à l'accès: le streaming NDJSON d'une grosse
+    sélection ne matérialise jamais la liste complète.
+
+    Attributes:
+        meals: Repas du dataset (l'id d'un repas = sa position)
+        ids: Ids des repas sélectionnés, dans l'ordre de la réponse
+    """
+
+    def __init__(self, meals: Sequence[Meal], ids: IntArray):
+        self.meals = meals
+        self.ids = ids
+
+    def __len__(self) -> int:
+        return int(self.ids.size)
+
+    @overload
+    def __getitem__(self, position: int) -> Meal: ...
+
+    @overload
+    def __getitem__(self, position: slice) -> list[Meal]: ...
+
+    def __getitem__(self, position: int | slice) -> Meal | list[Meal]:
+        if isinstance(position, slice):
+            return [self.meals[meal_id] for meal_id in self.ids[position].tolist()]
+        return self.meals[int(self.ids[position])]
+
+    def __iter__(self) -> Iterator[Meal]:
+        for meal_id in self.ids:
+            yield self.meals[int(meal_id)]
+
+
+class MealStoreBuilder:
+    """Construit un `MealStore` par paquets de repas.
+
+    Chaque paquet est encodé en colonnes compactes dès son ajout (ids
+    d'ingrédients, arènes de texte, nutrition, postings des attributs): la
+    mémoire retenue est celle du store final, pas celle des objets `Meal`.
+
+    Attributes:
+        vocabulary: Vocabulaire des ingrédients, complété paquet par paquet
+    """
+
+    def __init__(self) -> None:
+        self.vocabulary = IngredientVocabulary()
+        self._size = 0
+        self._ids: list[TermIdArray] = []
+        self._lengths: list[IntArray] = []
+        self._nutrition: list[FloatArray] = []
+        self._texts: dict[str, list[StringArena]] = {field: [] for field in TEXT_FIELDS}
+        self._nulls: dict[str, list[npt.NDArray[np.bool_]]] = {f: [] for f in TEXT_FIELDS}
+        self._tags: list[StringArena] = []
+        self._tag_counts: list[IntArray] = []
+        self._postings: dict[AttributeName, dict[str, list[IntArray]]] = {
+            attribute: {} for attribute in ATTRIBUTES
+        }
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, meals: Sequence[Meal]) -> None:
+        """Encode un paquet de repas, à la suite des précédents.
+
+        Args:
+            meals: Repas du paquet (leur id dans le store = position globale,
+                `Meal.id` est ignoré)
+        """
+        add = self.vocabulary.add
+        ids = [add(term.strip().lower()) for meal in meals for term in meal.ingredients]
+        self._ids.append(np.array(ids, dtype=np.int32))
+        self._lengths.append(np.array([len(m.ingredients) for m in meals], dtype=np.int64))
+        self._nutrition.append(
+            np.array(
+                [[getattr(meal.nutritions, name) for name in NUTRIENTS] for meal in meals],
+                dtype=np.float64,
+            ).reshape(len(meals), len(NUTRIENTS))
+        )
+        for field in TEXT_FIELDS:
+            values = [getattr(meal, field) for meal in meals]
+            self._texts[field].append(StringArena.pack([v or "" for v in values]))
+            self._nulls[field].append(np.array([v is None for v in values], dtype=np.bool_))
+        self._tags.append(StringArena.pack([tag for meal in meals for tag in meal.tags]))
+        self._tag_counts.append(np.array([len(meal.tags) for meal in meals], dtype=np.int64))
+
+        for attribute in ATTRIBUTES:
+            chunk: dict[str, list[int]] = {}
+            for meal_id, meal in enumerate(meals, start=self._size):
+                for value in attribute_values(meal, attribute):
+                    chunk.setdefault(value, []).append(meal_id)
+            postings = self._postings[attribute]
+            for value, meal_ids in chunk.items():
+                postings.setdefault(value, []).append(np.array(meal_ids, dtype=np.int64))
+        self._size += len(meals)
+
+    def postings(self) -> dict[AttributeName, dict[str, IntArray]]:
+        """Ids des repas de chaque valeur de chaque attribut (`AttributeIndex`)."""
+        return {
+            attribute: {value: np.concatenate(chunks) for value, chunks in values.items()}
+            for attribute, values in self._postings.items()
+        }
+
+    def build(self) -> MealStore:
+        """Assemble les paquets encodés en un store (tableaux en mémoire).
+
+        Les paquets de chaque colonne sont libérés dès sa concaténation: le
+        pic mémoire ne double pas tout le store. Les postings restent
+        disponibles (`postings`).
+        """
+        indptr = np.zeros(self._size + 1, dtype=np.int64)
+        np.cumsum(_drain(self._lengths, np.int64), out=indptr[1:])
+        tags_indptr = np.zeros(self._size + 1, dtype=np.int64)
+        np.cumsum(_drain(self._tag_counts, np.int64), out=tags_indptr[1:])
+        compiled = CompiledIngredients(self.vocabulary, indptr, _drain(self._ids, np.int32))
+
+        nutrition = np.empty((self._size, len(NUTRIENTS)), dtype=np.float64)
+        start = 0
+        while self._nutrition:
+            values = self._nutrition.pop(0)
+            nutrition[start : start + len(values)] = values
+            start += len(values)
+
+        texts = {}
+        for field, arenas in self._texts.items():
+            texts[field] = StringArena.concat(arenas)
+            arenas.clear()
+        tags = StringArena.concat(self._tags)
+        self._tags.clear()
+        return MealStore(
+            compiled,
+            nutrition=nutrition,
+            texts=texts,
+            nulls={field: _drain(masks, np.bool_) for field, masks in self._nulls.items()},
+            tags=tags,
+            tags_indptr=tags_indptr,
+        )
+
+
+def _drain(chunks: list[npt.NDArray[Any]], dtype: type[np.generic]) -> npt.NDArray[Any]:
+    """Concatène des paquets 1-D puis vide leur liste."""
+    array = np.concatenate([np.empty(0, dtype=dtype), *chunks])
+    chunks.clear()
+    return array
@@ -0,0 +1,115 @@
+"""Colonnes nutritionnelles contiguës (NumPy).
+
+Construites une seule fois par chargement du dataset: une colonne float64
+par nutriment (calories, protéines...), alignée sur les ids des repas, et
+l'ordre trié de chaque colonne. Un filtre `calories_max=500` devient une
+recherche dichotomique dans la colonne triée, et `sort_by=protein` une
+lecture de l'ordre précalculé, sans parcourir les objets `NutritionInfo`.
+"""
+
+from collections.abc import Sequence
+from typing import Literal
+
+import numpy as np
+
+from src.models.schemas import Meal
+from src.services import bitset
+from src.services.sparse_matrix import FloatArray, IntArray
+
+NutrientName = Literal["calories", "protein", "fat", "carbohydrates", "sugars", "fiber"]
+NUTRIENTS: tuple[NutrientName, ...] = (
+    "calories",
+    "protein",
+    "fat",
+    "carbohydrates",
+    "sugars",
+    "fiber",
+)
+SortOrder = Literal["asc", "desc"]
+
+# Plage [min, max] d'un nutriment (None = borne ouverte)
+NutritionRange = tuple[NutrientName, float | None, float | None]
+
+
+class NutritionColumns:
+    """Valeurs nutritionnelles de tous les repas, en colonnes.
+
+    Attributes:
+        size: Nombre de repas
+        columns: Valeur de chaque nutriment, indexée par id de repas
+        order: Ids des repas triés par valeur croissante (égalité: id)
+        order_desc: Ids des repas triés par valeur décroissante (égalité: id)
+        sorted_values: Valeurs de la colonne dans l'ordre de `order`
+    """
+
+    def __init__(self, meals: Sequence[Meal], values: FloatArray | None = None):
+        """Extrait les colonnes et précalcule leur ordre trié.
+
+        Args:
+            meals: Repas (l'id d'un repas = sa position)
+            values: Matrice repas x nutriments (ordre `NUTRIENTS`) déjà
+                extraite (store columnaire): évite le parcours des repas
+        """
+        self.size = len(meals)
+        if values is None:
+            values = np.array(
+                [[getattr(meal.nutritions, name) for name in NUTRIENTS] for meal in meals],
+                dtype=np.float64,
+            ).reshape(self.size, len(NUTRIENTS))
+
+        self.columns: dict[NutrientName, FloatArray] = {}
+        self.order: dict[NutrientName, IntArray] = {}
+        self.order_desc: dict[NutrientName, IntArray] = {}
+        self.sorted_values: dict[NutrientName, FloatArray] = {}
+        for position, name in enumerate(NUTRIENTS):
+            column = np.ascontiguousarray(values[:, position])
+            order = np.argsort(column, kind="stable").astype(np.int64)
+            self.columns[name] = column
+            self.order[name] = order
+            self.order_desc[name] = np.argsort(-column, kind="stable").astype(np.int64)
+            self.sorted_values[name] = column[order]
+
+    def range_ids(
+        self,
+        name: NutrientName,
+        minimum: float | None = None,
+        maximum: float | None = None,
+    ) -> IntArray:
+        """Ids des repas dont la valeur est dans [minimum, maximum].
+
+        Deux recherches dichotomiques dans la colonne triée.
+        """
+        values = self.sorted_values[name]
+        start = 0 if minimum is None else int(np.searchsorted(values, minimum, side="left"))
+        stop = values.size if maximum is None else int(np.searchsorted(values, maximum, "right"))
+        return self.order[name][start:stop]
+
+    def filter_bitset(self, ranges: Sequence[NutritionRange]) -> int | None:
+        """Bitset des repas respectant toutes les plages (None = aucun filtre)."""
+        allowed: int | None = None
+        for name, minimum, maximum in ranges:
+            matched = bitset.from_ids(self.range_ids(name, minimum, maximum), self.size)
+            allowed = matched if allowed is None else allowed & matched
+        return allowed
+
+    def ordered(
+        self,
+        name: NutrientName,
+        order: SortOrder = "asc",
+        allowed: int | None = None,
+    ) -> IntArray:
+        """Ids des repas triés par nutriment, depuis l'ordre précalculé.
+
+        Args:
+            name: Nutriment de tri
+            order: "asc" (croissant) ou "desc" (décroissant), égalité: id
+            allowed: Bitset des repas à garder (None = tous)
+
+        Returns:
+            Ids triés
+        """
+        ids = self.order[name] if order == "asc" else self.order_desc[name]
+        if allowed is None:
+            return ids
+        kept: IntArray = ids[bitset.to_mask(allowed, self.size)[ids]]
+        return kept
@@ -0,0 +1,70 @@
+"""Curseurs de pagination opaques.
+
+Un curseur encode la position de la page suivante, la version du dataset
+et une empreinte de la requête. Il n'est valable que pour la même requête
+sur le même dataset: la page N+1 relit alors le classement mis en cache
+au lieu de recalculer les scores.
+"""
+
+import base64
+import hashlib
+import json
+from collections.abc import Hashable
+
+from src.core.exceptions import ValidationError
+
+
+def query_fingerprint(query_key: Hashable) -> str:
+    """Empreinte courte d'une requête canonique (ex: mode + ingrédients triés)."""
+    digest = hashlib.blake2b(repr(query_key).encode(), digest_size=6)
+    return digest.hexdigest()
+
+
+def encode_cursor(offset: int, version: str, query: str) -> str:
+    """Encode un curseur opaque (base64 URL-safe).
+
+    Args:
+        offset: Position du premier repas de la page suivante
+        version: Version du dataset classé
+        query: Empreinte de la requête (`query_fingerprint`)
+
+    Returns:
+        Curseur à renvoyer tel quel par le client
+    """
+    payload = json.dumps({"o": offset, "v": version, "q": query}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, version: str, query: str) -> int:
+    """Décode un curseur et vérifie qu'il correspond à la requête courante.
+
+    Args:
+        cursor: Curseur reçu du client
+        version: Version actuelle du dataset
+        query: Empreinte de la requête courante
+
+    Returns:
+        Offset de la page demandée
+
+    Raises:
+        ValidationError: Curseur illisible, d'une autre requête, ou
+            d'une version précédente du dataset
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        offset = int(payload["o"])
+        cursor_version, cursor_query = str(payload["v"]), str(payload["q"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValidationError(field="cursor", reason="curseur illisible") from e
+
+    if offset < 0:
+        raise ValidationError(field="cursor", reason="offset négatif")
+    if cursor_query != query:
+        raise ValidationError(field="cursor", reason="curseur d'une autre requête")
+    if cursor_version != version:
+        raise ValidationError(
+            field="cursor",
+            reason="le dataset a été rechargé, relancez la recherche",
+        )
+    return offset
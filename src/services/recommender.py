@@ -1,24 +1,173 @@
 """Service de recommandation de repas.
 
 Coeur métier de l'application:
-- Algorithme de matching par ingrédients
+- Algorithme de matching par ingrédients (via index inversé)
 - Scoring par pertinence
 - Cache pour performance
 """
 
+import threading
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 
+from src.core.config import get_settings
+from src.core.exceptions import DataLoadError, DataNotFoundError
 from src.core.logging import get_logger
-from src.models.schemas import Meal, NutritionInfo
-from src.services.cache import cache
-from src.services.data_loader import load_recipes_df, safe_parse_list, safe_parse_nutrition
+from src.models.schemas import Meal, NutritionInfo, RecommendedMeal, SimilarMeal
+from src.services import bitset
+from src.services.attribute_index import AttributeIndex
+from src.services.cache import LRUCache, cache
+from src.services.data_loader import (
+    NUTRITION_KEYS,
+    MealDBDelta,
+    ensure_recipes_csv,
+    parse_nutrition_column,
+    read_recipe_chunks,
+    recipes_frame,
+    sync_mealdb_csv,
+)
+from src.services.filters import MealFilters
+from src.services.ingredient_index import IngredientIndex, RankingMode
+from src.services.meal_store import MealSelection, MealStoreBuilder
+from src.services.minhash import MinHashLSH
+from src.services.nutrition_index import NutrientName, NutritionColumns, SortOrder
+from src.services.pagination import decode_cursor, encode_cursor, query_fingerprint
+from src.services.sharding import ShardedScorer
+from src.services.snapshot import ParsedDataset, file_digest, read_snapshot, write_snapshot
+from src.services.sparse_matrix import FloatArray, IntArray, select_top_k
 
 logger = get_logger(__name__)
 
 # Constantes
 CACHE_KEY_MEALS = "all_meals"
+CACHE_KEY_SOURCE = "meals_source"
+CACHE_KEY_INDEX = "ingredient_index"
+CACHE_KEY_SIMILARITY = "similarity_index"
 DEFAULT_IMAGE = "https://via.placeholder.com/200?text=No+Image"
 
+# Cache LRU des requêtes: (version dataset, requête canonique) -> ScoredMeals
+result_cache = LRUCache(
+    max_entries=get_settings().result_cache_size,
+    max_bytes=get_settings().result_cache_bytes,
+)
+
+# Pool de scoring réparti (recommender_workers > 1), lié à une version du dataset
+_sharded_scorer: tuple[str, ShardedScorer] | None = None
+_sharded_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Recommendations:
+    """Résultat d'une recommandation top-k.
+
+    Attributes:
+        meals: Les k repas les plus pertinents, triés
+        total: Nombre total de repas matchés (avant limite)
+        next_cursor: Curseur de la page suivante (None si dernière page)
+        missing_ingredients: Ingrédients manquants de chaque repas (alignés
+            sur `meals`, vide si non calculés)
+    """
+
+    meals: list[Meal]
+    total: int
+    next_cursor: str | None = None
+    missing_ingredients: list[list[str]] = field(default_factory=list)
+
+    def iter_recommended(self) -> Iterator[RecommendedMeal]:
+        """Repas de la réponse API, construits un par un (streaming NDJSON)."""
+        missing = self.missing_ingredients or [[] for _ in self.meals]
+        for meal, ingredients in zip(self.meals, missing, strict=True):
+            yield RecommendedMeal(**meal.model_dump(), missing_ingredients=ingredients)
+
+    def recommended(self) -> list[RecommendedMeal]:
+        """Repas de la réponse API, avec leurs ingrédients manquants."""
+        return list(self.iter_recommended())
+
+
+@dataclass
+class ScoredMeals:
+    """Scores d'une requête, avant sélection (valeur du cache de résultats).
+
+    Le début du classement calculé pour une page est gardé: les pages
+    suivantes (curseur) le découpent au lieu de reclasser tous les repas.
+
+    Attributes:
+        ids: Ids des repas matchés, triés par ordre croissant
+        scores: Scores alignés sur `ids`
+    """
+
+    ids: IntArray
+    scores: FloatArray
+    _ranked: IntArray = field(
+        default_factory=lambda: np.empty(0, dtype=np.int64), init=False, repr=False, compare=False
+    )
+
+    @property
+    def total(self) -> int:
+        """Nombre de repas matchés."""
+        return int(self.ids.size)
+
+    @property
+    def nbytes(self) -> int:
+        """Taille des tableaux, classement complet compris (borne du cache de résultats)."""
+        return int(2 * self.ids.nbytes + self.scores.nbytes)
+
+    def top(self, k: int | None = None, offset: int = 0) -> list[int]:
+        """Ids des k meilleurs repas à partir de `offset` (score décroissant, puis id).
+
+        L'ordre est total et déterministe, donc les pages successives ne
+        se recouvrent jamais. Quand une page dépasse le classement gardé,
+        il est au moins doublé: coût amorti linéaire sur toutes les pages.
+        """
+        end = self.total if k is None else min(offset + k, self.total)
+        if self._ranked.size < end:
+            size = min(self.total, max(end, 2 * self._ranked.size))
+            # Même résultat quel que soit le thread qui l'écrit (pas de verrou)
+            self._ranked = select_top_k(self.ids, self.scores, size)
+        return self._ranked[offset:end].tolist()  # type: ignore[no-any-return]
+
+
+@dataclass(frozen=True)
+class RankedPrefix:
+    """Début du classement d'une requête (scoring réparti, MaxScore).
+
+    Ces backends ne classent que le top-(offset + k): le préfixe est
+    mémorisé pour que les pages suivantes ne rescorent pas la requête.
+
+    Attributes:
+        ids: Ids des premiers repas, classés
+        total: Nombre total de repas matchés
+    """
+
+    ids: IntArray
+    total: int
+
+    @property
+    def nbytes(self) -> int:
+        """Taille du classement (borne du cache de résultats)."""
+        return int(self.ids.nbytes)
+
+    def covers(self, end: int | None) -> bool:
+        """Vrai si le préfixe contient les `end` premiers repas (None = tous)."""
+        return self.ids.size >= (self.total if end is None else min(end, self.total))
+
+
+def extract_tags(tags: str | None) -> list[str]:
+    """Découpe les tags d'une recette (tous conservés, normalisés).
+
+    Exemple:
+        >>> extract_tags("italian;Pasta; quick")
+        ['italian', 'pasta', 'quick']
+    """
+    if not tags or not isinstance(tags, str):
+        return []
+
+    return [p.strip().lower() for p in tags.split(";") if p.strip()]
+
 
 def extract_cuisine_from_tags(tags: str | None) -> str:
     """Extrait la cuisine principale depuis les tags.
@@ -63,56 +212,357 @@ def parse_prep_time(prep_time: str | None) -> str:
     return prep_time.replace("-", " ")
 
 
-def _row_to_meal(row: pd.Series) -> Meal:
-    """Convertit une ligne DataFrame en objet Meal.
+def _string_column(df: pd.DataFrame, column: str) -> pd.Series:
+    """Colonne convertie en chaînes (`str(valeur)`), valeurs manquantes -> <NA>."""
+    if column not in df.columns:
+        return pd.Series(pd.NA, index=df.index, dtype="string")
+    return df[column].astype("string")
+
+
+def _text_column(df: pd.DataFrame, column: str) -> pd.Series:
+    """Colonne texte: seules les chaînes sont lues, le reste -> <NA>.
+
+    Même tolérance que les fonctions de nettoyage ligne à ligne
+    (`safe_parse_list`, `clean_image_url`...).
+    """
+    if column not in df.columns:
+        return pd.Series(pd.NA, index=df.index, dtype="string")
+    values = df[column]
+    return values.where(values.map(lambda v: isinstance(v, str))).astype("string")
+
+
+def _split_column(values: pd.Series, separators: str) -> list[list[str]]:
+    """Découpe une colonne texte en listes (minuscules, trimées, sans vides)."""
+    parts = values.str.lower().str.split(separators, regex=True).tolist()
+    return [
+        [item.strip() for item in items if item.strip()] if isinstance(items, list) else []
+        for items in parts
+    ]
+
+
+def _optional_values(values: pd.Series) -> list[str | None]:
+    """Valeurs d'une colonne de chaînes, <NA> -> None."""
+    return values.astype(object).where(values.notna(), None).tolist()  # type: ignore[no-any-return]
+
+
+def _frame_to_meals(df: pd.DataFrame) -> list[Meal]:
+    """Convertit tout le DataFrame en repas, colonne par colonne.
+
+    Même résultat que l'ancienne conversion ligne par ligne (`iterrows`),
+    sans créer de `pd.Series` par ligne: chaque champ est nettoyé par des opérations
+    `str` vectorisées sur sa colonne (nutrition: `parse_nutrition_column`).
+    Les valeurs produites respectent déjà le schéma (noms non vides,
+    ingrédients trimés, nutrition >= 0): les repas sont construits par
+    `model_construct`, sans revalidation. Les lignes sans ingrédient, que
+    la validation rejetterait, sont écartées.
 
     Args:
-        row: Ligne pandas du DataFrame
+        df: DataFrame des recettes (colonnes du CSV)
 
     Returns:
-        Objet Meal validé
+        Repas valides, l'id d'un repas = sa position dans la liste
     """
-    # Récupération sécurisée des colonnes
-    name = str(row.get("name", "Unnamed Recipe"))
-    if not name or name == "nan":
-        name = "Unnamed Recipe"
+    names = _string_column(df, "name").fillna("")
+    names = names.where(~names.isin(["", "nan"]), "Unnamed Recipe")
 
-    ingredients = safe_parse_list(row.get("ingredients"))
-    nutrition = safe_parse_nutrition(row.get("nutritions"))
-    cuisine = extract_cuisine_from_tags(row.get("tags"))
-    image = clean_image_url(row.get("image_url"))
-    prep_time = parse_prep_time(row.get("prep_time"))
+    ingredients = _split_column(_text_column(df, "ingredients"), r"[,;\^]")
+    tags = _split_column(_text_column(df, "tags"), ";")
 
-    # Champs optionnels (peuvent être None)
-    diet_type = str(row.get("diet_type")) if pd.notna(row.get("diet_type")) else None
-    dish_type = str(row.get("dish_type")) if pd.notna(row.get("dish_type")) else None
-    seasonal = str(row.get("seasonal")) if pd.notna(row.get("seasonal")) else None
+    urls = _text_column(df, "image_url").str.strip()
+    urls = urls.str.replace(r"^http://", "https://", regex=True)
+    images = urls.where(urls.str.startswith("https://").fillna(False), DEFAULT_IMAGE)
 
-    return Meal(
-        name=name,
-        ingredients=ingredients,
-        cuisine=cuisine,
-        image=image,
-        prep_time=prep_time,
-        diet_type=diet_type,
-        dish_type=dish_type,
-        seasonal=seasonal,
-        nutritions=NutritionInfo(**nutrition),
+    prep_times = _text_column(df, "prep_time").str.replace("-", " ", regex=False).fillna("")
+    if "nutritions" in df.columns:
+        parsed = parse_nutrition_column(df["nutritions"])
+    else:
+        parsed = pd.DataFrame(0.0, index=df.index, columns=list(NUTRITION_KEYS))
+    nutritions = zip(*(parsed[key].tolist() for key in NUTRITION_KEYS), strict=True)
+
+    columns = zip(
+        names.tolist(),
+        ingredients,
+        tags,
+        images.tolist(),
+        prep_times.tolist(),
+        _optional_values(_string_column(df, "diet_type")),
+        _optional_values(_string_column(df, "dish_type")),
+        _optional_values(_string_column(df, "seasonal")),
+        nutritions,
+        strict=True,
     )
 
+    meals: list[Meal] = []
+    for name, meal_ingredients, meal_tags, image, prep_time, diet, dish, season, amounts in columns:
+        if not meal_ingredients:
+            continue
+        meals.append(
+            Meal.model_construct(
+                id=len(meals),
+                name=name,
+                ingredients=meal_ingredients,
+                cuisine=meal_tags[0] if meal_tags else "unknown",
+                image=image,
+                prep_time=prep_time,
+                diet_type=diet,
+                dish_type=dish,
+                seasonal=season,
+                tags=meal_tags,
+                nutritions=NutritionInfo.model_construct(
+                    **dict(zip(NUTRITION_KEYS, amounts, strict=True))
+                ),
+            )
+        )
+
+    if len(meals) < len(df):
+        logger.warning("Lignes sans ingrédient ignorées", skipped=len(df) - len(meals))
+    return meals
+
+
+def _parse_meals(force_refresh: bool = False) -> ParsedDataset:
+    """Parse le CSV des recettes en repas et extrait leurs structures dérivées.
+
+    Args:
+        force_refresh: Reconstruit / re-télécharge le CSV source
+
+    Returns:
+        Repas, ingrédients compilés en ids entiers, index des attributs et
+        colonnes nutritionnelles
+    """
+    logger.info("Chargement repas depuis CSV...")
+    return _parse_csv(ensure_recipes_csv(force_refresh))
+
+
+def _parse_csv(csv_path: Path, chunk_rows: int | None = None) -> ParsedDataset:
+    """Parse un CSV de recettes par paquets de lignes.
+
+    Chaque paquet est converti (colonne par colonne) puis encodé dans le
+    store columnaire: le pic mémoire est celui du store final plus un
+    paquet, quelle que soit la taille du CSV.
+
+    Args:
+        csv_path: Chemin du CSV local
+        chunk_rows: Lignes par paquet (défaut: `csv_chunk_rows`)
+
+    Returns:
+        Dataset dont les repas sont un `MealStore` en mémoire
+
+    Raises:
+        DataLoadError: Si le CSV est vide ou illisible
+    """
+    source = file_digest(csv_path)
+    builder = MealStoreBuilder()
+    for chunk in read_recipe_chunks(csv_path, chunk_rows or get_settings().csv_chunk_rows):
+        builder.append(_frame_to_meals(chunk))
+    logger.info(f"Dataset chargé: {len(builder)} recettes")
+    return _build_dataset(builder, source)
 
-def load_meals(use_cache: bool = True) -> list[Meal]:
+
+def _derive_dataset(meals: Sequence[Meal], source: str) -> ParsedDataset:
+    """Encode des repas dans un store columnaire et extrait leurs structures dérivées."""
+    builder = MealStoreBuilder()
+    builder.append(meals)
+    return _build_dataset(builder, source)
+
+
+def _build_dataset(builder: MealStoreBuilder, source: str) -> ParsedDataset:
+    """Assemble le store d'un builder et ses index d'attributs / nutrition."""
+    meals = builder.build()
+    return ParsedDataset(
+        meals,
+        meals.compiled,
+        AttributeIndex(meals, builder.postings()),
+        NutritionColumns(meals, meals.nutrition),
+        source,
+    )
+
+
+def _store_snapshot(source: str, dataset: ParsedDataset) -> ParsedDataset:
+    """Écrit le snapshot d'un dataset parsé, puis le mappe.
+
+    Les repas parsés sont libérés au profit du store columnaire partagé
+    entre workers. Un échec d'écriture (dossier en lecture seule)
+    n'empêche pas le chargement: les repas parsés sont alors gardés.
+    """
+    settings = get_settings()
+    try:
+        write_snapshot(settings.snapshot_path, source, dataset)
+    except OSError as e:
+        logger.warning("Snapshot dataset non écrit", error=str(e))
+        return replace(dataset, source=source)
+    return read_snapshot(settings.snapshot_path, source) or replace(dataset, source=source)
+
+
+def _load_or_parse_meals() -> ParsedDataset:
+    """Mappe le snapshot du dataset s'il est à jour, sinon parse le CSV.
+
+    Après un parsing, le snapshot est (ré)écrit puis mappé.
+    """
+    settings = get_settings()
+    if not settings.dataset_snapshot:
+        return _parse_meals()
+
+    source = file_digest(ensure_recipes_csv())
+    snapshot = read_snapshot(settings.snapshot_path, source)
+    if snapshot is not None:
+        logger.info("Repas chargés depuis le snapshot", meals=len(snapshot.meals))
+        return snapshot
+
+    return _store_snapshot(source, _parse_meals())
+
+
+def build_snapshot(force_refresh: bool = False) -> Path:
+    """Parse le CSV et écrit le snapshot binaire (console script `meal-snapshot`).
+
+    Le snapshot n'est pas reconstruit s'il correspond déjà au CSV. Avec
+    TheMealDB, un rafraîchissement part du snapshot existant: seul le
+    delta de la synchronisation est parsé (`_apply_mealdb_delta`), et un
+    rafraîchissement sans changement ne coûte que les requêtes HTTP.
+
+    Args:
+        force_refresh: Synchronise / re-télécharge le CSV source
+
+    Returns:
+        Chemin du snapshot
+
+    Raises:
+        DataLoadError: Si le CSV ne peut pas être chargé
+        OSError: Si le snapshot ne peut pas être écrit
+    """
+    settings = get_settings()
+    csv_path = settings.csv_path
+    if force_refresh and settings.data_source == "mealdb" and csv_path.exists():
+        current = read_snapshot(settings.snapshot_path, file_digest(csv_path))
+        delta = sync_mealdb_csv(csv_path)
+        if current is not None:
+            if delta.changed:
+                dataset = _apply_mealdb_delta(current.meals, delta)
+                write_snapshot(settings.snapshot_path, dataset.source, dataset)
+            else:
+                logger.info("Snapshot dataset à jour", path=str(settings.snapshot_path))
+            return settings.snapshot_path
+        force_refresh = False
+
+    source = file_digest(ensure_recipes_csv(force_refresh))
+    if read_snapshot(settings.snapshot_path, source) is not None:
+        logger.info("Snapshot dataset à jour", path=str(settings.snapshot_path))
+        return settings.snapshot_path
+
+    write_snapshot(settings.snapshot_path, source, _parse_meals())
+    return settings.snapshot_path
+
+
+def _install_dataset(dataset: ParsedDataset) -> None:
+    """Publie un dataset dans le cache mémoire et construit ses index."""
+    settings = get_settings()
+    cache.set(CACHE_KEY_MEALS, dataset.meals, settings.cache_ttl_seconds)
+    cache.set(CACHE_KEY_SOURCE, dataset.source, settings.cache_ttl_seconds)
+    logger.info(f"Cache mis à jour: {len(dataset.meals)} repas")
+
+    # Construit les index une seule fois par chargement
+    index = get_ingredient_index(dataset.meals, dataset)
+    get_similarity_index(index)
+
+
+def _apply_mealdb_delta(current: Sequence[Meal] | None, delta: MealDBDelta) -> ParsedDataset:
+    """Dataset du CSV TheMealDB synchronisé, à partir du dataset précédent.
+
+    Seules les recettes nouvelles ou modifiées sont converties, les autres
+    repas sont repris de `current`. Le store, les attributs et la
+    nutrition sont en revanche ré-encodés depuis les repas (coût linéaire
+    en la taille du catalogue, sans relire le CSV), comme ensuite les
+    index: les statistiques BM25 (idf, longueur moyenne) sont globales,
+    un seul repas modifié change les poids de tous les autres.
+
+    Args:
+        current: Repas de l'ancien CSV (id = ligne), None si le dataset
+            disponible n'est pas issu de l'ancien CSV
+        delta: Delta renvoyé par `sync_mealdb_csv`
+
+    Returns:
+        Dataset du nouveau CSV (reparsé entièrement si `current` ne
+        correspond pas à l'ancien CSV)
+    """
+    csv_path = get_settings().csv_path
+    if current is None:
+        return _parse_csv(csv_path)
+
+    fresh = _frame_to_meals(recipes_frame(delta.fresh_rows)) if delta.fresh_rows else []
+    reused = any(position is not None for position in delta.positions)
+    if len(fresh) != len(delta.fresh_rows) or (reused and delta.previous != len(current)):
+        # Dataset désaligné de l'ancien CSV: rechargement complet
+        return _parse_csv(csv_path)
+
+    # Le store renumérote les repas (id = position dans le nouveau CSV)
+    fresh_meals = iter(fresh)
+    meals = [
+        next(fresh_meals) if position is None else current[position] for position in delta.positions
+    ]
+    logger.info("Delta TheMealDB appliqué", parsed=len(fresh), meals=len(meals))
+    return _derive_dataset(meals, file_digest(csv_path))
+
+
+def sync_meals() -> MealDBDelta:
+    """Synchronise TheMealDB et applique le delta au dataset chargé.
+
+    Sans changement, rien n'est réécrit ni reconstruit (dataset, index et
+    cache de résultats restent valides). Sinon seul le delta est parsé
+    (`_apply_mealdb_delta`), puis le snapshot est réécrit et les index
+    sont reconstruits. Le delta n'est appliqué que si le dataset chargé
+    est issu du CSV d'avant la synchronisation (même empreinte): avec
+    plusieurs workers, un autre processus a pu synchroniser le CSV depuis
+    le chargement, et le CSV est alors reparsé entièrement.
+
+    Fonction de bibliothèque, appelée par aucune route ni par le CLI: en
+    production, `meal-snapshot --refresh` synchronise hors des workers
+    (`build_snapshot`), qui mappent le nouveau snapshot à l'expiration
+    du TTL de leur cache.
+
+    Returns:
+        Delta appliqué
+
+    Raises:
+        DataLoadError: Si la source n'est pas TheMealDB, ou si aucune
+            recette n'est récupérée
+    """
+    settings = get_settings()
+    if settings.data_source != "mealdb":
+        raise DataLoadError(
+            source=settings.csv_url,
+            reason="Synchronisation incrémentale disponible uniquement pour TheMealDB",
+        )
+
+    current = load_meals()
+    loaded_source = cache.get(CACHE_KEY_SOURCE)
+    previous_source = file_digest(settings.csv_path)
+    delta = sync_mealdb_csv(settings.csv_path)
+    if not delta.changed and loaded_source == previous_source:
+        logger.info("Dataset TheMealDB à jour", meals=len(current))
+        return delta
+
+    if loaded_source != previous_source:
+        logger.warning("Dataset chargé antérieur au CSV, reparsing complet")
+    dataset = _apply_mealdb_delta(current if loaded_source == previous_source else None, delta)
+    if settings.dataset_snapshot:
+        dataset = _store_snapshot(dataset.source, dataset)
+    _install_dataset(dataset)
+    return delta
+
+
+def load_meals(use_cache: bool = True) -> Sequence[Meal]:
     """Charge toutes les recettes (avec cache mémoire).
 
     C'est la fonction CLÉ pour la performance:
-    - Premier appel: charge depuis CSV (~1-2s)
+    - Premier appel: mappe le snapshot binaire si le CSV n'a pas changé,
+      sinon parse le CSV (~1-2s) et écrit le snapshot
     - Appels suivants: cache mémoire instantané
 
     Args:
         use_cache: Utiliser le cache (True recommandé)
 
     Returns:
-        Liste de tous les repas
+        Tous les repas: `MealStore` columnaire en lecture seule (repas
+        construits à l'accès), mappé depuis le snapshot ou en mémoire
     """
     # 1. Essaie le cache mémoire d'abord
     if use_cache:
@@ -121,87 +571,632 @@ def load_meals(use_cache: bool = True) -> list[Meal]:
             logger.debug(f"Cache mémoire hit: {len(cached)} repas")
             return cached  # type: ignore[no-any-return]
 
-    # 2. Charge depuis CSV
-    logger.info("Chargement repas depuis CSV...")
-    df = load_recipes_df()
-
-    # 3. Conversion en objets Meal
-    meals = []
-    for _, row in df.iterrows():
-        try:
-            meal = _row_to_meal(row)
-            meals.append(meal)
-        except Exception as e:
-            logger.warning(f"Erreur conversion ligne: {e}")
-            continue
+    # 2. Snapshot binaire, ou parsing du CSV
+    dataset = _load_or_parse_meals()
 
-    # 4. Stocke dans le cache
+    # 3. Stocke dans le cache et construit les index
     if use_cache:
-        from src.core.config import get_settings
-        settings = get_settings()
-        cache.set(CACHE_KEY_MEALS, meals, settings.cache_ttl_seconds)
-        logger.info(f"Cache mis à jour: {len(meals)} repas")
+        _install_dataset(dataset)
 
-    return meals
+    return dataset.meals
 
 
-def recommend_meals(available_ingredients: list[str]) -> list[Meal]:
-    """Recommande des repas basés sur les ingrédients disponibles.
+def get_ingredient_index(
+    meals: Sequence[Meal],
+    dataset: ParsedDataset | None = None,
+) -> IngredientIndex:
+    """Retourne l'index inversé associé à une liste de repas.
+
+    L'index est mis en cache et reconstruit uniquement quand la liste
+    de repas change (rechargement du dataset, expiration TTL).
+
+    Args:
+        meals: Liste de repas à indexer
+        dataset: Structures déjà extraites au chargement (ingrédients
+            compilés, attributs, nutrition): évite de les recalculer
+
+    Returns:
+        Index inversé des ingrédients
+    """
+    cached = cache.get(CACHE_KEY_INDEX)
+    if isinstance(cached, IngredientIndex) and cached.meals is meals:
+        return cached
+
+    if dataset is None:
+        index = IngredientIndex(meals)
+    else:
+        index = IngredientIndex(meals, dataset.compiled, dataset.attributes, dataset.nutrition)
+    cache.set(CACHE_KEY_INDEX, index, get_settings().cache_ttl_seconds)
+    # Les résultats mémorisés portent sur l'ancien dataset
+    result_cache.clear()
+    return index
+
+
+def get_similarity_index(index: IngredientIndex) -> MinHashLSH:
+    """Retourne les signatures MinHash/LSH associées à un index.
+
+    Calculées au chargement du dataset, puis recalculées uniquement quand
+    la version du dataset change.
+
+    Args:
+        index: Index du dataset courant
+
+    Returns:
+        Structure LSH des repas
+    """
+    cached = cache.get(CACHE_KEY_SIMILARITY)
+    if isinstance(cached, tuple) and cached[0] == index.version:
+        return cached[1]  # type: ignore[no-any-return]
+
+    settings = get_settings()
+    lsh = MinHashLSH(index.compiled, settings.similar_num_perm, settings.similar_bands)
+    cache.set(CACHE_KEY_SIMILARITY, (index.version, lsh), settings.cache_ttl_seconds)
+    logger.info(
+        "Signatures MinHash calculées",
+        meals=len(index.meals),
+        bands=lsh.bands,
+        rows=lsh.rows,
+        threshold=round(lsh.threshold, 2),
+    )
+    return lsh
+
+
+def acquire_sharded_scorer(index: IngredientIndex) -> ShardedScorer | None:
+    """Réserve le pool de scoring réparti du dataset courant.
+
+    Le pool (et sa mémoire partagée) est créé au premier appel, puis
+    recréé uniquement quand la version du dataset change. L'ancien pool
+    est retiré: il finit les requêtes en cours avant de s'arrêter.
+
+    Args:
+        index: Index du dataset courant
+
+    Returns:
+        Pool de scoring, à libérer par `release()`, ou None si
+        `recommender_workers` <= 1
+    """
+    global _sharded_scorer
+
+    workers = get_settings().recommender_workers
+    if workers <= 1:
+        return None
+
+    with _sharded_lock:
+        if _sharded_scorer is None or _sharded_scorer[0] != index.version:
+            if _sharded_scorer is not None:
+                _sharded_scorer[1].retire()
+            logger.info("Démarrage du scoring réparti", workers=workers, meals=len(index.meals))
+            _sharded_scorer = (index.version, ShardedScorer(index.matrix, index.bm25_data, workers))
+        scorer = _sharded_scorer[1]
+        scorer.acquire()
+        return scorer
+
+
+def close_sharded_scorer() -> None:
+    """Arrête le pool de scoring réparti (arrêt de l'application).
+
+    Le pool s'arrête dès que les requêtes en cours l'ont libéré.
+    """
+    global _sharded_scorer
+
+    with _sharded_lock:
+        if _sharded_scorer is not None:
+            _sharded_scorer[1].retire()
+            _sharded_scorer = None
+
+
+def _query_key(
+    available: set[str],
+    ranking: RankingMode,
+    fuzzy: bool,
+    filters: MealFilters,
+) -> tuple[object, ...]:
+    """Forme canonique d'une requête (clé de cache et de curseur)."""
+    return (ranking, fuzzy, tuple(sorted(available)), filters.key())
+
+
+def _allowed_meals(
+    index: IngredientIndex,
+    available: set[str],
+    fuzzy: bool,
+    filters: MealFilters,
+) -> int | None:
+    """Bitset des repas autorisés par les filtres (None = aucun filtre).
+
+    Intersection des filtres d'ingrédients (exclusions, tous requis), des
+    index d'attributs (cuisine, type de plat, régime, saison, tags) et des
+    plages nutritionnelles.
+    """
+    allowed = index.filter_bitset(
+        available,
+        exclude=filters.exclude_ingredients,
+        require_all=filters.require_all,
+        fuzzy=fuzzy,
+    )
+    by_attributes = _attribute_bitset(index, filters)
+    if by_attributes is None:
+        return allowed
+    return by_attributes if allowed is None else allowed & by_attributes
+
+
+def _attribute_bitset(index: IngredientIndex, filters: MealFilters) -> int | None:
+    """Bitset des repas autorisés par les attributs et plages nutritionnelles."""
+    allowed: int | None = None
+    for bits in (
+        index.attributes.filter_bitset(filters.attributes()),
+        index.nutrition.filter_bitset(filters.nutrition),
+    ):
+        if bits is not None:
+            allowed = bits if allowed is None else allowed & bits
+    return allowed
+
+
+def score_meals(
+    index: IngredientIndex,
+    available: set[str],
+    ranking: RankingMode = "count",
+    fuzzy: bool = True,
+    filters: MealFilters | None = None,
+) -> ScoredMeals:
+    """Score tous les repas matchés par un ensemble d'ingrédients normalisés.
+
+    Le résultat est mémorisé dans un cache LRU, indexé par la version du
+    dataset et la requête canonique (mode + ingrédients triés):
+    "chicken,rice" et "rice, Chicken" partagent la même entrée.
+
+    Args:
+        index: Index du dataset courant
+        available: Ingrédients utilisateur normalisés (minuscules, trimés)
+        ranking: Mode de classement ("count" ou "bm25")
+        fuzzy: Corrige les ingrédients sans aucun match (fautes de frappe)
+        filters: Filtres d'ingrédients et d'attributs (évalués en bitsets)
+
+    Returns:
+        Ids et scores des repas matchés et autorisés par les filtres
+    """
+    filters = filters or MealFilters()
+    key = (index.version, _query_key(available, ranking, fuzzy, filters))
+    cached = result_cache.get(key)
+    if cached is not None:
+        return cached  # type: ignore[no-any-return]
+
+    # Ingrédients matchés par repas (filtre max_missing), aligné sur les ids
+    max_missing = filters.max_missing
+    matched: FloatArray | None = None
+    if get_settings().recommender_backend == "sparse":
+        # Un seul produit matrice creuse x vecteur requête
+        terms = index.match_terms(available, fuzzy)
+        data = index.bm25_data if ranking == "bm25" else None
+        scores_vector = index.matrix.matvec(terms, data)
+        ids = np.flatnonzero(scores_vector > 0)
+        scored = ScoredMeals(ids=ids, scores=scores_vector[ids])
+        if max_missing is not None:
+            counts = scores_vector if data is None else index.matrix.matvec(terms)
+            matched = counts[ids]
+    else:
+        # Scoring: match partiel, ex: "chicken" match "chicken breast"
+        if max_missing is None:
+            items = sorted(index.score(available, ranking, fuzzy).items())
+        else:
+            # Scores et comptes d'ingrédients matchés: un seul passage
+            scores, matches = index.score_matches(available, ranking, fuzzy)
+            items = sorted(scores.items())
+            matched = np.array([matches[meal_id] for meal_id, _ in items], dtype=np.float64)
+        scored = ScoredMeals(
+            ids=np.array([meal_id for meal_id, _ in items], dtype=np.int64),
+            scores=np.array([score for _, score in items], dtype=np.float64),
+        )
+
+    # Filtres: ET / ET NON sur les bitsets, puis un seul masque NumPy
+    keep = None
+    allowed = _allowed_meals(index, available, fuzzy, filters)
+    if allowed is not None:
+        keep = bitset.to_mask(allowed, len(index.meals))[scored.ids]
+    if max_missing is not None and matched is not None:
+        # Presque faisables: manquants = taille précalculée - ingrédients matchés
+        feasible = index.sizes[scored.ids] - matched <= max_missing
+        keep = feasible if keep is None else keep & feasible
+    if keep is not None:
+        scored = ScoredMeals(ids=scored.ids[keep], scores=scored.scores[keep])
+
+    result_cache.set(key, scored)
+    return scored
+
+
+def _ranked_prefix(
+    index: IngredientIndex,
+    available: set[str],
+    ranking: RankingMode,
+    fuzzy: bool,
+    filters: MealFilters,
+    end: int | None,
+) -> RankedPrefix:
+    """Classement des `end` premiers repas d'une requête, mémorisé entre les pages.
+
+    Sans ce cache, chaque page d'un curseur rescorerait la requête
+    (pagination profonde en O(pages x repas)). Quand une page dépasse le
+    préfixe mémorisé, il est au moins doublé: coût amorti linéaire.
+
+    Args:
+        index: Index du dataset courant
+        available: Ingrédients utilisateur normalisés (minuscules, trimés)
+        ranking: Mode de classement ("count" ou "bm25")
+        fuzzy: Corrige les ingrédients sans aucun match (fautes de frappe)
+        filters: Filtres d'ingrédients et d'attributs
+        end: Nombre de repas classés requis (None = tous, scoring réparti)
+
+    Returns:
+        Préfixe du classement couvrant les `end` premiers repas
+    """
+    key = (index.version, "ranked", _query_key(available, ranking, fuzzy, filters))
+    cached = result_cache.get(key)
+    if cached is not None:
+        if cached.covers(end):
+            return cached  # type: ignore[no-any-return]
+        if end is not None:
+            end = max(end, 2 * cached.ids.size)
+
+    allowed = _allowed_meals(index, available, fuzzy, filters)
+    scorer = acquire_sharded_scorer(index)
+    if scorer is not None:
+        # Scoring réparti: chaque shard renvoie son top-end local
+        try:
+            total, ranked = scorer.rank(
+                index.match_terms(available, fuzzy),
+                bm25=ranking == "bm25",
+                k=end,
+                allowed=allowed,
+            )
+        finally:
+            scorer.release()
+    else:
+        # MaxScore: seuls les repas pouvant entrer dans le top-end sont scorés
+        limit = len(index.meals) if end is None else end
+        ranked, stats = index.top_k(available, limit, ranking, fuzzy, allowed=allowed)
+        total = stats.matched
+        logger.debug("Top-k MaxScore", evaluated=stats.evaluated, pruned=stats.pruned)
+
+    prefix = RankedPrefix(ids=np.asarray(ranked, dtype=np.int64), total=total)
+    result_cache.set(key, prefix)
+    return prefix
+
+
+def rank_meals(
+    available_ingredients: list[str],
+    k: int | None = None,
+    cursor: str | None = None,
+    ranking: RankingMode = "count",
+    fuzzy: bool = True,
+    filters: MealFilters | None = None,
+    sort_by: NutrientName | None = None,
+    sort_order: SortOrder = "asc",
+) -> Recommendations:
+    """Recommande les k repas les plus pertinents et compte tous les matchs.
 
     Algorithme:
     1. Normalise les ingrédients utilisateur (lowercase, trim)
-    2. Pour chaque repas, compte les ingrédients correspondants
-    3. Score = nombre d'ingrédients matchés
-    4. Trie par score décroissant
-    5. Retourne tous les repas avec au moins 1 match
+    2. Résout chaque ingrédient en termes du vocabulaire (match partiel),
+       en corrigeant les fautes de frappe ("tomatoe") via les trigrammes
+    3. Score = somme des poids des posting lists matchées:
+       - "count": nombre d'ingrédients matchés
+       - "bm25": matchs pondérés par l'IDF de l'ingrédient et normalisés
+         par la longueur de la recette (statistiques précalculées)
+    4. Applique les filtres (exclusions, tous les ingrédients requis,
+       au plus `max_missing` ingrédients manquants)
+    5. Sélectionne les k meilleurs (égalité: ordre du dataset), ou trie
+       les repas matchés par nutriment si `sort_by` est fourni
+
+    Seuls les repas présents dans les posting lists des termes matchés
+    sont visités, au lieu d'un scan complet du dataset. Le backend
+    `recommender_backend="sparse"` calcule les mêmes scores par un produit
+    matrice creuse x vecteur (NumPy), avec un classement identique.
+
+    La sélection top-k (`argpartition`) évite de trier tous les candidats
+    quand seuls les k premiers sont renvoyés. Les scores sont mémorisés
+    (cache LRU) : une requête déjà vue ne repasse pas par le scoring.
+
+    Avec `recommender_workers > 1`, les repas sont répartis en shards
+    scorés en parallèle par un pool de processus (mémoire partagée), puis
+    les top-k de chaque shard sont fusionnés (même classement). Le backend
+    `recommender_backend="maxscore"` s'arrête de scorer les repas qui ne
+    peuvent plus entrer dans le top-k (bornes par ingrédient, MaxScore).
+
+    Les ingrédients manquants de chaque repas renvoyé (non couverts par
+    la requête) sont listés dans `missing_ingredients`.
+
+    Pagination: `next_cursor` permet de demander la page suivante, qui est
+    extraite du classement mis en cache (sans recalcul des scores).
 
     Args:
         available_ingredients: Liste d'ingrédients (ex: ["chicken", "rice"])
+        k: Nombre max de repas à retourner (None = tous)
+        cursor: Curseur opaque d'une réponse précédente (None = 1ère page)
+        ranking: Mode de classement ("count" ou "bm25")
+        fuzzy: Corrige les ingrédients sans aucun match (fautes de frappe)
+        filters: Filtres d'ingrédients, d'attributs et nutritionnels
+        sort_by: Nutriment de tri (None = pertinence)
+        sort_order: Ordre du tri par nutriment ("asc" ou "desc")
 
     Returns:
-        Liste triée des repas les plus pertinents
+        Repas classés, nombre total de matchs et curseur suivant
 
-    Exemple:
-        >>> meals = recommend_meals(["chicken", "rice", "tomato"])
-        >>> # Repas avec chicken+rice+tomato en premier
+    Raises:
+        ValidationError: Curseur invalide ou périmé
     """
-    logger.info(f"Recherche repas avec: {available_ingredients}")
+    logger.info(f"Recherche repas avec: {available_ingredients}", k=k)
 
     # Normalisation (minuscules, sans espaces)
     available = {ing.strip().lower() for ing in available_ingredients if ing.strip()}
 
     if not available:
         logger.warning("Liste d'ingrédients vide")
-        return []
+        return Recommendations(meals=[], total=0)
+
+    # Charge tous les repas (avec cache) et leur index
+    all_meals = load_meals()
+    index = get_ingredient_index(all_meals)
+
+    filters = filters or MealFilters()
+    query = query_fingerprint((_query_key(available, ranking, fuzzy, filters), sort_by, sort_order))
+    offset = decode_cursor(cursor, index.version, query) if cursor else 0
+
+    # Tri nutritionnel et max_missing: scoring exhaustif
+    exhaustive = sort_by is not None or filters.max_missing is not None
+    settings = get_settings()
+    if not exhaustive and (
+        settings.recommender_workers > 1
+        or (k is not None and settings.recommender_backend == "maxscore")
+    ):
+        # Scoring réparti / MaxScore: seul le top-(offset + k) est classé
+        end = None if k is None else offset + k
+        prefix = _ranked_prefix(index, available, ranking, fuzzy, filters, end)
+        ranked_ids = prefix.ids[offset:end].tolist()
+        total = prefix.total
+    else:
+        scored = score_meals(index, available, ranking, fuzzy, filters)
+        if sort_by is not None:
+            # Tri par nutriment: la valeur remplace le score de pertinence
+            # (mémorisé pour garder le classement entre les pages)
+            query_key = _query_key(available, ranking, fuzzy, filters)
+            sorted_key = (index.version, "sorted", query_key, sort_by, sort_order)
+            by_value = result_cache.get(sorted_key)
+            if by_value is None:
+                values = index.nutrition.columns[sort_by][scored.ids]
+                by_value = ScoredMeals(
+                    ids=scored.ids, scores=values if sort_order == "desc" else -values
+                )
+                result_cache.set(sorted_key, by_value)
+            scored = by_value
+        total = scored.total
+        ranked_ids = scored.top(k, offset=offset)
+
+    results = [all_meals[meal_id] for meal_id in ranked_ids]
+    terms = index.match_terms(available, fuzzy)
+    missing = [index.missing_ingredients(meal_id, terms) for meal_id in ranked_ids]
+    logger.info(f"Trouvé {total} repas pertinents", returned=len(results), offset=offset)
+
+    next_offset = offset + len(results)
+    next_cursor = (
+        encode_cursor(next_offset, index.version, query)
+        if k is not None and next_offset < total
+        else None
+    )
+    return Recommendations(
+        meals=results, total=total, next_cursor=next_cursor, missing_ingredients=missing
+    )
+
+
+def score_meals_batch(
+    index: IngredientIndex,
+    queries: Sequence[set[str]],
+    ranking: RankingMode = "count",
+    fuzzy: bool = True,
+) -> list[ScoredMeals]:
+    """Score un lot de requêtes en un seul produit matrice creuse x matrice.
+
+    Les requêtes déjà en cache (ou répétées dans le lot) ne sont scorées
+    qu'une fois; les autres partagent un unique passage sur les colonnes
+    de la matrice d'incidence. Les scores sont identiques à `score_meals`
+    et alimentent le même cache de résultats.
+
+    Args:
+        index: Index du dataset courant
+        queries: Ingrédients normalisés de chaque requête
+        ranking: Mode de classement ("count" ou "bm25")
+        fuzzy: Corrige les ingrédients sans aucun match (fautes de frappe)
+
+    Returns:
+        Ids et scores des repas matchés, un élément par requête
+    """
+    filters = MealFilters()
+    keys = [(index.version, _query_key(q, ranking, fuzzy, filters)) for q in queries]
+    results: dict[tuple[str, tuple[object, ...]], ScoredMeals] = {}
+    pending: dict[tuple[str, tuple[object, ...]], set[str]] = {}
+    for key, available in zip(keys, queries, strict=True):
+        cached = result_cache.get(key)
+        if cached is not None:
+            results[key] = cached
+        else:
+            pending.setdefault(key, available)
+
+    if pending:
+        data = index.bm25_data if ranking == "bm25" else None
+        query_ids, meal_ids, scores = index.matrix.matmat(
+            [index.match_terms(available, fuzzy) for available in pending.values()], data
+        )
+        bounds = np.searchsorted(query_ids, np.arange(len(pending) + 1))
+        for position, key in enumerate(pending):
+            rows = slice(bounds[position], bounds[position + 1])
+            # Copies: une vue garderait tout le lot en mémoire (borne en octets du cache)
+            scored = ScoredMeals(ids=meal_ids[rows].copy(), scores=scores[rows].copy())
+            result_cache.set(key, scored)
+            results[key] = scored
+
+    logger.info("Lot scoré", queries=len(queries), computed=len(pending))
+    return [results[key] for key in keys]
+
+
+def rank_meals_batch(
+    queries: Sequence[list[str]],
+    k: int | None = None,
+    ranking: RankingMode = "count",
+    fuzzy: bool = True,
+) -> list[Recommendations]:
+    """Recommande les k meilleurs repas pour chaque requête d'un lot.
+
+    Même classement que `rank_meals` (requête par requête), mais le
+    chargement, l'index et le scoring sont partagés par tout le lot.
+
+    Args:
+        queries: Listes d'ingrédients (une par garde-manger)
+        k: Nombre max de repas par requête (None = tous)
+        ranking: Mode de classement ("count" ou "bm25")
+        fuzzy: Corrige les ingrédients sans aucun match (fautes de frappe)
+
+    Returns:
+        Recommandations de chaque requête, dans l'ordre du lot
+    """
+    normalized = [{ing.strip().lower() for ing in query if ing.strip()} for query in queries]
+    if not any(normalized):
+        return [Recommendations(meals=[], total=0) for _ in queries]
 
-    # Charge tous les repas (avec cache)
     all_meals = load_meals()
+    index = get_ingredient_index(all_meals)
+
+    results = []
+    for available, scored in zip(
+        normalized, score_meals_batch(index, normalized, ranking, fuzzy), strict=True
+    ):
+        if not available:
+            results.append(Recommendations(meals=[], total=0))
+            continue
+        ranked_ids = scored.top(k)
+        terms = index.match_terms(available, fuzzy)
+        results.append(
+            Recommendations(
+                meals=[all_meals[meal_id] for meal_id in ranked_ids],
+                total=scored.total,
+                missing_ingredients=[index.missing_ingredients(i, terms) for i in ranked_ids],
+            )
+        )
+    return results
+
+
+def recommend_from_text(
+    text: str,
+    k: int | None = None,
+    ranking: RankingMode = "count",
+) -> tuple[list[str], Recommendations]:
+    """Recommande des repas à partir d'un garde-manger en texte libre.
+
+    Les ingrédients connus sont extraits du texte en un seul passage de
+    l'automate d'Aho-Corasick du vocabulaire (construit au chargement),
+    puis classés comme une requête `rank_meals` classique.
+
+    Args:
+        text: Texte libre (ex: "2 chicken thighs, some rice and old tomatoes")
+        k: Nombre max de repas à retourner (None = tous)
+        ranking: Mode de classement ("count" ou "bm25")
+
+    Returns:
+        Ingrédients extraits et repas recommandés
+    """
+    index = get_ingredient_index(load_meals())
+    ingredients = index.extract(text)
+    logger.info("Ingrédients extraits du texte", ingredients=ingredients)
+
+    if not ingredients:
+        return [], Recommendations(meals=[], total=0)
+    # Termes exacts du vocabulaire: pas de correction orthographique
+    return ingredients, rank_meals(ingredients, k, ranking=ranking, fuzzy=False)
 
-    # Scoring
-    scored_meals: list[tuple[int, Meal]] = []
 
-    for meal in all_meals:
-        matched = 0
-        for meal_ing in meal.ingredients:
-            meal_ing_lower = meal_ing.lower()
-            # Match partiel: l'ingrédient utilisateur doit être DANS l'ingrédient repas
-            # Ex: "chicken" match "chicken breast", "chicken thigh", etc.
-            if any(user_ing in meal_ing_lower for user_ing in available):
-                matched += 1
+def recommend_meals(available_ingredients: list[str], k: int | None = None) -> list[Meal]:
+    """Recommande des repas basés sur les ingrédients disponibles.
+
+    Raccourci de `rank_meals` quand le nombre total de matchs est inutile.
+
+    Args:
+        available_ingredients: Liste d'ingrédients (ex: ["chicken", "rice"])
+        k: Nombre max de repas à retourner (None = tous)
+
+    Returns:
+        Liste triée des repas les plus pertinents
+
+    Exemple:
+        >>> meals = recommend_meals(["chicken", "rice", "tomato"], k=10)
+        >>> # Repas avec chicken+rice+tomato en premier
+    """
+    return rank_meals(available_ingredients, k).meals
+
+
+def get_similar_meals(meal_id: int, k: int = 10) -> list[SimilarMeal]:
+    """Repas dont les ingrédients recouvrent le plus ceux d'un repas donné.
+
+    Les candidats sont lus dans les buckets LSH du repas (temps quasi
+    constant), puis reclassés par similarité de Jaccard exacte.
+
+    Args:
+        meal_id: Id du repas de référence
+        k: Nombre max de repas à retourner
 
-        if matched > 0:
-            scored_meals.append((matched, meal))
+    Returns:
+        Repas similaires, par similarité décroissante
+
+    Raises:
+        DataNotFoundError: Si l'id ne correspond à aucun repas
+    """
+    meals = load_meals()
+    if not 0 <= meal_id < len(meals):
+        raise DataNotFoundError("Repas", str(meal_id))
+
+    lsh = get_similarity_index(get_ingredient_index(meals))
+    return [
+        SimilarMeal(**meals[other].model_dump(), similarity=similarity)
+        for other, similarity in lsh.similar(meal_id, k)
+    ]
 
-    # Tri par score décroissant
-    scored_meals.sort(key=lambda x: x[0], reverse=True)
 
-    results = [meal for _, meal in scored_meals]
-    logger.info(f"Trouvé {len(results)} repas pertinents")
+def filter_meals(
+    filters: MealFilters | None = None,
+    sort_by: NutrientName | None = None,
+    sort_order: SortOrder = "asc",
+) -> Sequence[Meal]:
+    """Filtre les repas par attributs et plages nutritionnelles, avec tri optionnel.
 
+    Les filtres sont évalués sur les index d'attributs et les colonnes
+    nutritionnelles (construits au chargement), puis intersectés en bitset,
+    et le tri lit l'ordre précalculé de la colonne: aucun parcours des repas.
+
+    Args:
+        filters: Filtres d'attributs et nutritionnels (None = tous les repas)
+        sort_by: Nutriment de tri (None = ordre du dataset)
+        sort_order: "asc" (croissant) ou "desc" (décroissant)
+
+    Returns:
+        Repas satisfaisant tous les filtres (vue sur le dataset: les repas
+        ne sont lus qu'à l'itération)
+    """
+    meals = load_meals()
+    filters = filters or MealFilters()
+    if not filters.attributes() and not filters.nutrition and sort_by is None:
+        return meals
+
+    index = get_ingredient_index(meals)
+    allowed = _attribute_bitset(index, filters)
+    if sort_by is not None:
+        ids = index.nutrition.ordered(sort_by, sort_order, allowed)
+    elif allowed is not None:
+        ids = np.flatnonzero(bitset.to_mask(allowed, len(meals)))
+    else:
+        return meals
+
+    results = MealSelection(meals, ids)
+    logger.info("Filtre repas", filters=filters.key(), sort_by=sort_by, count=len(results))
     return results
 
 
-def get_meals_by_cuisine(cuisine: str | None = None) -> list[Meal]:
+def get_meals_by_cuisine(cuisine: str | None = None) -> Sequence[Meal]:
     """Filtre les repas par type de cuisine.
 
     Args:
@@ -210,14 +1205,7 @@ def get_meals_by_cuisine(cuisine: str | None = None) -> list[Meal]:
     Returns:
         Liste filtrée ou tous les repas si cuisine=None
     """
-    meals = load_meals()
-
-    if cuisine:
-        cuisine_lower = cuisine.strip().lower()
-        meals = [m for m in meals if m.cuisine and m.cuisine.lower() == cuisine_lower]
-        logger.info(f"Filtre cuisine '{cuisine}': {len(meals)} repas")
-
-    return meals
+    return filter_meals(MealFilters.create(cuisine=[cuisine] if cuisine else None))
 
 
 def get_sample_meals(count: int = 5) -> list[Meal]:
@@ -230,4 +1218,4 @@ def get_sample_meals(count: int = 5) -> list[Meal]:
         Liste de repas
     """
     meals = load_meals()
-    return meals[:count]
+    return list(meals[:count])
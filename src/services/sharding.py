@@ -0,0 +1,217 @@
+"""Scoring réparti sur un pool de processus (très gros datasets).
+
+Les repas sont partitionnés en shards contigus (plages d'ids). La matrice
+d'incidence est réordonnée par (shard, terme, repas) puis copiée une seule
+fois en mémoire partagée: les workers la lisent sans copie ni pickling.
+
+Par requête, seuls les ids des termes, k et l'éventuel filtre transitent
+vers les workers. Chaque shard renvoie son top-k local et son nombre de
+matchs, que le coordinateur fusionne en un top-k global identique au
+scoring en un seul processus.
+"""
+
+import multiprocessing
+import threading
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from src.services import bitset
+from src.services.sparse_matrix import (
+    FloatArray,
+    IncidenceMatrix,
+    IntArray,
+    concat_ranges,
+    select_top_k,
+)
+
+# (nom du segment, dtype, taille) de chaque tableau partagé
+ArraySpec = tuple[str, str, int]
+
+# Vues NumPy sur la mémoire partagée, côté worker
+_arrays: dict[str, npt.NDArray[Any]] = {}
+_segments: list[SharedMemory] = []
+
+
+def _attach(specs: dict[str, ArraySpec]) -> None:
+    """Initialiseur des workers: ouvre les tableaux partagés (sans copie)."""
+    for key, (name, dtype, size) in specs.items():
+        # Les workers (spawn) partagent le resource tracker du coordinateur:
+        # le segment y est déjà enregistré, et seul le coordinateur le libère
+        segment = SharedMemory(name=name)
+        _segments.append(segment)
+        _arrays[key] = np.ndarray((size,), dtype=np.dtype(dtype), buffer=segment.buf)
+
+
+def _score_shard(
+    shard: int,
+    start: int,
+    stop: int,
+    term_ids: list[int],
+    bm25: bool,
+    k: int | None,
+    allowed: int | None,
+) -> tuple[int, IntArray, FloatArray]:
+    """Score un shard et renvoie son top-k local.
+
+    Args:
+        shard: Numéro du shard
+        start, stop: Plage d'ids de repas du shard
+        term_ids: Termes du vocabulaire matchés par la requête
+        bm25: Poids BM25 au lieu des occurrences
+        k: Nombre max de résultats (None = tous)
+        allowed: Bitset des repas autorisés du shard (décalé de `start`)
+
+    Returns:
+        (nombre de repas matchés, ids globaux, scores) du top-k local
+    """
+    n_terms = int(_arrays["n_terms"][0])
+    indptr = _arrays["indptr"]
+    cols = np.asarray(term_ids, dtype=np.int64) + shard * n_terms
+    positions = concat_ranges(indptr[cols], indptr[cols + 1])
+    values = _arrays["bm25" if bm25 else "data"]
+    scores: FloatArray = np.bincount(
+        _arrays["rows"][positions] - start,
+        weights=values[positions],
+        minlength=stop - start,
+    ).astype(np.float64, copy=False)
+
+    matched = scores > 0
+    if allowed is not None:
+        matched &= bitset.to_mask(allowed, stop - start)
+    ids = np.flatnonzero(matched)
+    ranked = select_top_k(ids, scores[ids], k)
+    return int(ids.size), ranked + start, scores[ranked]
+
+
+class ShardedScorer:
+    """Pool de processus qui score les repas par shards.
+
+    Le pool est compté par référence: chaque requête l'acquiert (`acquire`)
+    puis le libère (`release`). Un pool remplacé (`retire`) n'est arrêté
+    qu'une fois ses requêtes en cours terminées.
+
+    Attributes:
+        bounds: Ids de début de chaque shard (+ fin du dernier)
+        n_shards: Nombre de shards (= nombre de workers)
+    """
+
+    def __init__(self, matrix: IncidenceMatrix, bm25_data: FloatArray, workers: int):
+        """Partitionne la matrice et démarre le pool.
+
+        Args:
+            matrix: Matrice d'incidence du dataset
+            bm25_data: Poids BM25 alignés sur `matrix.col_data`
+            workers: Nombre de processus (et de shards)
+        """
+        n_meals, n_terms = matrix.shape
+        self.n_shards = workers
+        self.bounds: IntArray = np.linspace(0, n_meals, workers + 1).astype(np.int64)
+
+        # Entrées CSC réordonnées par (shard, terme, repas)
+        cols = np.repeat(np.arange(n_terms, dtype=np.int64), np.diff(matrix.col_indptr))
+        shards = np.searchsorted(self.bounds, matrix.col_rows, side="right") - 1
+        order = np.lexsort((matrix.col_rows, cols, shards))
+        indptr = np.zeros(workers * n_terms + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(shards * n_terms + cols, minlength=workers * n_terms),
+            out=indptr[1:],
+        )
+
+        self._lock = threading.Lock()
+        self._active = 0
+        self._retired = False
+        self._segments: list[SharedMemory] = []
+        specs = {
+            "n_terms": self._share(np.array([n_terms], dtype=np.int64)),
+            "indptr": self._share(indptr),
+            "rows": self._share(matrix.col_rows[order]),
+            "data": self._share(matrix.col_data[order]),
+            "bm25": self._share(bm25_data[order]),
+        }
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_attach,
+            initargs=(specs,),
+        )
+
+    def _share(self, array: npt.NDArray[np.generic]) -> ArraySpec:
+        """Copie un tableau en mémoire partagée et retourne sa description."""
+        segment = SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[:] = array
+        self._segments.append(segment)
+        return segment.name, array.dtype.str, int(array.size)
+
+    def rank(
+        self,
+        term_ids: Iterable[int],
+        bm25: bool = False,
+        k: int | None = None,
+        allowed: int | None = None,
+    ) -> tuple[int, list[int]]:
+        """Classe les repas sur tous les shards et fusionne les top-k.
+
+        Args:
+            term_ids: Termes du vocabulaire matchés par la requête
+            bm25: Poids BM25 au lieu des occurrences
+            k: Nombre max de résultats (None = tous)
+            allowed: Bitset global des repas autorisés (None = tous)
+
+        Returns:
+            (nombre total de repas matchés, ids classés)
+        """
+        terms = sorted(term_ids)
+        futures = []
+        for shard in range(self.n_shards):
+            start, stop = int(self.bounds[shard]), int(self.bounds[shard + 1])
+            shard_allowed = None
+            if allowed is not None:
+                shard_allowed = (allowed >> start) & bitset.full(stop - start)
+            futures.append(
+                self._executor.submit(
+                    _score_shard, shard, start, stop, terms, bm25, k, shard_allowed
+                )
+            )
+
+        results = [future.result() for future in futures]
+        total = sum(count for count, _, _ in results)
+        # Shards contigus et croissants: on remet les ids en ordre croissant
+        ids = np.concatenate([shard_ids for _, shard_ids, _ in results])
+        scores = np.concatenate([shard_scores for _, _, shard_scores in results])
+        order = np.argsort(ids, kind="stable")
+        ranked = select_top_k(ids[order], scores[order], k)
+        return total, ranked.tolist()
+
+    def acquire(self) -> None:
+        """Réserve le pool pour une requête (à libérer par `release`)."""
+        with self._lock:
+            self._active += 1
+
+    def release(self) -> None:
+        """Libère le pool; arrête un pool retiré dont c'était la dernière requête."""
+        with self._lock:
+            self._active -= 1
+            idle = self._retired and self._active == 0
+        if idle:
+            self.close()
+
+    def retire(self) -> None:
+        """Arrête le pool dès qu'aucune requête ne l'utilise plus."""
+        with self._lock:
+            self._retired = True
+            idle = self._active == 0
+        if idle:
+            self.close()
+
+    def close(self) -> None:
+        """Arrête immédiatement les workers et libère la mémoire partagée."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+        self._segments.clear()
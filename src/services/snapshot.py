@@ -0,0 +1,275 @@
+"""Snapshot binaire du dataset pré-parsé.
+
+Le parsing du CSV (pandas, nettoyage des colonnes, compilation du
+vocabulaire) est refait à chaque démarrage et à chaque expiration du TTL.
+Le snapshot enregistre son résultat à côté du CSV, dans un seul fichier
+mappable en mémoire: un en-tête JSON (format, empreinte du CSV source,
+dtype / forme / offset de chaque tableau) suivi des tableaux bruts alignés
+(pas de pickle). Arènes de texte + offsets, ingrédients, tags et index des
+attributs au format CSR, nutrition en matrice float64.
+
+Il est indexé par l'empreinte du CSV source: un démarrage à chaud le mappe
+sans toucher au CSV, et toute modification du CSV (ou du format)
+l'invalide. Les repas relus forment un `MealStore` dont les colonnes sont
+des vues sur le fichier mappé, partagées par tous les workers.
+
+Console script `meal-snapshot`: précompile le snapshot (images Docker).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, BinaryIO
+
+import numpy as np
+import numpy.typing as npt
+
+from src.core.logging import get_logger
+from src.models.schemas import Meal
+from src.services.attribute_index import ATTRIBUTES, AttributeIndex
+from src.services.meal_store import TEXT_FIELDS, MealStore, StringArena
+from src.services.nutrition_index import NUTRIENTS, NutritionColumns
+from src.services.vocabulary import CompiledIngredients, IngredientVocabulary
+
+logger = get_logger(__name__)
+
+# Incrémenté à chaque changement du contenu ou de la structure du snapshot
+SNAPSHOT_FORMAT = 2
+MAGIC = b"MEALSNAP"
+# Alignement des tableaux dans le fichier (vues NumPy alignées)
+ALIGNMENT = 64
+
+# Tableaux nommés d'un snapshot
+Arrays = dict[str, npt.NDArray[Any]]
+
+
+@dataclass(frozen=True)
+class ParsedDataset:
+    """Repas et structures dérivées, tels qu'enregistrés dans le snapshot.
+
+    Attributes:
+        meals: Repas (`MealStore` construit au parsing ou relu du snapshot,
+            ou liste)
+        compiled: Ingrédients des repas compilés en ids entiers
+        attributes: Index des attributs des mêmes repas
+        nutrition: Colonnes nutritionnelles des mêmes repas
+        source: Empreinte (`file_digest`) du CSV dont les repas sont issus
+            ("" si inconnue)
+    """
+
+    meals: Sequence[Meal]
+    compiled: CompiledIngredients
+    attributes: AttributeIndex
+    nutrition: NutritionColumns
+    source: str = ""
+
+
+def file_digest(path: Path) -> str:
+    """Empreinte BLAKE2b du contenu d'un fichier (lu par blocs)."""
+    digest = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _pack(name: str, arena: StringArena) -> Arrays:
+    """Tableaux d'une arène de texte (`name.data`, `name.offsets`)."""
+    return {f"{name}.data": arena.data, f"{name}.offsets": arena.offsets}
+
+
+def _columns(dataset: ParsedDataset) -> Arrays:
+    """Tableaux du snapshot d'un dataset."""
+    meals, compiled = dataset.meals, dataset.compiled
+    arrays: Arrays = {
+        "ingredients.indptr": compiled.indptr,
+        "ingredients.ids": compiled.ids,
+        "nutrition": np.column_stack(
+            [dataset.nutrition.columns[name] for name in NUTRIENTS]
+        ).reshape(len(meals), len(NUTRIENTS)),
+    }
+    arrays |= _pack("vocabulary", StringArena.pack(compiled.vocabulary.terms))
+
+    if isinstance(meals, MealStore):
+        # Colonnes déjà encodées: reprises telles quelles, sans décodage
+        arrays["tags.indptr"] = meals.tags_indptr
+        arrays |= _pack("tags", meals.tags)
+        for field in TEXT_FIELDS:
+            arrays |= _pack(field, meals.texts[field])
+            arrays[f"{field}.null"] = meals.nulls[field]
+    else:
+        tag_counts = [len(meal.tags) for meal in meals]
+        arrays["tags.indptr"] = np.cumsum([0, *tag_counts], dtype=np.int64)
+        arrays |= _pack("tags", StringArena.pack([tag for meal in meals for tag in meal.tags]))
+        for field in TEXT_FIELDS:
+            values = [getattr(meal, field) for meal in meals]
+            arrays |= _pack(field, StringArena.pack([v or "" for v in values]))
+            arrays[f"{field}.null"] = np.array([v is None for v in values], dtype=np.bool_)
+    for attribute in ATTRIBUTES:
+        postings = dataset.attributes.postings(attribute)
+        arrays |= _pack(f"attributes.{attribute}", StringArena.pack(list(postings)))
+        arrays[f"attributes.{attribute}.indptr"] = np.cumsum(
+            [0, *(ids.size for ids in postings.values())], dtype=np.int64
+        )
+        arrays[f"attributes.{attribute}.ids"] = np.concatenate(
+            [np.empty(0, dtype=np.int64), *postings.values()]
+        )
+    return arrays
+
+
+def _write_arrays(f: BinaryIO, meta: Mapping[str, object], arrays: Arrays) -> None:
+    """Écrit l'en-tête puis les tableaux bruts, alignés sur `ALIGNMENT`."""
+    offsets: dict[str, int] = {}
+    offset = 0
+    for name, array in arrays.items():
+        offsets[name] = offset = _align(offset)
+        offset += array.nbytes
+    layout = {
+        name: {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offsets[name]}
+        for name, array in arrays.items()
+    }
+
+    header = json.dumps({**meta, "arrays": layout}).encode()
+    f.write(MAGIC + len(header).to_bytes(8, "little") + header)
+    start = _align(len(MAGIC) + 8 + len(header))
+    for name, array in arrays.items():
+        f.write(b"\0" * (start + offsets[name] - f.tell()))
+        f.write(np.ascontiguousarray(array).tobytes())
+
+
+def write_snapshot(path: Path, source: str, dataset: ParsedDataset) -> None:
+    """Enregistre un dataset parsé.
+
+    L'écriture passe par un fichier temporaire renommé: un processus
+    concurrent ne lit jamais un snapshot partiel, et les workers qui
+    mappent l'ancien fichier gardent une vue cohérente.
+
+    Args:
+        path: Chemin du snapshot
+        source: Empreinte du CSV source (`file_digest`)
+        dataset: Repas, ingrédients compilés, attributs et nutrition
+
+    Raises:
+        OSError: Si le fichier ne peut pas être écrit
+    """
+    meta = {"format": SNAPSHOT_FORMAT, "source": source, "meals": len(dataset.meals)}
+    arrays = _columns(dataset)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp_path.open("wb") as f:
+            _write_arrays(f, meta, arrays)
+        tmp_path.replace(path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    logger.info("Snapshot dataset écrit", path=str(path), meals=len(dataset.meals))
+
+
+def read_snapshot(path: Path, source: str) -> ParsedDataset | None:
+    """Mappe le snapshot en mémoire s'il correspond au CSV source.
+
+    Args:
+        path: Chemin du snapshot
+        source: Empreinte du CSV source actuel
+
+    Returns:
+        Dataset dont les repas sont un `MealStore` mappé, ou None si le
+        snapshot est absent, périmé (autre CSV, autre format) ou illisible
+    """
+    if not path.exists():
+        return None
+    try:
+        with path.open("rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError("en-tête de snapshot invalide")
+            size = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(size))
+        if header.get("format") != SNAPSHOT_FORMAT or header.get("source") != source:
+            logger.info("Snapshot dataset périmé", path=str(path))
+            return None
+
+        raw = np.memmap(path, dtype=np.uint8, mode="r")
+        start = _align(len(MAGIC) + 8 + size)
+        arrays: Arrays = {}
+        for name, spec in header["arrays"].items():
+            dtype = np.dtype(spec["dtype"])
+            offset = start + spec["offset"]
+            count = int(np.prod(spec["shape"]))
+            if count == 0:
+                arrays[name] = np.empty(spec["shape"], dtype=dtype)
+                continue
+            if offset + count * dtype.itemsize > raw.size:
+                raise ValueError(f"snapshot tronqué ({name})")
+            arrays[name] = np.frombuffer(raw, dtype, count, offset).reshape(spec["shape"])
+        return replace(_decode(arrays), source=source)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning("Snapshot dataset illisible", path=str(path), error=str(e))
+        return None
+
+
+def _decode(arrays: Arrays) -> ParsedDataset:
+    """Reconstruit le store des repas et les index d'un snapshot mappé."""
+
+    def arena(name: str) -> StringArena:
+        return StringArena(arrays[f"{name}.data"], arrays[f"{name}.offsets"])
+
+    vocabulary = IngredientVocabulary()
+    for term in arena("vocabulary").tolist():
+        vocabulary.add(term)
+    compiled = CompiledIngredients(
+        vocabulary, arrays["ingredients.indptr"], arrays["ingredients.ids"]
+    )
+    meals = MealStore(
+        compiled,
+        nutrition=arrays["nutrition"],
+        texts={field: arena(field) for field in TEXT_FIELDS},
+        nulls={field: arrays[f"{field}.null"] for field in TEXT_FIELDS},
+        tags=arena("tags"),
+        tags_indptr=arrays["tags.indptr"],
+    )
+
+    postings = {}
+    for attribute in ATTRIBUTES:
+        ids = arrays[f"attributes.{attribute}.ids"]
+        bounds = arrays[f"attributes.{attribute}.indptr"].tolist()
+        postings[attribute] = {
+            value: ids[bounds[i] : bounds[i + 1]]
+            for i, value in enumerate(arena(f"attributes.{attribute}").tolist())
+        }
+    return ParsedDataset(
+        meals,
+        compiled,
+        AttributeIndex(meals, postings),
+        NutritionColumns(meals, meals.nutrition),
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Entrypoint console script: précompile le snapshot du dataset."""
+    parser = argparse.ArgumentParser(
+        prog="meal-snapshot",
+        description="Parse le CSV des recettes et enregistre le snapshot binaire.",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Reconstruit / re-télécharge le CSV source avant le parsing",
+    )
+    args = parser.parse_args(argv)
+
+    from src.services.recommender import build_snapshot
+
+    build_snapshot(force_refresh=args.refresh)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""Matrice d'incidence creuse repas x ingrédients (NumPy).
+
+Backend de scoring vectorisé pour `recommend_meals`:
+- Stockage CSR (ligne = repas, colonne = terme du vocabulaire)
+- Transposée CSC précalculée pour ne lire que les colonnes de la requête
+- Score = produit matrice creuse x vecteur requête (un seul `bincount`)
+- Lot de requêtes = produit matrice creuse x matrice requêtes (un passage)
+- Sélection des meilleurs résultats par `argpartition`
+
+Implémenté en NumPy pur (pas de dépendance SciPy) : le produit avec un
+vecteur requête binaire revient à sommer les colonnes sélectionnées.
+"""
+
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from src.services.vocabulary import CompiledIngredients
+
+IntArray = npt.NDArray[np.int64]
+FloatArray = npt.NDArray[np.float64]
+
+
+class IncidenceMatrix:
+    """Matrice creuse repas x termes au format CSR (+ transposée CSC).
+
+    Attributes:
+        shape: (nombre de repas, taille du vocabulaire)
+        indptr: Offsets CSR, les termes du repas i sont
+            `indices[indptr[i]:indptr[i + 1]]`
+        indices: Ids des termes (colonnes), croissants pour chaque repas
+        data: Nombre d'occurrences du terme dans le repas
+        col_indptr, col_rows, col_data: Même matrice au format CSC
+            (colonne = posting list du terme, ids de repas croissants)
+    """
+
+    def __init__(
+        self,
+        indptr: IntArray,
+        indices: IntArray,
+        data: FloatArray,
+        n_terms: int,
+    ):
+        """Construit la matrice depuis ses tableaux CSR.
+
+        Args:
+            indptr: Offsets CSR (taille n_meals + 1)
+            indices: Ids des termes, triés pour chaque repas
+            data: Valeurs alignées sur `indices`
+            n_terms: Taille du vocabulaire (colonnes)
+        """
+        n_meals = len(indptr) - 1
+        self.shape = (n_meals, n_terms)
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+
+        # CSC: tri stable des entrées par terme (les repas restent croissants)
+        rows = np.repeat(np.arange(n_meals, dtype=np.int64), np.diff(indptr))
+        order = np.argsort(indices, kind="stable")
+        self.col_rows: IntArray = rows[order]
+        self.col_data: FloatArray = data[order]
+        self.col_indptr: IntArray = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(np.bincount(indices, minlength=n_terms), out=self.col_indptr[1:])
+
+    @classmethod
+    def from_ingredients(cls, compiled: CompiledIngredients) -> "IncidenceMatrix":
+        """Construit la matrice depuis les ingrédients compilés en ids.
+
+        Les doublons d'un même repas sont fusionnés (valeur = occurrences)
+        en un seul passage vectorisé sur les clés (repas, terme).
+
+        Args:
+            compiled: Ingrédients de chaque repas en ids entiers
+
+        Returns:
+            Matrice d'incidence repas x termes
+        """
+        n_meals, n_terms = compiled.n_meals, len(compiled.vocabulary)
+        rows = np.repeat(np.arange(n_meals, dtype=np.int64), compiled.lengths)
+        keys, counts = np.unique(rows * n_terms + compiled.ids, return_counts=True)
+
+        indptr = np.zeros(n_meals + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // max(n_terms, 1), minlength=n_meals), out=indptr[1:])
+        return cls(
+            indptr=indptr,
+            indices=keys % max(n_terms, 1),
+            data=counts.astype(np.float64),
+            n_terms=n_terms,
+        )
+
+    @property
+    def nnz(self) -> int:
+        """Nombre d'entrées non nulles."""
+        return int(self.indptr[-1])
+
+    def matvec(self, term_ids: Iterable[int], data: FloatArray | None = None) -> FloatArray:
+        """Produit matrice x vecteur requête binaire.
+
+        Args:
+            term_ids: Colonnes à 1 dans le vecteur requête
+            data: Valeurs alternatives des entrées, alignées sur `col_data`
+                (ex: poids BM25). Par défaut, les occurrences.
+
+        Returns:
+            Score de chaque repas (tableau dense de taille n_meals)
+        """
+        cols = np.fromiter(term_ids, dtype=np.int64)
+        if cols.size == 0:
+            return np.zeros(self.shape[0], dtype=np.float64)
+
+        starts = self.col_indptr[cols]
+        ends = self.col_indptr[cols + 1]
+        positions = concat_ranges(starts, ends)
+        scores: FloatArray = np.bincount(
+            self.col_rows[positions],
+            weights=(self.col_data if data is None else data)[positions],
+            minlength=self.shape[0],
+        ).astype(np.float64, copy=False)
+        return scores
+
+    def matmat(
+        self,
+        queries: Sequence[Iterable[int]],
+        data: FloatArray | None = None,
+    ) -> tuple[IntArray, IntArray, FloatArray]:
+        """Produit matrice x matrice requêtes binaire (une colonne par requête).
+
+        Toutes les colonnes du lot sont lues en un seul passage vectorisé,
+        et le résultat reste creux: seules les paires (requête, repas)
+        de score non nul sont produites.
+
+        Args:
+            queries: Colonnes à 1 de chaque requête
+            data: Valeurs alternatives des entrées, alignées sur `col_data`
+
+        Returns:
+            (ids de requête, ids de repas, scores), triés par requête
+            puis par repas croissant
+        """
+        n_meals = self.shape[0]
+        cols_per_query = [np.fromiter(term_ids, dtype=np.int64) for term_ids in queries]
+        sizes = np.array([cols.size for cols in cols_per_query], dtype=np.int64)
+        if not cols_per_query or int(sizes.sum()) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0, dtype=np.float64)
+
+        cols = np.concatenate(cols_per_query)
+        starts = self.col_indptr[cols]
+        ends = self.col_indptr[cols + 1]
+        positions = concat_ranges(starts, ends)
+
+        # Clé (requête, repas) de chaque entrée lue, puis somme par clé
+        query_of_col = np.repeat(np.arange(len(cols_per_query), dtype=np.int64), sizes)
+        keys = np.repeat(query_of_col, ends - starts) * n_meals + self.col_rows[positions]
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        scores: FloatArray = np.bincount(
+            inverse,
+            weights=(self.col_data if data is None else data)[positions],
+            minlength=unique_keys.size,
+        ).astype(np.float64, copy=False)
+        return unique_keys // n_meals, unique_keys % n_meals, scores
+
+
+def concat_ranges(starts: IntArray, ends: IntArray) -> IntArray:
+    """Concatène les intervalles [start, end) sans boucle Python.
+
+    Exemple:
+        >>> concat_ranges(np.array([0, 5]), np.array([2, 7])).tolist()
+        [0, 1, 5, 6]
+    """
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    offsets: IntArray = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return np.arange(total, dtype=np.int64) + offsets
+
+
+def top_k(scores: FloatArray, k: int | None = None) -> IntArray:
+    """Sélectionne les ids des meilleurs scores (> 0) d'un vecteur dense.
+
+    Args:
+        scores: Score de chaque repas
+        k: Nombre max de résultats (None = tous)
+
+    Returns:
+        Ids des repas classés
+    """
+    candidates = np.flatnonzero(scores > 0)
+    return select_top_k(candidates, scores[candidates], k)
+
+
+def select_top_k(ids: IntArray, scores: FloatArray, k: int | None = None) -> IntArray:
+    """Classe des candidats (ids croissants) et garde les k meilleurs.
+
+    Tri par score décroissant puis id croissant (même ordre que le tri
+    stable historique). Si `k` est fourni, `argpartition` isole d'abord les
+    k meilleurs candidats pour ne trier qu'eux.
+
+    Args:
+        ids: Ids des repas candidats, triés par ordre croissant
+        scores: Scores alignés sur `ids`
+        k: Nombre max de résultats (None = tous)
+
+    Returns:
+        Ids des repas classés
+    """
+    if k is not None and k < ids.size:
+        # Seuil = k-ième meilleur score; on garde tout ce qui est au-dessus
+        # puis les ex aequo de plus petit id pour compléter
+        kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        above = scores > kth
+        ties = np.flatnonzero(scores == kth)[: k - int(above.sum())]
+        keep = np.sort(np.concatenate([np.flatnonzero(above), ties]))
+        ids, scores = ids[keep], scores[keep]
+
+    order = np.lexsort((ids, -scores))
+    ranked: IntArray = ids[order]
+    return ranked
@@ -0,0 +1,113 @@
+"""Vocabulaire des ingrédients compilé en ids entiers.
+
+Compilé une seule fois au chargement du dataset:
+- Chaque ingrédient distinct (normalisé: minuscules, trimé) reçoit un id
+  entier, dans l'ordre de première apparition
+- Les ingrédients de chaque repas sont stockés en tableau d'ids compact
+  (format CSR: `indptr` + `ids`), dans l'ordre d'origine
+
+Les index, le scoring et les opérations ensemblistes travaillent ensuite
+sur ces entiers plutôt que sur des chaînes répétées.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from src.models.schemas import Meal
+
+TermIdArray = npt.NDArray[np.int32]
+
+
+class IngredientVocabulary:
+    """Table bidirectionnelle ingrédient <-> id entier.
+
+    Attributes:
+        terms: Ingrédients distincts, l'id d'un terme = sa position
+    """
+
+    def __init__(self) -> None:
+        self.terms: list[str] = []
+        self._ids: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __getitem__(self, term_id: int) -> str:
+        return self.terms[term_id]
+
+    def __contains__(self, term: object) -> bool:
+        return term in self._ids
+
+    def get_id(self, term: str) -> int | None:
+        """Retourne l'id d'un terme normalisé, ou None s'il est inconnu."""
+        return self._ids.get(term)
+
+    def add(self, term: str) -> int:
+        """Retourne l'id d'un terme, en l'ajoutant s'il est nouveau."""
+        term_id = self._ids.get(term)
+        if term_id is None:
+            term_id = len(self.terms)
+            self._ids[term] = term_id
+            self.terms.append(term)
+        return term_id
+
+
+class CompiledIngredients:
+    """Ingrédients de tous les repas sous forme d'ids entiers (CSR).
+
+    Attributes:
+        vocabulary: Vocabulaire global
+        indptr: Offsets, les ids du repas i sont `ids[indptr[i]:indptr[i + 1]]`
+        ids: Ids des ingrédients de tous les repas, concaténés (int32)
+    """
+
+    def __init__(
+        self,
+        vocabulary: IngredientVocabulary,
+        indptr: npt.NDArray[np.int64],
+        ids: TermIdArray,
+    ):
+        self.vocabulary = vocabulary
+        self.indptr = indptr
+        self.ids = ids
+
+    @property
+    def n_meals(self) -> int:
+        """Nombre de repas compilés."""
+        return len(self.indptr) - 1
+
+    @property
+    def lengths(self) -> npt.NDArray[np.int64]:
+        """Nombre d'ingrédients de chaque repas (doublons inclus)."""
+        return np.diff(self.indptr)
+
+    def ingredient_ids(self, meal_id: int) -> TermIdArray:
+        """Ids des ingrédients d'un repas, dans l'ordre d'origine."""
+        return self.ids[self.indptr[meal_id] : self.indptr[meal_id + 1]]
+
+    def ingredients(self, meal_id: int) -> list[str]:
+        """Ingrédients d'un repas (chaînes partagées du vocabulaire)."""
+        terms = self.vocabulary.terms
+        return [terms[term_id] for term_id in self.ingredient_ids(meal_id).tolist()]
+
+
+def compile_ingredients(meals: Sequence[Meal]) -> CompiledIngredients:
+    """Compile le vocabulaire et les tableaux d'ids de tous les repas.
+
+    Args:
+        meals: Repas à compiler (l'id d'un repas = sa position)
+
+    Returns:
+        Vocabulaire global et ingrédients de chaque repas en ids
+    """
+    vocabulary = IngredientVocabulary()
+    indptr = np.zeros(len(meals) + 1, dtype=np.int64)
+    ids: list[int] = []
+
+    for meal_id, meal in enumerate(meals):
+        ids.extend(vocabulary.add(ingredient.strip().lower()) for ingredient in meal.ingredients)
+        indptr[meal_id + 1] = len(ids)
+
+    return CompiledIngredients(vocabulary, indptr, np.array(ids, dtype=np.int32))
@@ -1,45 +1,47 @@
 """Client API pour communiquer avec le backend FastAPI.
 
-Gère les appels HTTP avec cache et gestion d'erreurs.
+Gère les appels HTTP et la gestion d'erreurs.
 """
 
 import os
 from typing import Any, cast
 
 import requests
-import streamlit as st
 
 API_URL = os.getenv("API_URL", "http://localhost:8000")
-API_FETCH_LIMIT = 60
+API_PAGE_SIZE = 20
 
 
-@st.cache_data(ttl=300, show_spinner=False)
-def fetch_meals(ingredients: tuple[str, ...], limit: int | None = None) -> list[dict[str, Any]]:
-    """Récupère les repas depuis l'API avec cache.
+def fetch_meals_page(
+    ingredients: tuple[str, ...],
+    limit: int = API_PAGE_SIZE,
+    cursor: str | None = None,
+) -> tuple[list[dict[str, Any]], str | None]:
+    """Récupère une page de recommandations (pagination par curseur).
+
+    Pas de `st.cache_data`: une page mise en cache survivrait à une
+    reconstruction de l'index et renverrait un curseur périmé (422). Les
+    pages déjà reçues sont gardées dans `st.session_state`.
 
     Args:
         ingredients: Tuple d'ingrédients pour la recherche
-        limit: Nombre maximum de résultats
+        limit: Taille de la page
+        cursor: Curseur renvoyé par la page précédente (None = 1ère page)
 
     Returns:
-        Liste des repas trouvés
+        Repas de la page et curseur de la page suivante (None si dernière)
 
     Raises:
         requests.RequestException: Si l'API est inaccessible
     """
-    if ingredients:
-        params: list[tuple[str, str]] = [("available_ingredients", ing) for ing in ingredients]
-        url = f"{API_URL}/meals/by-ingredients"
-    else:
-        params = []
-        url = f"{API_URL}/meals/all"
-
-    if limit is not None:
-        params.append(("limit", str(limit)))
+    params: list[tuple[str, str]] = [("available_ingredients", ing) for ing in ingredients]
+    params.append(("limit", str(limit)))
+    if cursor:
+        params.append(("cursor", cursor))
 
-    response = requests.get(url, params=params or None, timeout=15)
+    response = requests.get(f"{API_URL}/meals/by-ingredients", params=params, timeout=15)
     response.raise_for_status()
-    return cast(list[dict[str, Any]], response.json())
+    return cast(list[dict[str, Any]], response.json()), response.headers.get("X-Next-Cursor")
 
 
 def check_api_health() -> dict[str, Any] | None:
@@ -5,7 +5,7 @@ from typing import Any
 import requests
 import streamlit as st
 
-from streamlit_app.api_client import API_FETCH_LIMIT, fetch_meals
+from streamlit_app.api_client import fetch_meals_page
 from streamlit_app.components.cards import render_meal_cards
 from streamlit_app.components.layout import render_custom_css, render_hero, render_search_form
 from streamlit_app.favorites import display_favorites
@@ -18,6 +18,7 @@ def init_state() -> None:
     defaults: dict[str, Any] = {
         "last_ingredients": (),
         "last_results": [],
+        "next_cursor": None,
         "selected_meal": None,
         "selected_meal_name": None,
         "ingredients_input": "",
@@ -66,10 +67,11 @@ def main() -> None:
         else:
             try:
                 with st.spinner("Recherche en cours..."):
-                    meals = fetch_meals(ingredients, limit=API_FETCH_LIMIT)
+                    meals, next_cursor = fetch_meals_page(ingredients)
 
                 st.session_state["last_ingredients"] = ingredients
                 st.session_state["last_results"] = meals
+                st.session_state["next_cursor"] = next_cursor
                 add_to_history(list(ingredients), len(meals))
 
             except requests.RequestException as e:
@@ -89,7 +91,8 @@ def main() -> None:
 
     # Header résultats
     header_style = "display:flex;justify-content:space-between;align-items:center;padding:12px 16px;background:white;border-radius:12px;border:1px solid #e2e8f0;margin-bottom:16px;"  # noqa: E501
-    st.markdown(f"""
+    st.markdown(
+        f"""
     <div style="{header_style}">
         <div>
             <span style="font-size:1.8rem;font-weight:700;color:#2563eb;">{len(filtered)}</span>
@@ -99,11 +102,26 @@ def main() -> None:
             {min(len(filtered), limit)} sur {len(meals)}
         </div>
     </div>
-    """, unsafe_allow_html=True)
+    """,
+        unsafe_allow_html=True,
+    )
 
     # Affichage cartes
     render_meal_cards(filtered)
 
+    # Page suivante (le classement est déjà en cache côté API)
+    next_cursor = st.session_state.get("next_cursor")
+    if next_cursor and st.button("Plus de recettes", use_container_width=True):
+        try:
+            more, next_cursor = fetch_meals_page(
+                st.session_state["last_ingredients"], cursor=next_cursor
+            )
+            st.session_state["last_results"] = meals + more
+            st.session_state["next_cursor"] = next_cursor
+            st.rerun()
+        except requests.RequestException as e:
+            st.error(f"Erreur API: {e}")
+
 
 if __name__ == "__main__":
     main()
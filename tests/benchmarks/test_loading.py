@@ -0,0 +1,182 @@
+"""Benchmarks de la conversion DataFrame -> repas.
+
+Conversion ligne à ligne (`iterrows` + `row_to_meal`, validation
+Pydantic complète) vs conversion colonne par colonne (`_frame_to_meals`),
+sur le CSV fourni (`data/recipes_mealdb.csv`) et sur un CSV synthétique
+de 100 000 recettes; mapping du snapshot binaire du dataset; pic mémoire
+(tracemalloc) du parsing par paquets vs CSV lu d'un bloc; parsing de la
+colonne nutritionnelle (`safe_parse_nutrition` ligne à ligne vs
+`parse_nutrition_column`).
+"""
+
+import random
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import pytest
+from src.models.schemas import Meal
+from src.services.attribute_index import AttributeIndex
+from src.services.data_loader import parse_nutrition_column, safe_parse_nutrition
+from src.services.nutrition_index import NutritionColumns
+from src.services.recommender import _frame_to_meals, _parse_csv
+from src.services.snapshot import ParsedDataset, read_snapshot, write_snapshot
+from src.services.vocabulary import compile_ingredients
+
+from tests.helpers import row_to_meal
+
+pytestmark = pytest.mark.benchmark
+
+BUNDLED_CSV = Path(__file__).parents[2] / "data" / "recipes_mealdb.csv"
+SYNTHETIC_ROWS = 100_000
+
+
+def _iterrows_meals(df: pd.DataFrame) -> list[Meal]:
+    """Référence: l'ancienne boucle de `load_meals`."""
+    meals: list[Meal] = []
+    for _, row in df.iterrows():
+        try:
+            meals.append(row_to_meal(row, meal_id=len(meals)))
+        except Exception:
+            continue
+    return meals
+
+
+def _row_nutrition(values: pd.Series) -> list[dict[str, float]]:
+    """Référence: `safe_parse_nutrition` ligne à ligne."""
+    return [safe_parse_nutrition(v if isinstance(v, str) else None) for v in values]
+
+
+def _traced(fn: Callable[..., Any], *args: Any) -> tuple[int, int]:
+    """Exécute `fn` sous tracemalloc: (pic, mémoire retenue) en octets."""
+    tracemalloc.start()
+    try:
+        result = fn(*args)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak, retained
+
+
+@pytest.fixture(scope="module")
+def bundled() -> pd.DataFrame:
+    """Dataset TheMealDB fourni avec le dépôt."""
+    return pd.read_csv(BUNDLED_CSV)
+
+
+@pytest.fixture(scope="module")
+def synthetic(tmp_path_factory: pytest.TempPathFactory) -> pd.DataFrame:
+    """CSV synthétique de 100 000 recettes (mêmes colonnes, nutrition renseignée)."""
+    rng = random.Random(3)
+    vocabulary = [f"ingredient {i}" for i in range(3000)]
+    cuisines = ["italian", "indian", "french", "mexican", "japanese"]
+    rows = [
+        {
+            "name": f"Recipe {i}",
+            "ingredients": ", ".join(rng.sample(vocabulary, rng.randint(3, 15))),
+            "nutritions": str(
+                {
+                    name: {"amount": round(rng.uniform(0, 800), 1), "unit": "g"}
+                    for name in ("calories", "protein", "fat", "carbohydrates", "sugars", "fiber")
+                }
+            ),
+            "tags": f"{rng.choice(cuisines)};quick;easy",
+            "image_url": f"http://img.example.com/{i}.jpg",
+            "prep_time": "30-minutes-or-less",
+            "diet_type": rng.choice(["vegetarian", "", "low-carb"]),
+            "dish_type": rng.choice(["Main", "Dessert", "Side"]),
+            "seasonal": "",
+            "category": "",
+        }
+        for i in range(SYNTHETIC_ROWS)
+    ]
+    path = tmp_path_factory.mktemp("data") / "recipes_100k.csv"
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return pd.read_csv(path)
+
+
+def test_iterrows_bundled(benchmark, bundled):
+    """Référence ligne à ligne, CSV fourni."""
+    assert len(benchmark(_iterrows_meals, bundled)) == len(bundled)
+
+
+def test_columnar_bundled(benchmark, bundled):
+    """Conversion vectorisée, CSV fourni: mêmes repas que la référence."""
+    meals = benchmark(_frame_to_meals, bundled)
+    assert meals == _iterrows_meals(bundled)
+
+
+@pytest.mark.slow
+def test_iterrows_synthetic(benchmark, synthetic):
+    """Référence ligne à ligne, 100 000 recettes (un seul passage)."""
+    meals = benchmark.pedantic(_iterrows_meals, args=(synthetic,), rounds=1, iterations=1)
+    assert len(meals) == SYNTHETIC_ROWS
+
+
+@pytest.mark.slow
+def test_columnar_synthetic(benchmark, synthetic):
+    """Conversion vectorisée, 100 000 recettes (un seul passage)."""
+    meals = benchmark.pedantic(_frame_to_meals, args=(synthetic,), rounds=1, iterations=1)
+    assert len(meals) == SYNTHETIC_ROWS
+    assert meals[:500] == _iterrows_meals(synthetic.head(500))
+
+
+def test_snapshot_bundled(benchmark, bundled, tmp_path):
+    """Mapping du snapshot binaire (sans pandas), CSV fourni."""
+    meals = _frame_to_meals(bundled)
+    path = tmp_path / "recipes.snapshot.bin"
+    dataset = ParsedDataset(
+        meals, compile_ingredients(meals), AttributeIndex(meals), NutritionColumns(meals)
+    )
+    write_snapshot(path, "bundled", dataset)
+    loaded = benchmark(read_snapshot, path, "bundled")
+    assert loaded is not None and list(loaded.meals) == meals
+
+
+@pytest.mark.slow
+def test_chunked_parse_memory(benchmark, synthetic, tmp_path):
+    """Parsing par paquets: pic mémoire borné par la taille des paquets.
+
+    Le surcoût transitoire (pic - store final) ne grandit pas avec le
+    nombre de lignes, contrairement au CSV lu d'un bloc (DataFrame et
+    liste des `Meal` en mémoire en même temps).
+    """
+    paths = {}
+    for rows in (5_000, 10_000):
+        paths[rows] = tmp_path / f"recipes_{rows}.csv"
+        synthetic.head(rows).to_csv(paths[rows], index=False)
+
+    def whole_file(path: Path) -> list[Meal]:
+        return _frame_to_meals(pd.read_csv(path))
+
+    whole_peak, _ = _traced(whole_file, paths[10_000])
+    transient = {}
+    for rows, path in paths.items():
+        peak, retained = _traced(_parse_csv, path, 500)
+        transient[rows] = peak - retained
+    benchmark.extra_info["whole_peak_mb"] = round(whole_peak / 1e6, 1)
+    benchmark.extra_info["chunked_peak_mb"] = round(peak / 1e6, 1)
+    benchmark.extra_info["chunked_transient_mb"] = round(transient[10_000] / 1e6, 1)
+
+    dataset = benchmark.pedantic(_parse_csv, args=(paths[10_000], 500), rounds=1, iterations=1)
+    assert len(dataset.meals) == 10_000
+    assert peak < whole_peak / 3
+    assert transient[10_000] < 1.5 * transient[5_000] + 1_000_000
+
+
+@pytest.mark.slow
+def test_nutrition_rows_synthetic(benchmark, synthetic):
+    """Référence ligne à ligne, 100 000 chaînes nutritionnelles."""
+    rows = benchmark.pedantic(_row_nutrition, args=(synthetic["nutritions"],), rounds=3)
+    assert len(rows) == SYNTHETIC_ROWS
+
+
+@pytest.mark.slow
+def test_nutrition_column_synthetic(benchmark, synthetic):
+    """Parsing de toute la colonne, 100 000 chaînes: mêmes valeurs."""
+    column = synthetic["nutritions"]
+    parsed = benchmark.pedantic(parse_nutrition_column, args=(column,), rounds=3)
+    assert parsed.to_dict("records") == _row_nutrition(column)
@@ -0,0 +1,57 @@
+"""Benchmarks du classement top-k.
+
+Lancés via `make bench` (`pytest -m benchmark --benchmark-only`):
+scoring exhaustif vs MaxScore sur un dataset synthétique. Le nombre de
+repas matchés et réellement scorés est reporté dans `extra_info`.
+"""
+
+import random
+
+import pytest
+from src.models.schemas import Meal
+from src.services.ingredient_index import IngredientIndex
+
+pytestmark = pytest.mark.benchmark
+
+QUERY = {"salt", "onion", "garlic", "olive oil", "rice"}
+K = 10
+
+
+@pytest.fixture(scope="module")
+def index() -> IngredientIndex:
+    """Index de 20 000 repas synthétiques (distribution de Zipf)."""
+    rng = random.Random(7)
+    vocabulary = [f"ingredient {i}" for i in range(2000)]
+    vocabulary[:5] = sorted(QUERY)
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+
+    def recipe() -> list[str]:
+        # Ingrédients distincts, comme dans une vraie recette
+        size = rng.randint(4, 14)
+        ingredients: dict[str, None] = {}
+        while len(ingredients) < size:
+            ingredients[rng.choices(vocabulary, weights)[0]] = None
+        return list(ingredients)
+
+    return IngredientIndex([Meal(name=f"meal {i}", ingredients=recipe()) for i in range(20_000)])
+
+
+@pytest.mark.parametrize("ranking", ["count", "bm25"])
+def test_exhaustive_top_k(benchmark, index, ranking):
+    """Référence: score tous les repas matchés puis trie."""
+
+    def run() -> list[int]:
+        scores = index.score(QUERY, ranking=ranking)
+        return sorted(scores, key=lambda i: (-scores[i], i))[:K]
+
+    ranked = benchmark(run)
+    assert len(ranked) == K
+
+
+@pytest.mark.parametrize("ranking", ["count", "bm25"])
+def test_max_score_top_k(benchmark, index, ranking):
+    """MaxScore: mêmes résultats, la plupart des repas ne sont pas scorés."""
+    ranked, stats = benchmark(index.top_k, QUERY, K, ranking)
+    scores = index.score(QUERY, ranking=ranking)
+    assert ranked == sorted(scores, key=lambda i: (-scores[i], i))[:K]
+    benchmark.extra_info.update(matched=stats.matched, evaluated=stats.evaluated)
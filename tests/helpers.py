@@ -0,0 +1,59 @@
+"""Fonctions partagées par les tests.
+
+Références lentes conservées pour vérifier (et mesurer) leurs
+remplaçantes optimisées.
+"""
+
+import pandas as pd
+from src.models.schemas import Meal, NutritionInfo
+from src.services.data_loader import safe_parse_list, safe_parse_nutrition
+from src.services.recommender import (
+    clean_image_url,
+    extract_cuisine_from_tags,
+    extract_tags,
+    parse_prep_time,
+)
+
+
+def row_to_meal(row: pd.Series, meal_id: int | None = None) -> Meal:
+    """Convertit une ligne DataFrame en objet Meal (ancienne conversion de `load_meals`).
+
+    Référence de `_frame_to_meals` (conversion colonne par colonne).
+
+    Args:
+        row: Ligne pandas du DataFrame
+        meal_id: Identifiant du repas (position dans le dataset chargé)
+
+    Returns:
+        Objet Meal validé
+    """
+    # Récupération sécurisée des colonnes
+    name = str(row.get("name", "Unnamed Recipe"))
+    if not name or name == "nan":
+        name = "Unnamed Recipe"
+
+    ingredients = safe_parse_list(row.get("ingredients"))
+    nutrition = safe_parse_nutrition(row.get("nutritions"))
+    cuisine = extract_cuisine_from_tags(row.get("tags"))
+    tags = extract_tags(row.get("tags"))
+    image = clean_image_url(row.get("image_url"))
+    prep_time = parse_prep_time(row.get("prep_time"))
+
+    # Champs optionnels (peuvent être None)
+    diet_type = str(row.get("diet_type")) if pd.notna(row.get("diet_type")) else None
+    dish_type = str(row.get("dish_type")) if pd.notna(row.get("dish_type")) else None
+    seasonal = str(row.get("seasonal")) if pd.notna(row.get("seasonal")) else None
+
+    return Meal(
+        id=meal_id,
+        name=name,
+        ingredients=ingredients,
+        cuisine=cuisine,
+        image=image,
+        prep_time=prep_time,
+        diet_type=diet_type,
+        dish_type=dish_type,
+        seasonal=seasonal,
+        tags=tags,
+        nutritions=NutritionInfo(**nutrition),
+    )
@@ -4,12 +4,15 @@ Ces tests vérifient les endpoints HTTP avec TestClient.
 Ils nécessitent que l'API soit importable mais pas nécessairement
 que les données soient chargées (utilisation de mocks).
 """
+
+import json
 from unittest.mock import patch
 
 import pytest
 from fastapi.testclient import TestClient
 from src.api.main import app
 from src.models.schemas import Meal, NutritionInfo
+from src.services.recommender import Recommendations
 
 
 @pytest.fixture
@@ -18,6 +21,13 @@ def client():
     return TestClient(app)
 
 
+def _ranked(meals):
+    """Simule rank_meals: applique k et conserve le total."""
+    return lambda _ingredients, k=None, **_kwargs: Recommendations(
+        meals=meals[:k], total=len(meals)
+    )
+
+
 @pytest.fixture
 def sample_meals():
     """Fixture: Repas de test."""
@@ -88,7 +98,7 @@ class TestGetAllMeals:
 
     def test_get_all_meals_success(self, client, sample_meals):
         """Récupère tous les repas sans filtre."""
-        with patch("src.api.routes.get_meals_by_cuisine", return_value=sample_meals):
+        with patch("src.api.routes.filter_meals", return_value=sample_meals):
             response = client.get("/meals/all")
 
             assert response.status_code == 200
@@ -100,7 +110,7 @@ class TestGetAllMeals:
         """Filtre par cuisine."""
         indian_meals = [m for m in sample_meals if m.cuisine == "indian"]
 
-        with patch("src.api.routes.get_meals_by_cuisine", return_value=indian_meals):
+        with patch("src.api.routes.filter_meals", return_value=indian_meals):
             response = client.get("/meals/all?cuisine=indian")
 
             assert response.status_code == 200
@@ -109,12 +119,103 @@ class TestGetAllMeals:
             assert data[0]["cuisine"] == "indian"
 
 
+class TestAttributeFilters:
+    """Tests des filtres d'attributs (index secondaires)."""
+
+    def test_get_all_meals_by_attributes(self, client, sample_meals):
+        """Filtres combinés sur /meals/all."""
+        meals = [
+            sample_meals[0].model_copy(update={"dish_type": "main", "tags": ["indian", "spicy"]}),
+            *sample_meals[1:],
+        ]
+        with patch("src.services.recommender.load_meals", return_value=meals):
+            response = client.get("/meals/all?cuisine=indian&cuisine=mexican&tags=spicy")
+
+        assert response.status_code == 200
+        assert [m["name"] for m in response.json()] == ["Chicken Curry"]
+
+    def test_by_ingredients_with_cuisine(self, client, sample_meals):
+        """Les filtres d'attributs s'appliquent aux recommandations."""
+        with patch("src.services.recommender.load_meals", return_value=sample_meals):
+            response = client.get(
+                "/meals/by-ingredients?available_ingredients=chicken&cuisine=american"
+            )
+
+        assert response.status_code == 200
+        assert [m["name"] for m in response.json()] == ["Caesar Salad"]
+
+
+class TestNutritionFilters:
+    """Tests des filtres et du tri nutritionnels."""
+
+    def test_get_all_meals_calories_sorted_by_protein(self, client, sample_meals):
+        """Plage de calories puis tri par protéines décroissantes."""
+        with patch("src.services.recommender.load_meals", return_value=sample_meals):
+            response = client.get("/meals/all?calories_max=400&sort_by=protein&sort_order=desc")
+
+        assert response.status_code == 200
+        assert [m["name"] for m in response.json()] == ["Beef Tacos", "Caesar Salad"]
+
+    def test_by_ingredients_protein_min(self, client, sample_meals):
+        """Filtre nutritionnel sur les recommandations."""
+        with patch("src.services.recommender.load_meals", return_value=sample_meals):
+            response = client.get(
+                "/meals/by-ingredients?available_ingredients=chicken&protein_min=25"
+            )
+
+        assert response.status_code == 200
+        assert [m["name"] for m in response.json()] == ["Chicken Curry"]
+
+    def test_invalid_range_rejected(self, client):
+        """Une plage incohérente renvoie 422."""
+        response = client.get("/meals/all?calories_min=500&calories_max=100")
+        assert response.status_code == 422
+
+
+class TestNdjsonStreaming:
+    """Tests du mode streaming NDJSON."""
+
+    def test_get_all_meals_ndjson(self, client, sample_meals):
+        """Un repas JSON par ligne, y compris au-delà d'un paquet de lignes."""
+        meals = [sample_meals[0].model_copy(update={"name": f"Meal {i}"}) for i in range(150)]
+        with patch("src.api.routes.filter_meals", return_value=meals):
+            response = client.get("/meals/all", headers={"Accept": "application/x-ndjson"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert response.headers["X-Total-Count"] == "150"
+        lines = response.text.splitlines()
+        assert [json.loads(line)["name"] for line in lines] == [m.name for m in meals]
+
+    def test_by_ingredients_ndjson_keeps_pagination_headers(self, client, sample_meals):
+        """Les headers de pagination accompagnent le flux."""
+        with patch("src.services.recommender.load_meals", return_value=sample_meals):
+            response = client.get(
+                "/meals/by-ingredients?available_ingredients=chicken&limit=1",
+                headers={"Accept": "application/x-ndjson"},
+            )
+
+        assert response.status_code == 200
+        assert response.headers["X-Total-Count"] == "2"
+        assert "X-Next-Cursor" in response.headers
+        assert [json.loads(line)["name"] for line in response.text.splitlines()] == [
+            "Chicken Curry"
+        ]
+
+    def test_default_is_json(self, client, sample_meals):
+        """Sans header Accept NDJSON, la réponse reste une liste JSON."""
+        with patch("src.api.routes.filter_meals", return_value=sample_meals):
+            response = client.get("/meals/all")
+        assert response.headers["content-type"].startswith("application/json")
+        assert len(response.json()) == 3
+
+
 class TestGetMealsByIngredients:
     """Tests GET /meals/by-ingredients."""
 
     def test_recommend_by_single_ingredient(self, client, sample_meals):
         """Recommande avec un ingrédient."""
-        with patch("src.api.routes.recommend_meals", return_value=[sample_meals[0]]):
+        with patch("src.api.routes.rank_meals", side_effect=_ranked([sample_meals[0]])):
             response = client.get("/meals/by-ingredients?available_ingredients=chicken")
 
             assert response.status_code == 200
@@ -124,7 +225,7 @@ class TestGetMealsByIngredients:
 
     def test_recommend_by_multiple_ingredients(self, client, sample_meals):
         """Recommande avec plusieurs ingrédients."""
-        with patch("src.api.routes.recommend_meals", return_value=sample_meals):
+        with patch("src.api.routes.rank_meals", side_effect=_ranked(sample_meals)):
             response = client.get(
                 "/meals/by-ingredients?available_ingredients=chicken&available_ingredients=rice"
             )
@@ -135,14 +236,14 @@ class TestGetMealsByIngredients:
 
     def test_recommend_with_limit(self, client, sample_meals):
         """Limite le nombre de résultats."""
-        with patch("src.api.routes.recommend_meals", return_value=sample_meals):
-            response = client.get(
-                "/meals/by-ingredients?available_ingredients=chicken&limit=2"
-            )
+        with patch("src.api.routes.rank_meals", side_effect=_ranked(sample_meals)) as mock_rank:
+            response = client.get("/meals/by-ingredients?available_ingredients=chicken&limit=2")
 
             assert response.status_code == 200
             data = response.json()
             assert len(data) == 2
+            # La limite est poussée dans le recommender
+            assert mock_rank.call_args.kwargs["k"] == 2
 
     def test_recommend_empty_ingredients_returns_error(self, client):
         """Erreur 422 si pas d'ingrédients."""
@@ -157,6 +258,166 @@ class TestGetMealsByIngredients:
         assert response.status_code == 422
 
 
+class TestIngredientFiltersEndpoint:
+    """Tests des filtres d'ingrédients de /meals/by-ingredients."""
+
+    def test_exclude_ingredients(self, client, sample_meals):
+        """Les repas contenant un ingrédient exclu sont écartés."""
+        with patch("src.services.recommender.load_meals", return_value=sample_meals):
+            response = client.get(
+                "/meals/by-ingredients?available_ingredients=chicken&exclude_ingredients=parmesan"
+            )
+
+        assert response.status_code == 200
+        assert [m["name"] for m in response.json()] == ["Chicken Curry"]
+
+    def test_require_all(self, client, sample_meals):
+        """require_all ne garde que les repas contenant tous les ingrédients."""
+        with patch("src.services.recommender.load_meals", return_value=sample_meals):
+            response = client.get(
+                "/meals/by-ingredients?available_ingredients=chicken"
+                "&available_ingredients=lettuce&require_all=true"
+            )
+
+        assert response.status_code == 200
+        assert [m["name"] for m in response.json()] == ["Caesar Salad"]
+
+    def test_max_missing(self, client, sample_meals):
+        """max_missing ne garde que les repas presque faisables."""
+        with patch("src.services.recommender.load_meals", return_value=sample_meals):
+            response = client.get(
+                "/meals/by-ingredients?available_ingredients=chicken"
+                "&available_ingredients=rice&max_missing=1"
+            )
+
+        assert response.status_code == 200
+        assert [(m["name"], m["missing_ingredients"]) for m in response.json()] == [
+            ("Chicken Curry", ["curry"]),
+        ]
+
+    def test_negative_max_missing(self, client):
+        """max_missing négatif: 422."""
+        response = client.get("/meals/by-ingredients?available_ingredients=chicken&max_missing=-1")
+        assert response.status_code == 422
+
+
+class TestBatchRecommendations:
+    """Tests de POST /meals/recommend/batch."""
+
+    def test_batch_returns_one_result_per_query(self, client, sample_meals):
+        """Un résultat par requête, dans l'ordre du lot."""
+        with patch("src.services.recommender.load_meals", return_value=sample_meals):
+            response = client.post(
+                "/meals/recommend/batch",
+                json={"queries": [["lettuce"], ["chicken", "rice"]], "limit": 1},
+            )
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["ingredients"] for r in results] == [["lettuce"], ["chicken", "rice"]]
+        assert [m["name"] for m in results[0]["meals"]] == ["Caesar Salad"]
+        assert results[1]["total"] == 2
+        assert [m["name"] for m in results[1]["meals"]] == ["Chicken Curry"]
+
+    def test_batch_rejects_empty_query(self, client):
+        """Une requête sans ingrédient rend le lot invalide."""
+        response = client.post("/meals/recommend/batch", json={"queries": [["chicken"], [" "]]})
+        assert response.status_code == 422
+
+
+class TestRecommendByText:
+    """Tests de POST /meals/by-text."""
+
+    def test_free_text_pantry(self, client, sample_meals):
+        """Les ingrédients reconnus dans le texte pilotent la recommandation."""
+        with patch("src.services.recommender.load_meals", return_value=sample_meals):
+            response = client.post(
+                "/meals/by-text",
+                json={"text": "I have 2 chickens, some lettuce and croutons", "limit": 2},
+            )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["ingredients"] == ["chicken", "lettuce", "croutons"]
+        assert data["total"] == 2
+        assert [m["name"] for m in data["meals"]] == ["Caesar Salad", "Chicken Curry"]
+
+    def test_no_known_ingredient(self, client, sample_meals):
+        """Aucun ingrédient reconnu: réponse vide."""
+        with patch("src.services.recommender.load_meals", return_value=sample_meals):
+            response = client.post("/meals/by-text", json={"text": "nothing in my fridge"})
+
+        assert response.status_code == 200
+        assert response.json() == {"ingredients": [], "total": 0, "meals": []}
+
+
+class TestSimilarMeals:
+    """Tests de GET /meals/{id}/similar."""
+
+    def test_similar_meals(self, client, sample_meals):
+        """Les repas aux ingrédients proches sont renvoyés avec leur similarité."""
+        meals = [
+            *sample_meals,
+            Meal(name="Chicken Rice Bowl", ingredients=["chicken", "curry", "rice", "peas"]),
+        ]
+        with patch("src.services.recommender.load_meals", return_value=meals):
+            response = client.get("/meals/0/similar?limit=3")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data[0]["name"] == "Chicken Rice Bowl"
+        assert data[0]["similarity"] == 0.75
+
+    def test_unknown_meal(self, client, sample_meals):
+        """Un id inconnu renvoie 404."""
+        with patch("src.services.recommender.load_meals", return_value=sample_meals):
+            response = client.get("/meals/99/similar")
+        assert response.status_code == 404
+
+
+class TestPagination:
+    """Tests de la pagination par curseur de /meals/by-ingredients."""
+
+    def test_pages_cover_full_ranking(self, client):
+        """Les pages successives reconstituent le classement complet."""
+        # Scores tous égaux: l'ordre repose sur le départage par id
+        meals = [Meal(name=f"Chicken {i}", ingredients=["chicken"]) for i in range(7)]
+
+        with patch("src.services.recommender.load_meals", return_value=meals):
+            names, cursor = [], None
+            while True:
+                url = "/meals/by-ingredients?available_ingredients=chicken&limit=3"
+                response = client.get(url + (f"&cursor={cursor}" if cursor else ""))
+                assert response.status_code == 200
+                assert response.headers["X-Total-Count"] == "7"
+                names += [m["name"] for m in response.json()]
+                cursor = response.headers.get("X-Next-Cursor")
+                if cursor is None:
+                    break
+
+        assert names == [f"Chicken {i}" for i in range(7)]
+
+    def test_cursor_from_other_query_rejected(self, client, sample_meals):
+        """Un curseur n'est valable que pour sa requête d'origine."""
+        with patch("src.services.recommender.load_meals", return_value=sample_meals):
+            first = client.get("/meals/by-ingredients?available_ingredients=chicken&limit=1")
+            cursor = first.headers["X-Next-Cursor"]
+            response = client.get(
+                f"/meals/by-ingredients?available_ingredients=beef&limit=1&cursor={cursor}"
+            )
+
+        assert response.status_code == 422
+
+    def test_invalid_cursor_rejected(self, client, sample_meals):
+        """Un curseur illisible renvoie 422."""
+        with patch("src.services.recommender.load_meals", return_value=sample_meals):
+            response = client.get(
+                "/meals/by-ingredients?available_ingredients=chicken&cursor=not-a-cursor"
+            )
+
+        assert response.status_code == 422
+
+
 class TestGetSampleMeals:
     """Tests GET /meals/sample."""
 
@@ -192,7 +453,7 @@ class TestResponseStructure:
 
     def test_meal_response_has_required_fields(self, client, sample_meals):
         """Vérifie que toutes les champs requis sont présents."""
-        with patch("src.api.routes.recommend_meals", return_value=[sample_meals[0]]):
+        with patch("src.api.routes.rank_meals", side_effect=_ranked([sample_meals[0]])):
             response = client.get("/meals/by-ingredients?available_ingredients=chicken")
 
             data = response.json()
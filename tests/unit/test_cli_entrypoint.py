@@ -29,3 +29,13 @@ def test_main_invokes_uvicorn_run() -> None:
         reload=dummy_settings.api_reload,
         log_level=dummy_settings.log_level.lower(),
     )
+
+
+def test_snapshot_main_builds_snapshot() -> None:
+    """`meal-snapshot --refresh` reconstruit le CSV puis le snapshot."""
+    from src.services import snapshot
+
+    with patch("src.services.recommender.build_snapshot") as mock_build:
+        snapshot.main(["--refresh"])
+
+    mock_build.assert_called_once_with(force_refresh=True)
@@ -4,15 +4,76 @@ Ces tests vérifient la logique métier en isolation,
 sans dépendances externes (API, CSV, etc.)
 """
 
+import numpy as np
+import pytest
+from src.core.config import Settings
 from src.models.schemas import Meal, NutritionInfo
-from src.services.cache import CacheManager, cache
+from src.services import bitset
+from src.services.cache import CacheManager, LRUCache, cache
 from src.services.data_loader import safe_parse_list, safe_parse_nutrition
+from src.services.filters import MealFilters
+from src.services.ingredient_index import IngredientIndex
 from src.services.recommender import (
     clean_image_url,
     extract_cuisine_from_tags,
+    extract_tags,
+    filter_meals,
     parse_prep_time,
+    rank_meals,
+    rank_meals_batch,
     recommend_meals,
+    result_cache,
 )
+from src.services.sparse_matrix import IncidenceMatrix, top_k
+from src.services.vocabulary import compile_ingredients
+
+
+def _random_meals(count: int = 300, seed: int = 42) -> list[Meal]:
+    """Génère un dataset synthétique reproductible (sans CSV)."""
+    import random
+
+    rng = random.Random(seed)
+    vocabulary = [
+        "chicken breast",
+        "chicken thigh",
+        "rice",
+        "basmati rice",
+        "salt",
+        "sea salt",
+        "onion",
+        "red onion",
+        "garlic",
+        "olive oil",
+        "egg",
+        "tomato",
+        "cherry tomatoes",
+        "beef",
+        "carrots",
+        "soy sauce",
+        "ginger",
+        "butter",
+        "flour",
+        "sugar",
+    ]
+    return [
+        Meal(
+            name=f"Meal {i}",
+            ingredients=rng.choices(vocabulary, k=rng.randint(1, 8)),
+            cuisine=rng.choice(["italian", "indian", "french"]),
+            dish_type=["main", "dessert", "side"][i % 3],
+            tags=[tag for tag, step in (("quick", 2), ("spicy", 5)) if i % step == 0],
+            nutritions=NutritionInfo(calories=(i * 37) % 900, protein=(i * 13) % 60),
+        )
+        for i in range(count)
+    ]
+
+
+def _attribute_postings(attributes) -> dict:
+    """Ids des repas de chaque valeur de chaque attribut, en listes comparables."""
+    return {
+        attribute: {value: ids.tolist() for value, ids in by_value.items()}
+        for attribute, by_value in attributes.ids.items()
+    }
 
 
 class TestSafeParseList:
@@ -66,6 +127,240 @@ class TestSafeParseNutrition:
         assert result["calories"] == 0.0
         assert result["protein"] == 0.0
 
+    def test_parse_column_matches_row_parsing(self):
+        """Le parsing de toute la colonne égale `safe_parse_nutrition` ligne à ligne."""
+        import pandas as pd
+        from src.services.data_loader import NUTRITION_KEYS, parse_nutrition_column
+
+        values = [
+            {"calories": 100.5, "protein": 10.2, "fat": 5.0},
+            '{"calories": {"amount": 200}, "protein": {"amount": 15}}',
+            {},
+            None,
+            float("nan"),
+            "",
+            "invalid",
+            "{'calories': {'amount': 2.675, 'unit': 'kcal'}, 'fat': {'amount': 1.005}}",
+            "{'fat': {'amount': 1}, 'trans_fat': {'amount': 9}, 'fat': {'amount': 3.}}",
+            "{'sugars': 'amount': .5, 'fiber': {'amount': 12345678901234.555}}",
+            "{'calories': {'amount': 12}, 'sodium': {'amount': 1.2.3}}",
+            "{'protein': {'amount': .}}",
+        ]
+        parsed = parse_nutrition_column(pd.Series(values, dtype=object))
+
+        for position, value in enumerate(values):
+            expected = safe_parse_nutrition(value if isinstance(value, str | dict) else None)
+            row = parsed.iloc[position].to_dict()
+            assert row == {key: expected.get(key, 0.0) for key in NUTRITION_KEYS}
+        assert parsed.loc[8, "fat"] == 3.0
+        assert parsed.loc[10, "calories"] == 0.0
+
+
+@pytest.fixture
+def mealdb_stub():
+    """Serveur HTTP local imitant `search.php?f=<lettre>` (50 ms par requête).
+
+    `catalogue` (lettre -> recettes) peut être modifié pendant le test.
+    """
+    import json
+    import string
+    import threading
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from types import SimpleNamespace
+    from urllib.parse import parse_qs, urlparse
+
+    catalogue = {
+        letter: [
+            {"idMeal": f"{letter}1", "strMeal": f"Stew {letter}", "strIngredient1": "Rice"},
+            {"idMeal": "shared", "strMeal": f"Shared {letter}", "strIngredient1": "Egg"},
+        ]
+        for letter in string.ascii_lowercase
+        if letter != "x"
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            letter = parse_qs(urlparse(self.path).query)["f"][0]
+            time.sleep(0.05)
+            body = json.dumps({"meals": catalogue.get(letter)}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield SimpleNamespace(url=f"http://127.0.0.1:{server.server_port}", catalogue=catalogue)
+    server.shutdown()
+    server.server_close()
+
+
+class TestMealDBIngestion:
+    """Tests de la construction du CSV TheMealDB (serveur local)."""
+
+    def test_concurrent_fetch_is_faster_and_identical(self, mealdb_stub, tmp_path):
+        """Requêtes parallèles: même CSV qu'en séquentiel, en bien moins de temps."""
+        import time
+        import unittest.mock
+
+        from src.services.data_loader import build_mealdb_csv
+
+        elapsed = {}
+        for workers in (1, 8):
+            settings = Settings(mealdb_api_base=mealdb_stub.url, mealdb_workers=workers)
+            with unittest.mock.patch(
+                "src.services.data_loader.get_settings", return_value=settings
+            ):
+                start = time.perf_counter()
+                build_mealdb_csv(tmp_path / f"mealdb_{workers}.csv")
+                elapsed[workers] = time.perf_counter() - start
+
+        sequential = (tmp_path / "mealdb_1.csv").read_text()
+        assert (tmp_path / "mealdb_8.csv").read_text() == sequential
+        # 25 lettres avec recettes + la recette partagée (dernière lettre gagne)
+        assert len(sequential.splitlines()) == 1 + 25 + 1
+        assert "Shared z" in sequential and "Shared y" not in sequential
+        assert elapsed[8] < elapsed[1] / 2
+
+    @staticmethod
+    def _edit_catalogue(catalogue):
+        """Une recette modifiée, une ajoutée, une supprimée, une sans ingrédient."""
+        catalogue["a"][0]["strIngredient2"] = "Saffron"
+        catalogue["b"].append({"idMeal": "b2", "strMeal": "Bun", "strIngredient1": "Flour"})
+        catalogue["c"].pop(0)
+        catalogue["d"].append({"idMeal": "d2", "strMeal": "Empty"})
+
+    def test_sync_rewrites_only_changed_meals(self, mealdb_stub, tmp_path):
+        """La synchronisation ne re-convertit que le delta, et égale une reconstruction."""
+        import unittest.mock
+
+        from src.services.data_loader import build_mealdb_csv, sync_mealdb_csv
+
+        csv_path = tmp_path / "recipes_mealdb.csv"
+        settings = Settings(mealdb_api_base=mealdb_stub.url, mealdb_letters="abcd")
+        with unittest.mock.patch("src.services.data_loader.get_settings", return_value=settings):
+            build_mealdb_csv(csv_path)
+            self._edit_catalogue(mealdb_stub.catalogue)
+            delta = sync_mealdb_csv(csv_path)
+            build_mealdb_csv(tmp_path / "rebuilt.csv")
+
+            assert (delta.added, delta.updated, delta.removed) == (["b2"], ["a1"], ["c1"])
+            assert [row["name"] for row in delta.fresh_rows] == ["Stew a", "Bun"]
+            assert csv_path.read_text() == (tmp_path / "rebuilt.csv").read_text()
+
+            # Aucun changement: le CSV n'est pas réécrit
+            mtime = csv_path.stat().st_mtime_ns
+            assert not sync_mealdb_csv(csv_path).changed
+            assert csv_path.stat().st_mtime_ns == mtime
+
+    def test_sync_meals_applies_delta_in_memory(self, mealdb_stub, tmp_path):
+        """Le delta est appliqué au dataset chargé: même résultat qu'un rechargement complet."""
+        import unittest.mock
+
+        from src.services import recommender
+
+        settings = Settings(
+            data_dir=tmp_path, mealdb_api_base=mealdb_stub.url, mealdb_letters="abcd"
+        )
+        cache.clear()
+        try:
+            with (
+                unittest.mock.patch("src.services.data_loader.get_settings", return_value=settings),
+                unittest.mock.patch("src.services.recommender.get_settings", return_value=settings),
+            ):
+                before = recommender.load_meals()
+                self._edit_catalogue(mealdb_stub.catalogue)
+                with unittest.mock.patch(
+                    "src.services.recommender._frame_to_meals",
+                    wraps=recommender._frame_to_meals,
+                ) as convert:
+                    recommender.sync_meals()
+                assert [len(call.args[0]) for call in convert.call_args_list] == [2]
+
+                meals = recommender.load_meals()
+                assert meals is not before
+                assert list(meals) == list(recommender._parse_meals().meals)
+                assert [m.name for m in recommend_meals(["saffron"])] == ["Stew a"]
+
+                # Sans changement: dataset et index conservés
+                recommender.sync_meals()
+                assert recommender.load_meals() is meals
+        finally:
+            cache.clear()
+            result_cache.clear()
+
+    def test_sync_meals_reparses_stale_dataset(self, mealdb_stub, tmp_path):
+        """Dataset chargé avant la synchro d'un autre worker (même nombre de lignes): reparsé."""
+        import unittest.mock
+
+        from src.services import recommender
+        from src.services.data_loader import sync_mealdb_csv
+        from src.services.snapshot import file_digest, read_snapshot
+
+        settings = Settings(
+            data_dir=tmp_path, mealdb_api_base=mealdb_stub.url, mealdb_letters="abcd"
+        )
+        cache.clear()
+        try:
+            with (
+                unittest.mock.patch("src.services.data_loader.get_settings", return_value=settings),
+                unittest.mock.patch("src.services.recommender.get_settings", return_value=settings),
+            ):
+                before = recommender.load_meals()
+                # Un autre worker synchronise le CSV: une recette modifiée, autant de lignes
+                mealdb_stub.catalogue["a"][0]["strIngredient2"] = "Saffron"
+                assert sync_mealdb_csv(settings.csv_path).updated == ["a1"]
+                mealdb_stub.catalogue["b"][0]["strIngredient2"] = "Fennel"
+
+                delta = recommender.sync_meals()
+                assert delta.updated == ["b1"] and delta.previous == len(before)
+
+                expected = list(recommender._parse_meals().meals)
+                assert list(recommender.load_meals()) == expected
+                assert [m.name for m in recommend_meals(["saffron"])] == ["Stew a"]
+                snapshot = read_snapshot(settings.snapshot_path, file_digest(settings.csv_path))
+                assert snapshot is not None and list(snapshot.meals) == expected
+        finally:
+            cache.clear()
+            result_cache.clear()
+
+    def test_refresh_snapshot_parses_only_delta(self, mealdb_stub, tmp_path):
+        """`meal-snapshot --refresh` part du snapshot: seul le delta est parsé."""
+        import unittest.mock
+
+        from src.services import recommender
+        from src.services.snapshot import file_digest, read_snapshot
+
+        settings = Settings(
+            data_dir=tmp_path, mealdb_api_base=mealdb_stub.url, mealdb_letters="abcd"
+        )
+        with (
+            unittest.mock.patch("src.services.data_loader.get_settings", return_value=settings),
+            unittest.mock.patch("src.services.recommender.get_settings", return_value=settings),
+        ):
+            recommender.build_snapshot()
+            self._edit_catalogue(mealdb_stub.catalogue)
+            with unittest.mock.patch(
+                "src.services.recommender._frame_to_meals", wraps=recommender._frame_to_meals
+            ) as convert:
+                path = recommender.build_snapshot(force_refresh=True)
+            assert [len(call.args[0]) for call in convert.call_args_list] == [2]
+
+            snapshot = read_snapshot(path, file_digest(settings.csv_path))
+            assert snapshot is not None
+            assert list(snapshot.meals) == list(recommender._parse_meals().meals)
+
+            # Sans changement: le snapshot n'est pas réécrit
+            mtime = path.stat().st_mtime_ns
+            recommender.build_snapshot(force_refresh=True)
+            assert path.stat().st_mtime_ns == mtime
+
 
 class TestCacheManager:
     """Tests du système de cache."""
@@ -99,6 +394,59 @@ class TestCacheManager:
         assert stats["active_entries"] == 2
 
 
+class TestLRUCache:
+    """Tests du cache LRU de résultats."""
+
+    def test_evicts_least_recently_used(self):
+        """Au-delà de la capacité, l'entrée la plus ancienne est évincée."""
+        lru = LRUCache(max_entries=2)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        assert lru.get("a") == 1  # "a" devient la plus récente
+        lru.set("c", 3)
+        assert lru.get("b") is None
+        assert lru.get("a") == 1
+        assert lru.get_stats()["evictions"] == 1
+
+    def test_bounded_by_bytes(self):
+        """Au-delà de `max_bytes`, les entrées les plus anciennes sont évincées."""
+        lru = LRUCache(max_entries=10, max_bytes=250)
+        lru.set("a", np.zeros(10))  # 80 octets
+        lru.set("b", np.zeros(10))
+        lru.set("c", np.zeros(10))
+        assert lru.get_stats()["bytes"] == 240
+        lru.set("d", np.zeros(10))
+        assert lru.get("a") is None
+        assert lru.get_stats()["bytes"] == 240
+        lru.set("b", np.zeros(20))  # remplacée: seule sa nouvelle taille compte
+        assert lru.get_stats()["bytes"] == 160 + 80
+        lru.set("huge", np.zeros(100))  # plus grosse que le cache: ignorée
+        assert lru.get("huge") is None and lru.get("d") is not None
+
+    def test_disabled_when_size_zero(self):
+        """Une capacité nulle désactive le cache."""
+        lru = LRUCache(max_entries=0)
+        lru.set("a", 1)
+        assert lru.get("a") is None
+
+    def test_permuted_queries_share_entry(self):
+        """Requêtes permutées = une seule entrée, invalidée au rechargement."""
+        meals = _random_meals()
+
+        import unittest.mock
+
+        with unittest.mock.patch("src.services.recommender.load_meals", return_value=meals):
+            first = recommend_meals(["chicken", "rice"])
+            hits = result_cache.get_stats()["hits"]
+            assert recommend_meals(["rice", " Chicken"]) == first
+            assert result_cache.get_stats()["hits"] == hits + 1
+
+        # Nouveau chargement du dataset -> nouvelle version, cache vidé
+        with unittest.mock.patch("src.services.recommender.load_meals", return_value=list(meals)):
+            recommend_meals(["chicken", "rice"])
+        assert result_cache.get_stats()["entries"] == 1
+
+
 class TestRecommenderHelpers:
     """Tests des fonctions utilitaires du recommender."""
 
@@ -108,6 +456,11 @@ class TestRecommenderHelpers:
         assert extract_cuisine_from_tags(None) == "unknown"
         assert extract_cuisine_from_tags("") == "unknown"
 
+    def test_extract_tags(self):
+        """Conserve tous les tags, normalisés."""
+        assert extract_tags("italian;Pasta; quick") == ["italian", "pasta", "quick"]
+        assert extract_tags(None) == []
+
     def test_clean_image_url(self):
         """Nettoie les URLs d'images."""
         assert clean_image_url("http://example.com/img.jpg") == "https://example.com/img.jpg"
@@ -119,6 +472,61 @@ class TestRecommenderHelpers:
         assert parse_prep_time("30-minutes-or-less") == "30 minutes or less"
         assert parse_prep_time(None) == ""
 
+    def test_frame_to_meals_matches_row_conversion(self):
+        """La conversion colonne par colonne égale la conversion ligne à ligne."""
+        import contextlib
+
+        import pandas as pd
+        import pydantic
+        from src.services.recommender import _frame_to_meals
+
+        from tests.helpers import row_to_meal
+
+        df = pd.DataFrame(
+            {
+                "name": ["Pasta", None, "", "  Soup "],
+                "ingredients": ["Egg; rice ^ SALT,, ", " , ", "x", "y,z"],
+                "nutritions": [
+                    "{'calories': {'amount': 12.5}, 'protein': {'amount': 3}}",
+                    "{}",
+                    None,
+                    "invalid",
+                ],
+                "tags": ["Italian; Pasta", None, ";;", " quick "],
+                "image_url": ["http://x/a.jpg", " https://y ", "ftp://z", None],
+                "prep_time": ["30-minutes-or-less", None, "", "a-b"],
+                "diet_type": [1.0, None, 2.5, None],
+                "dish_type": ["Main", "", None, "Side"],
+            }
+        )
+        expected: list[Meal] = []
+        for _, row in df.iterrows():
+            with contextlib.suppress(pydantic.ValidationError):  # Ligne sans ingrédient
+                expected.append(row_to_meal(row, meal_id=len(expected)))
+
+        meals = _frame_to_meals(df)
+        assert meals == expected
+        assert [m.name for m in meals] == ["Pasta", "Unnamed Recipe", "  Soup "]
+
+    def test_chunked_parse_matches_whole_file(self):
+        """Le parsing par paquets égale la conversion du CSV lu d'un bloc."""
+        from pathlib import Path
+
+        import pandas as pd
+        from src.services.attribute_index import AttributeIndex
+        from src.services.meal_store import MealStore
+        from src.services.recommender import _frame_to_meals, _parse_csv
+
+        csv_path = Path(__file__).parents[2] / "data" / "recipes_mealdb.csv"
+        meals = _frame_to_meals(pd.read_csv(csv_path))
+        dataset = _parse_csv(csv_path, chunk_rows=50)
+
+        assert isinstance(dataset.meals, MealStore)
+        assert list(dataset.meals) == meals
+        assert dataset.compiled.vocabulary.terms == compile_ingredients(meals).vocabulary.terms
+        assert _attribute_postings(dataset.attributes) == _attribute_postings(AttributeIndex(meals))
+        assert list(_parse_csv(csv_path, chunk_rows=7).meals) == meals
+
 
 class TestRecommendMeals:
     """Tests de l'algorithme de recommandation."""
@@ -141,7 +549,10 @@ class TestRecommendMeals:
 
         # Test avec mock des données
         import unittest.mock
-        with unittest.mock.patch("src.services.recommender.load_meals", return_value=[meal1, meal2]):
+
+        with unittest.mock.patch(
+            "src.services.recommender.load_meals", return_value=[meal1, meal2]
+        ):
             results = recommend_meals(["chicken"])
 
         assert len(results) == 1
@@ -163,7 +574,10 @@ class TestRecommendMeals:
         )
 
         import unittest.mock
-        with unittest.mock.patch("src.services.recommender.load_meals", return_value=[meal1, meal2]):
+
+        with unittest.mock.patch(
+            "src.services.recommender.load_meals", return_value=[meal1, meal2]
+        ):
             results = recommend_meals(["chicken", "rice", "tomato"])
 
         # meal2 doit être premier (3 matchs > 2 matchs)
@@ -185,7 +599,931 @@ class TestRecommendMeals:
         )
 
         import unittest.mock
+
         with unittest.mock.patch("src.services.recommender.load_meals", return_value=[meal]):
             results = recommend_meals(["chocolate"])
 
         assert results == []
+
+    def test_rank_top_k_reports_total(self):
+        """Top-k identique au classement complet tronqué, total inchangé."""
+        meals = _random_meals()
+
+        import unittest.mock
+
+        with unittest.mock.patch("src.services.recommender.load_meals", return_value=meals):
+            full = recommend_meals(["salt", "rice"])
+            for backend in ("index", "sparse"):
+                result_cache.clear()
+                with unittest.mock.patch(
+                    "src.services.recommender.get_settings",
+                    return_value=Settings(recommender_backend=backend),
+                ):
+                    ranked = rank_meals(["salt", "rice"], k=10)
+                assert ranked.meals == full[:10]
+                assert ranked.total == len(full)
+
+
+class TestIngredientIndex:
+    """Tests de l'index inversé des ingrédients."""
+
+    @staticmethod
+    def _meals() -> list[Meal]:
+        return [
+            Meal(name="Chicken Rice", ingredients=["chicken breast", "rice"]),
+            Meal(name="Fried Rice", ingredients=["rice", "egg", "soy sauce", "soy sauce"]),
+            Meal(name="Beef Stew", ingredients=["beef", "carrots"]),
+        ]
+
+    def test_vocabulary_is_distinct(self):
+        """Chaque ingrédient n'apparaît qu'une fois dans le vocabulaire."""
+        index = IngredientIndex(self._meals())
+        assert sorted(index.vocabulary) == [
+            "beef",
+            "carrots",
+            "chicken breast",
+            "egg",
+            "rice",
+            "soy sauce",
+        ]
+
+    def test_expand_substring(self):
+        """Le match partiel passe par les trigrammes."""
+        index = IngredientIndex(self._meals())
+        terms = {index.vocabulary[tid] for tid in index.expand("chicken")}
+        assert terms == {"chicken breast"}
+
+    def test_expand_short_token(self):
+        """Les tokens courts (< 3 caractères) restent supportés."""
+        index = IngredientIndex(self._meals())
+        terms = {index.vocabulary[tid] for tid in index.expand("ri")}
+        assert terms == {"rice"}
+
+    def test_expand_unknown(self):
+        """Un token absent ne matche rien."""
+        index = IngredientIndex(self._meals())
+        assert index.expand("chocolate") == set()
+
+    def test_score_counts_duplicates(self):
+        """Le score compte chaque ingrédient du repas (doublons inclus)."""
+        index = IngredientIndex(self._meals())
+        assert index.score({"soy", "rice"}) == {0: 1, 1: 3}
+
+    def test_matches_full_scan(self):
+        """Même résultat que le scan historique repas x ingrédients."""
+        meals = _random_meals()
+        index = IngredientIndex(meals)
+        for query in [{"chicken"}, {"salt", "onion"}, {"oil", "egg", "ri"}]:
+            expected = {}
+            for meal_id, meal in enumerate(meals):
+                matched = sum(1 for ing in meal.ingredients if any(q in ing.lower() for q in query))
+                if matched:
+                    expected[meal_id] = matched
+            assert index.score(query) == expected
+
+
+class TestSparseBackend:
+    """Tests du backend matrice creuse."""
+
+    def test_matrix_layout(self):
+        """CSR: chaque ligne contient les termes du repas."""
+        index = IngredientIndex(TestIngredientIndex._meals())
+        matrix = index.matrix
+        assert matrix.shape == (3, len(index.vocabulary))
+        fried_rice = matrix.indices[matrix.indptr[1] : matrix.indptr[2]]
+        assert {index.vocabulary[t] for t in fried_rice} == {"rice", "egg", "soy sauce"}
+
+    def test_matvec_matches_index_score(self):
+        """Le produit matrice x vecteur donne les mêmes scores."""
+        index = IngredientIndex(TestIngredientIndex._meals())
+        scores = index.matrix.matvec(index.match_terms({"soy", "rice"}))
+        assert scores.tolist() == [1.0, 3.0, 0.0]
+
+    def test_top_k_breaks_ties_by_id(self):
+        """Les ex aequo sont départagés par id croissant."""
+        scores = np.array([1.0, 3.0, 0.0, 3.0, 1.0, 2.0])
+        assert top_k(scores).tolist() == [1, 3, 5, 0, 4]
+        assert top_k(scores, k=3).tolist() == [1, 3, 5]
+        assert top_k(scores, k=4).tolist() == [1, 3, 5, 0]
+
+    def test_matmat_matches_matvec(self):
+        """Le produit par lot donne les scores de chaque requête isolée."""
+        index = IngredientIndex(_random_meals())
+        queries = [index.match_terms(q) for q in ({"salt"}, set(), {"rice", "egg"})]
+        query_ids, meal_ids, scores = index.matrix.matmat(queries, index.bm25_data)
+        for position, terms in enumerate(queries):
+            expected = index.matrix.matvec(terms, index.bm25_data)
+            rows = query_ids == position
+            assert meal_ids[rows].tolist() == np.flatnonzero(expected).tolist()
+            assert np.allclose(scores[rows], expected[meal_ids[rows]])
+
+    def test_backends_rank_identically(self):
+        """Le backend sparse classe exactement comme le backend index."""
+        import unittest.mock
+
+        meals = _random_meals()
+        queries = [["chicken"], ["salt", "onion", "garlic"], ["rice", "tomato", "egg"]]
+        with unittest.mock.patch("src.services.recommender.load_meals", return_value=meals):
+            for query in queries:
+                expected = recommend_meals(query)
+                result_cache.clear()
+                with unittest.mock.patch(
+                    "src.services.recommender.get_settings",
+                    return_value=Settings(recommender_backend="sparse"),
+                ):
+                    assert recommend_meals(query) == expected
+
+
+class TestBM25Ranking:
+    """Tests du classement BM25."""
+
+    @staticmethod
+    def _meals() -> list[Meal]:
+        return [
+            Meal(name="Salted Rice", ingredients=["salt", "rice"]),
+            Meal(name="Truffle Rice", ingredients=["truffle", "rice"]),
+            Meal(name="Salted Stew", ingredients=["salt", "beef", "carrots", "onion", "garlic"]),
+            Meal(name="Salted Eggs", ingredients=["salt", "egg"]),
+        ]
+
+    def test_rare_ingredient_weighs_more(self):
+        """Un ingrédient rare pèse plus qu'un ingrédient générique."""
+        index = IngredientIndex(self._meals())
+        scores = index.score({"salt", "truffle"}, ranking="bm25")
+        assert scores[1] > scores[0]
+
+    def test_long_recipes_are_normalized(self):
+        """À match égal, une recette courte passe devant une longue."""
+        index = IngredientIndex(self._meals())
+        scores = index.score({"salt"}, ranking="bm25")
+        assert scores[0] > scores[2]
+
+    def test_matmat_matches_matvec(self):
+        """Le produit par lot donne les scores de chaque requête isolée."""
+        index = IngredientIndex(_random_meals())
+        queries = [index.match_terms(q) for q in ({"salt"}, set(), {"rice", "egg"})]
+        query_ids, meal_ids, scores = index.matrix.matmat(queries, index.bm25_data)
+        for position, terms in enumerate(queries):
+            expected = index.matrix.matvec(terms, index.bm25_data)
+            rows = query_ids == position
+            assert meal_ids[rows].tolist() == np.flatnonzero(expected).tolist()
+            assert np.allclose(scores[rows], expected[meal_ids[rows]])
+
+    def test_backends_rank_identically(self):
+        """Les deux backends donnent le même classement BM25."""
+        import unittest.mock
+
+        meals = _random_meals()
+        with unittest.mock.patch("src.services.recommender.load_meals", return_value=meals):
+            expected = rank_meals(["salt", "chicken", "tomato"], ranking="bm25").meals
+            result_cache.clear()
+            with unittest.mock.patch(
+                "src.services.recommender.get_settings",
+                return_value=Settings(recommender_backend="sparse"),
+            ):
+                ranked = rank_meals(["salt", "chicken", "tomato"], ranking="bm25")
+        assert ranked.meals == expected
+        assert ranked.meals != recommend_meals(["salt", "chicken", "tomato"])
+
+
+class TestFuzzyMatching:
+    """Tests de la correction orthographique par trigrammes."""
+
+    @staticmethod
+    def _index() -> IngredientIndex:
+        return IngredientIndex(
+            [
+                Meal(name="Chicken Salad", ingredients=["chicken breast", "lettuce"]),
+                Meal(name="Tomato Soup", ingredients=["tomatoes", "onion"]),
+                Meal(name="Pasta", ingredients=["parmesan cheese", "tomato", "pasta"]),
+            ]
+        )
+
+    def test_closest_words(self):
+        """Un mot mal orthographié est rapproché du vocabulaire."""
+        index = self._index()
+        assert index.closest_words("chiken") == ["chicken"]
+        assert set(index.closest_words("tomatoe")) == {"tomato", "tomatoes"}
+
+    def test_correct_multi_word_token(self):
+        """Seuls les mots inconnus sont corrigés."""
+        assert self._index().correct("parmesean cheese") == ["parmesan cheese"]
+
+    def test_fuzzy_only_when_no_match(self):
+        """La correction n'intervient que si le token ne matche rien."""
+        index = self._index()
+        assert index.match_terms({"chiken"}) == set()
+        terms = {index.vocabulary[t] for t in index.match_terms({"chiken"}, fuzzy=True)}
+        assert terms == {"chicken breast"}
+        terms = {index.vocabulary[t] for t in index.match_terms({"tomato"}, fuzzy=True)}
+        assert terms == {"tomato", "tomatoes"}
+
+    def test_unrelated_word_not_corrected(self):
+        """Un mot sans voisin proche ne matche toujours rien."""
+        assert self._index().match_terms({"chocolate"}, fuzzy=True) == set()
+
+
+class TestCompiledIngredients:
+    """Tests de la compilation du vocabulaire en ids entiers."""
+
+    def test_ids_follow_first_occurrence(self):
+        """Chaque ingrédient reçoit un id dans l'ordre de première apparition."""
+        compiled = compile_ingredients(TestIngredientIndex._meals())
+        assert compiled.vocabulary.terms[:3] == ["chicken breast", "rice", "egg"]
+        assert compiled.ingredient_ids(1).tolist() == [1, 2, 3, 3]
+        assert compiled.lengths.tolist() == [2, 4, 2]
+
+    def test_ingredients_share_vocabulary_strings(self):
+        """Les ingrédients reconstruits pointent sur les chaînes du vocabulaire."""
+        compiled = compile_ingredients(TestIngredientIndex._meals())
+        rice_a = compiled.ingredients(0)[1]
+        rice_b = compiled.ingredients(1)[0]
+        assert rice_a == rice_b == "rice"
+        assert rice_a is rice_b
+
+    def test_matrix_merges_duplicates(self):
+        """La matrice fusionne les doublons d'un repas en occurrences."""
+        compiled = compile_ingredients(TestIngredientIndex._meals())
+        matrix = IncidenceMatrix.from_ingredients(compiled)
+        row = slice(matrix.indptr[1], matrix.indptr[2])
+        assert matrix.indices[row].tolist() == [1, 2, 3]
+        assert matrix.data[row].tolist() == [1.0, 1.0, 2.0]
+
+
+class TestIngredientFilters:
+    """Tests des filtres par bitsets (exclusion, tous requis)."""
+
+    def test_bitset_roundtrip(self):
+        """Un bitset se convertit en masque et inversement."""
+        bits = bitset.from_ids([0, 3, 9], size=10)
+        assert bitset.to_mask(bits, 10).nonzero()[0].tolist() == [0, 3, 9]
+        assert bitset.union([bits, bitset.from_ids([1], 10)]) == bits | 0b10
+        assert bitset.full(3) == 0b111
+
+    def test_terms_bitset_built_on_demand(self):
+        """Les bitsets des termes sont construits depuis les posting lists."""
+        index = IngredientIndex(_random_meals())
+        assert not hasattr(index, "bitsets")
+
+        terms = list(index.match_terms(["rice", "salt"]))
+        expected = sorted({meal_id for t in terms for meal_id in index.postings[t]})
+        bits = index.terms_bitset(terms)
+        assert bitset.to_mask(bits, len(index.meals)).nonzero()[0].tolist() == expected
+        assert index.terms_bitset([]) == 0
+
+    def test_filters_normalized(self):
+        """Les exclusions sont normalisées et vides ignorées."""
+        filters = MealFilters.create([" Peanut", "", "MILK "])
+        assert filters.exclude_ingredients == {"peanut", "milk"}
+        assert MealFilters.create().is_empty
+
+    def test_filters_match_brute_force(self):
+        """Exclusion et conjonction donnent le même résultat qu'un scan."""
+        import unittest.mock
+
+        meals = _random_meals()
+        query, excluded = ["chicken", "rice"], ["salt"]
+        with unittest.mock.patch("src.services.recommender.load_meals", return_value=meals):
+            ranked = rank_meals(
+                query, filters=MealFilters.create(excluded, require_all=True), fuzzy=False
+            )
+
+        def has(meal, token):
+            return any(token in ing for ing in meal.ingredients)
+
+        expected = [
+            meal for meal in meals if all(has(meal, q) for q in query) and not has(meal, "salt")
+        ]
+        assert ranked.total == len(expected)
+        assert sorted(m.name for m in ranked.meals) == sorted(m.name for m in expected)
+
+
+class TestMissingIngredients:
+    """Tests des repas presque faisables (max_missing)."""
+
+    @pytest.mark.parametrize("backend", ["index", "sparse"])
+    @pytest.mark.parametrize("ranking", ["count", "bm25"])
+    def test_max_missing_matches_brute_force(self, backend, ranking):
+        """Mêmes repas et mêmes ingrédients manquants qu'un scan complet."""
+        import unittest.mock
+
+        meals = _random_meals()
+        query = ["chicken", "rice", "salt"]
+
+        def missing(meal):
+            return [ing for ing in meal.ingredients if not any(t in ing for t in query)]
+
+        result_cache.clear()
+        with (
+            unittest.mock.patch("src.services.recommender.load_meals", return_value=meals),
+            unittest.mock.patch(
+                "src.services.recommender.get_settings",
+                return_value=Settings(recommender_backend=backend),
+            ),
+        ):
+            for max_missing in (0, 1, 3):
+                ranked = rank_meals(
+                    query,
+                    ranking=ranking,
+                    fuzzy=False,
+                    filters=MealFilters.create(max_missing=max_missing),
+                )
+                expected = [
+                    meal
+                    for meal in meals
+                    if len(missing(meal)) < len(meal.ingredients)
+                    and len(missing(meal)) <= max_missing
+                ]
+                assert ranked.total == len(expected)
+                assert sorted(m.name for m in ranked.meals) == sorted(m.name for m in expected)
+                assert ranked.missing_ingredients == [missing(m) for m in ranked.meals]
+        result_cache.clear()
+
+    def test_recommended_meals_list_missing(self):
+        """Chaque repas renvoyé liste ses ingrédients manquants."""
+        import unittest.mock
+
+        meals = [
+            Meal(name="Omelette", ingredients=["egg", "butter"]),
+            Meal(name="Fried Rice", ingredients=["rice", "egg", "soy sauce", "scallion"]),
+        ]
+        with unittest.mock.patch("src.services.recommender.load_meals", return_value=meals):
+            ranked = rank_meals(["egg", "butter"], fuzzy=False)
+
+        assert [m.missing_ingredients for m in ranked.recommended()] == [
+            [],
+            ["rice", "soy sauce", "scallion"],
+        ]
+        assert list(ranked.iter_recommended()) == ranked.recommended()
+
+    def test_negative_max_missing(self):
+        """Un nombre d'ingrédients manquants négatif est refusé."""
+        from src.core.exceptions import ValidationError
+
+        with pytest.raises(ValidationError):
+            MealFilters.create(max_missing=-1)
+
+
+class TestBatchRecommendations:
+    """Tests des recommandations par lot."""
+
+    def test_batch_matches_single_queries(self):
+        """Chaque résultat du lot est identique à la requête isolée."""
+        import unittest.mock
+
+        meals = _random_meals()
+        queries = [["chicken"], ["Salt", "onion "], ["rice", "tomato", "egg"], ["chicken"]]
+        with unittest.mock.patch("src.services.recommender.load_meals", return_value=meals):
+            for ranking in ("count", "bm25"):
+                result_cache.clear()
+                batch = rank_meals_batch(queries, k=5, ranking=ranking)
+                result_cache.clear()
+                for query, result in zip(queries, batch, strict=True):
+                    expected = rank_meals(query, k=5, ranking=ranking)
+                    assert result.meals == expected.meals
+                    assert result.total == expected.total
+
+    def test_batch_empty_query(self):
+        """Une requête vide du lot ne renvoie aucun repas."""
+        import unittest.mock
+
+        meals = _random_meals()
+        with unittest.mock.patch("src.services.recommender.load_meals", return_value=meals):
+            empty, chicken = rank_meals_batch([[" "], ["chicken"]], k=3)
+        assert empty.meals == [] and empty.total == 0
+        assert len(chicken.meals) == 3
+
+
+class TestShardedScoring:
+    """Tests du scoring réparti sur un pool de processus."""
+
+    def test_sharded_ranks_identically(self):
+        """Les top-k fusionnés des shards égalent le classement en un processus."""
+        from src.services.sharding import ShardedScorer
+
+        index = IngredientIndex(_random_meals())
+        scorer = ShardedScorer(index.matrix, index.bm25_data, workers=3)
+        try:
+            for tokens, bm25 in (({"salt", "onion"}, False), ({"rice", "egg"}, True)):
+                terms = index.match_terms(tokens)
+                data = index.bm25_data if bm25 else None
+                expected = top_k(index.matrix.matvec(terms, data))
+                for k in (None, 1, 7):
+                    total, ranked = scorer.rank(terms, bm25=bm25, k=k)
+                    assert total == expected.size
+                    assert ranked == expected[:k].tolist()
+
+            # Filtre: bitset global découpé par shard
+            terms = index.match_terms({"salt"})
+            allowed = index.filter_bitset({"salt"}, exclude={"onion"})
+            expected = top_k(index.matrix.matvec(terms))
+            expected = expected[bitset.to_mask(allowed, len(index.meals))[expected]]
+            assert scorer.rank(terms, k=5, allowed=allowed) == (
+                expected.size,
+                expected[:5].tolist(),
+            )
+        finally:
+            scorer.close()
+
+    def test_close_releases_shared_memory_cleanly(self):
+        """Créer puis fermer le pool ne laisse ni erreur ni fuite au resource tracker."""
+        import os
+        import subprocess
+        import sys
+        import textwrap
+        from pathlib import Path
+
+        script = textwrap.dedent(
+            """
+            from src.models.schemas import Meal
+            from src.services.ingredient_index import IngredientIndex
+            from src.services.sharding import ShardedScorer
+
+            if __name__ == "__main__":
+                meals = [Meal(name="a", ingredients=["egg"]), Meal(name="b", ingredients=["rice"])]
+                index = IngredientIndex(meals)
+                scorer = ShardedScorer(index.matrix, index.bm25_data, workers=2)
+                assert scorer.rank(index.match_terms({"egg"})) == (1, [0])
+                scorer.close()
+            """
+        )
+        root = Path(__file__).parents[2]
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=root,
+            env={**os.environ, "PYTHONPATH": str(root)},
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        assert result.returncode == 0, result.stderr
+        assert "KeyError" not in result.stderr
+        assert "leaked" not in result.stderr
+
+    def test_retired_scorer_drains_in_flight_requests(self):
+        """Un pool remplacé finit ses requêtes en cours avant de s'arrêter."""
+        from src.services.sharding import ShardedScorer
+
+        index = IngredientIndex(_random_meals())
+        scorer = ShardedScorer(index.matrix, index.bm25_data, workers=2)
+        terms = index.match_terms({"salt"})
+        try:
+            scorer.acquire()
+            scorer.retire()
+            assert scorer.rank(terms, k=3)[1] == top_k(index.matrix.matvec(terms))[:3].tolist()
+            scorer.release()
+            assert scorer._segments == []
+        finally:
+            scorer.close()
+
+    def test_rank_meals_with_workers(self):
+        """recommender_workers > 1 active le pool sans changer les résultats."""
+        import unittest.mock
+
+        from src.services.recommender import close_sharded_scorer
+
+        meals = _random_meals()
+        filters = MealFilters.create(["garlic"])
+        with unittest.mock.patch("src.services.recommender.load_meals", return_value=meals):
+            expected = rank_meals(["chicken", "salt"], k=4, filters=filters)
+            try:
+                with unittest.mock.patch(
+                    "src.services.recommender.get_settings",
+                    return_value=Settings(recommender_workers=2),
+                ):
+                    ranked = rank_meals(["chicken", "salt"], k=4, filters=filters)
+            finally:
+                close_sharded_scorer()
+        assert ranked == expected
+
+
+class TestMaxScore:
+    """Tests du top-k avec terminaison anticipée (MaxScore)."""
+
+    def test_top_k_matches_exhaustive(self):
+        """Même classement et même total que le scoring exhaustif."""
+        index = IngredientIndex(_random_meals())
+        allowed = index.filter_bitset({"salt"}, exclude={"onion"})
+        mask = bitset.to_mask(allowed, len(index.meals))
+        for tokens in ({"salt", "onion"}, {"rice", "egg", "ginger"}, {"chicken"}):
+            for ranking in ("count", "bm25"):
+                scores = index.score(tokens, ranking=ranking)
+                expected = sorted(scores, key=lambda i: (-scores[i], i))
+                for k in (1, 5, 40):
+                    ranked, stats = index.top_k(tokens, k, ranking)
+                    assert ranked == expected[:k]
+                    assert stats.matched == len(scores)
+
+                kept = [i for i in expected if mask[i]]
+                ranked, stats = index.top_k(tokens, 5, ranking, allowed=allowed)
+                assert ranked == kept[:5]
+                assert stats.matched == len(kept)
+
+    def test_prunes_candidates(self):
+        """Un petit k évite de scorer la plupart des repas matchés."""
+        index = IngredientIndex(_random_meals())
+        _, stats = index.top_k({"salt", "rice", "egg", "garlic"}, 3, "bm25")
+        assert stats.evaluated < stats.matched
+        assert stats.pruned == stats.matched - stats.evaluated
+
+    def test_rank_meals_with_maxscore_backend(self):
+        """recommender_backend="maxscore" ne change ni les pages ni le total."""
+        import unittest.mock
+
+        def pages(ranking):
+            first = rank_meals(["chicken", "salt"], k=4, ranking=ranking, filters=filters)
+            second = rank_meals(
+                ["chicken", "salt"], k=4, cursor=first.next_cursor, ranking=ranking, filters=filters
+            )
+            return first, second
+
+        meals = _random_meals()
+        filters = MealFilters.create(["garlic"])
+        with unittest.mock.patch("src.services.recommender.load_meals", return_value=meals):
+            for ranking in ("count", "bm25"):
+                result_cache.clear()
+                expected = pages(ranking)
+                result_cache.clear()
+                with unittest.mock.patch(
+                    "src.services.recommender.get_settings",
+                    return_value=Settings(recommender_backend="maxscore"),
+                ):
+                    assert pages(ranking) == expected
+        result_cache.clear()
+
+    def test_deep_pagination_reuses_ranked_prefix(self):
+        """Les pages suivantes découpent le classement mémorisé (préfixe doublé)."""
+        import unittest.mock
+
+        from src.services.ingredient_index import IngredientIndex as Index
+
+        def walk():
+            names, cursor = [], None
+            while True:
+                page = rank_meals(["salt", "rice"], k=3, cursor=cursor, fuzzy=False)
+                names += [m.name for m in page.meals]
+                if page.next_cursor is None:
+                    return names, page.total
+                cursor = page.next_cursor
+
+        meals = _random_meals()
+        result_cache.clear()
+        with unittest.mock.patch("src.services.recommender.load_meals", return_value=meals):
+            expected = walk()
+            result_cache.clear()
+            with (
+                unittest.mock.patch(
+                    "src.services.recommender.get_settings",
+                    return_value=Settings(recommender_backend="maxscore"),
+                ),
+                unittest.mock.patch.object(
+                    Index, "top_k", autospec=True, side_effect=Index.top_k
+                ) as top,
+            ):
+                assert walk() == expected
+        result_cache.clear()
+
+        pages = -(-expected[1] // 3)
+        assert top.call_count <= pages.bit_length() + 1
+        assert [call.args[2] for call in top.call_args_list][:3] == [3, 6, 12]
+
+    def test_scored_pages_slice_cached_ranking(self):
+        """`ScoredMeals.top` ne reclasse pas tous les repas à chaque page."""
+        import unittest.mock
+
+        from src.services import recommender
+
+        scores = np.random.default_rng(0).integers(1, 6, size=100).astype(np.float64)
+        scored = recommender.ScoredMeals(ids=np.arange(100), scores=scores)
+        expected = top_k(scores).tolist()
+        with unittest.mock.patch(
+            "src.services.recommender.select_top_k", wraps=recommender.select_top_k
+        ) as select:
+            ranked = [i for offset in range(0, 100, 10) for i in scored.top(10, offset)]
+        assert ranked == expected
+        assert [call.args[2] for call in select.call_args_list] == [10, 20, 40, 80, 100]
+
+
+class TestMinHashLSH:
+    """Tests des repas similaires (MinHash + LSH)."""
+
+    def test_identical_meals_share_signature(self):
+        """Deux repas aux mêmes ingrédients ont la même signature."""
+        from src.services.minhash import MinHashLSH
+
+        meals = _random_meals(50)
+        meals.append(meals[3].model_copy(update={"ingredients": meals[3].ingredients[::-1]}))
+        lsh = MinHashLSH(compile_ingredients(meals))
+        assert (lsh.signatures[3] == lsh.signatures[50]).all()
+        assert lsh.similar(50, k=1) == [(3, 1.0)]
+
+    def test_similar_matches_brute_force(self):
+        """Les candidats LSH couvrent les repas très similaires (Jaccard exact)."""
+        from src.services.minhash import MinHashLSH
+
+        compiled = compile_ingredients(_random_meals(500))
+        lsh = MinHashLSH(compiled)
+        sets = [set(compiled.ingredient_ids(i).tolist()) for i in range(compiled.n_meals)]
+        found = total = 0
+        for meal_id in range(30):
+            candidates = set(lsh.candidates(meal_id).tolist())
+            for other, terms in enumerate(sets):
+                jaccard = len(sets[meal_id] & terms) / len(sets[meal_id] | terms)
+                if other != meal_id and jaccard >= 0.6:
+                    total += 1
+                    found += other in candidates
+            for other, similarity in lsh.similar(meal_id, k=5):
+                union = sets[meal_id] | sets[other]
+                assert similarity == len(sets[meal_id] & sets[other]) / len(union)
+        assert total and found / total >= 0.9
+
+    def test_recall_curve(self):
+        """Le rappel théorique suit 1 - (1 - s^rows)^bands."""
+        from src.services.minhash import MinHashLSH
+
+        lsh = MinHashLSH(compile_ingredients(_random_meals(10)), num_perm=128, bands=32)
+        assert lsh.rows == 4
+        assert round(lsh.recall(0.5), 2) == 0.87
+        assert lsh.recall(0.1) < 0.01
+        with pytest.raises(ValueError):
+            MinHashLSH(compile_ingredients(_random_meals(10)), num_perm=128, bands=30)
+
+
+class TestPantryParser:
+    """Tests de l'extraction d'ingrédients depuis un texte libre."""
+
+    def test_automaton_finds_all_occurrences(self):
+        """L'automate trouve les mêmes occurrences qu'une recherche naïve."""
+        import random
+
+        from src.services.aho_corasick import AhoCorasick
+
+        rng = random.Random(0)
+        for _ in range(100):
+            patterns = list({"".join(rng.choices("ab", k=rng.randint(1, 4))) for _ in range(8)})
+            text = "".join(rng.choices("abc", k=30))
+            expected = sorted(
+                (start, start + len(pattern), pattern_id)
+                for pattern_id, pattern in enumerate(patterns)
+                for start in range(len(text))
+                if text.startswith(pattern, start)
+            )
+            assert sorted(AhoCorasick(patterns).iter_matches(text)) == expected
+
+    def test_extract_whole_words_longest_first(self):
+        """Mots entiers, occurrence la plus longue, pluriels tolérés."""
+        meal = Meal(
+            name="Pantry",
+            ingredients=["chicken", "chicken thigh", "rice", "tomato", "olive oil"],
+        )
+        index = IngredientIndex([meal])
+        text = "I have 2 Chicken thighs, some rice (no price), old tomatoes and olive oil. Rice!"
+        assert index.extract(text) == ["chicken thigh", "rice", "tomato", "olive oil"]
+        assert index.extract("nothing useful here") == []
+
+
+class TestAttributeIndex:
+    """Tests des index d'attributs (cuisine, type de plat, tags...)."""
+
+    def test_filters_match_brute_force(self):
+        """OU entre valeurs d'un attribut, ET entre attributs et entre tags."""
+        import unittest.mock
+
+        meals = _random_meals()
+        filters = MealFilters.create(
+            cuisine=["Italian", "french"], dish_type=["main"], tags=["quick", "spicy"]
+        )
+        with unittest.mock.patch("src.services.recommender.load_meals", return_value=meals):
+            result = list(filter_meals(filters))
+
+        expected = [
+            meal
+            for meal in meals
+            if meal.cuisine in {"italian", "french"}
+            and meal.dish_type == "main"
+            and {"quick", "spicy"} <= set(meal.tags)
+        ]
+        assert result and result == expected
+
+    def test_unknown_value_matches_nothing(self):
+        """Une valeur inconnue ne renvoie aucun repas."""
+        import unittest.mock
+
+        meals = _random_meals(30)
+        with unittest.mock.patch("src.services.recommender.load_meals", return_value=meals):
+            assert list(filter_meals(MealFilters.create(cuisine=["martian"]))) == []
+            assert filter_meals(MealFilters.create()) == meals
+
+    def test_selection_reads_meals_lazily(self):
+        """Le résultat filtré ne lit un repas qu'à l'itération (streaming NDJSON)."""
+        import unittest.mock
+
+        meals = _random_meals(30)
+        reads: list[int] = []
+
+        class Spy(list):
+            def __getitem__(self, position):
+                reads.append(position)
+                return super().__getitem__(position)
+
+        with unittest.mock.patch("src.services.recommender.load_meals", return_value=Spy(meals)):
+            result = filter_meals(MealFilters.create(cuisine=["italian"]))
+
+        assert reads == []
+        first = next(iter(result))
+        assert reads == [meals.index(first)]
+        assert list(result) == [meal for meal in meals if meal.cuisine == "italian"]
+
+    def test_compose_with_ingredients(self):
+        """Les attributs se combinent avec la recherche par ingrédients."""
+        import unittest.mock
+
+        meals = _random_meals()
+        filters = MealFilters.create(cuisine=["indian"], tags=["quick"])
+        with unittest.mock.patch("src.services.recommender.load_meals", return_value=meals):
+            ranked = rank_meals(["rice"], filters=filters)
+
+        expected = {
+            meal.name
+            for meal in meals
+            if meal.cuisine == "indian"
+            and "quick" in meal.tags
+            and any("rice" in ing for ing in meal.ingredients)
+        }
+        assert {meal.name for meal in ranked.meals} == expected
+        assert ranked.total == len(expected)
+
+
+class TestNutritionColumns:
+    """Tests des colonnes nutritionnelles (plages et tri)."""
+
+    def test_range_and_order_match_brute_force(self):
+        """Plages par dichotomie et ordre précalculé = scan des objets."""
+        from src.services.nutrition_index import NutritionColumns
+
+        meals = _random_meals()
+        columns = NutritionColumns(meals)
+        ids = sorted(columns.range_ids("calories", 100, 400).tolist())
+        assert ids == [i for i, m in enumerate(meals) if 100 <= m.nutritions.calories <= 400]
+        assert columns.range_ids("protein", maximum=-1).size == 0
+
+        ordered = columns.ordered("protein", "desc").tolist()
+        assert ordered == sorted(range(len(meals)), key=lambda i: (-meals[i].nutritions.protein, i))
+
+    def test_invalid_range(self):
+        """Une borne min supérieure à la borne max est refusée."""
+        from src.core.exceptions import ValidationError
+
+        with pytest.raises(ValidationError):
+            MealFilters.create(nutrition={"calories": (500, 100)})
+
+    def test_filter_and_sort_meals(self):
+        """Filtres nutritionnels et tri sur le listing des repas."""
+        import unittest.mock
+
+        meals = _random_meals()
+        filters = MealFilters.create(cuisine=["italian"], nutrition={"calories": (None, 300)})
+        with unittest.mock.patch("src.services.recommender.load_meals", return_value=meals):
+            result = filter_meals(filters, sort_by="protein", sort_order="desc")
+            assert list(result[:2]) == [result[0], result[1]]
+            result = list(result)
+
+        expected = sorted(
+            (m for m in meals if m.cuisine == "italian" and m.nutritions.calories <= 300),
+            key=lambda m: (-m.nutritions.protein, meals.index(m)),
+        )
+        assert result and result == expected
+
+    def test_rank_meals_sorted_by_nutrient(self):
+        """sort_by remplace la pertinence, pages comprises."""
+        import unittest.mock
+
+        meals = _random_meals()
+        filters = MealFilters.create(nutrition={"protein": (20, None)})
+        with unittest.mock.patch("src.services.recommender.load_meals", return_value=meals):
+            first = rank_meals(["rice"], k=5, filters=filters, sort_by="calories")
+            second = rank_meals(
+                ["rice"], k=5, cursor=first.next_cursor, filters=filters, sort_by="calories"
+            )
+
+        expected = sorted(
+            (
+                m
+                for m in meals
+                if m.nutritions.protein >= 20 and any("rice" in ing for ing in m.ingredients)
+            ),
+            key=lambda m: (m.nutritions.calories, meals.index(m)),
+        )
+        assert first.total == len(expected)
+        assert first.meals + second.meals == expected[:10]
+
+
+class TestDatasetSnapshot:
+    """Tests du snapshot binaire du dataset parsé."""
+
+    @staticmethod
+    def _dataset():
+        from src.services.attribute_index import AttributeIndex
+        from src.services.nutrition_index import NutritionColumns
+        from src.services.snapshot import ParsedDataset
+
+        meals = _random_meals(50)
+        for meal_id, meal in enumerate(meals):
+            meal.id = meal_id
+        meals[0].image = "http://x/é.jpg"
+        meals[1].name = "Crème brûlée"
+        return ParsedDataset(
+            meals, compile_ingredients(meals), AttributeIndex(meals), NutritionColumns(meals)
+        )
+
+    def test_roundtrip(self, tmp_path):
+        """Le snapshot relu redonne les mêmes repas, vocabulaire et index."""
+        from src.services.snapshot import read_snapshot, write_snapshot
+
+        dataset = self._dataset()
+        path = tmp_path / "recipes.snapshot.bin"
+        write_snapshot(path, "abc", dataset)
+        loaded = read_snapshot(path, "abc")
+
+        assert loaded is not None
+        assert list(loaded.meals) == dataset.meals
+        assert loaded.compiled.vocabulary.terms == dataset.compiled.vocabulary.terms
+        assert loaded.compiled.ids.tolist() == dataset.compiled.ids.tolist()
+        assert _attribute_postings(loaded.attributes) == _attribute_postings(dataset.attributes)
+        assert (
+            IngredientIndex(
+                loaded.meals, loaded.compiled, loaded.attributes, loaded.nutrition
+            ).version
+            == IngredientIndex(dataset.meals).version
+        )
+
+        # Réécriture depuis le store mappé: même contenu
+        write_snapshot(tmp_path / "copy.snapshot.bin", "abc", loaded)
+        assert path.read_bytes() == (tmp_path / "copy.snapshot.bin").read_bytes()
+
+    def test_meal_store_is_lazy_sequence(self, tmp_path):
+        """Le store mappé se comporte comme une liste de repas en lecture seule."""
+        from src.services.meal_store import MealStore
+        from src.services.snapshot import read_snapshot, write_snapshot
+
+        dataset = self._dataset()
+        path = tmp_path / "recipes.snapshot.bin"
+        write_snapshot(path, "abc", dataset)
+        loaded = read_snapshot(path, "abc")
+
+        assert loaded is not None
+        store = loaded.meals
+        assert isinstance(store, MealStore)
+        assert isinstance(store.nutrition, np.ndarray) and not store.nutrition.flags.writeable
+        assert len(store) == 50
+        assert store[-1] == dataset.meals[-1]
+        assert store[2:5] == dataset.meals[2:5]
+        assert store.column("name") == [meal.name for meal in dataset.meals]
+        with pytest.raises(IndexError):
+            store[50]
+
+    def test_stale_or_corrupt_snapshot_is_ignored(self, tmp_path):
+        """Autre CSV source ou fichier illisible: le snapshot est ignoré."""
+        from src.services.snapshot import read_snapshot, write_snapshot
+
+        path = tmp_path / "recipes.snapshot.bin"
+        assert read_snapshot(path, "abc") is None
+        write_snapshot(path, "abc", self._dataset())
+        assert read_snapshot(path, "other") is None
+
+        path.write_bytes(path.read_bytes()[:-100])
+        assert read_snapshot(path, "abc") is None
+        path.write_bytes(b"not a snapshot")
+        assert read_snapshot(path, "abc") is None
+
+    def test_warm_load_skips_parsing(self, tmp_path):
+        """Un second chargement mappe le snapshot; un CSV modifié l'invalide."""
+        import unittest.mock
+
+        from src.services import recommender
+        from src.services.meal_store import MealStore
+
+        csv_path = tmp_path / "recipes_mealdb.csv"
+        csv_path.write_text("name,ingredients\n")
+        dataset = self._dataset()
+        with (
+            unittest.mock.patch(
+                "src.services.recommender.get_settings",
+                return_value=Settings(data_dir=tmp_path, data_source="mealdb"),
+            ),
+            unittest.mock.patch(
+                "src.services.recommender.ensure_recipes_csv", return_value=csv_path
+            ),
+            unittest.mock.patch(
+                "src.services.recommender._parse_meals", return_value=dataset
+            ) as parse,
+        ):
+            first = recommender._load_or_parse_meals()
+            loaded = recommender._load_or_parse_meals()
+            assert parse.call_count == 1
+            assert isinstance(first.meals, MealStore)
+            assert list(loaded.meals) == dataset.meals
+
+            csv_path.write_text("name,ingredients\nx,y\n")
+            recommender._load_or_parse_meals()
+            assert parse.call_count == 2